@@ -0,0 +1,228 @@
+"""
+Runs Dijkstra from many sources in parallel worker processes.
+
+The graph is packed once into a single shared memory block in compressed sparse row form
+(offsets, targets and weights arrays of 8-byte items), and every worker maps that block instead of
+receiving its own pickled copy of the graph, so starting a worker costs the same for any graph size.
+Only lists of source ids go to the workers, and each result comes back as an array('d') of
+distances, which pickles as raw bytes.
+"""
+
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from heapq import heappop, heappush
+from multiprocessing.shared_memory import SharedMemory
+from random import Random
+from time import perf_counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dijkstra import get_grid_road_graph, weighted_dijkstra
+
+INF = float('inf')
+
+# each pool worker's view of the shared graph: (offsets, targets, weights), set by _attach_shared_graph
+_worker_graph: Optional[Tuple[memoryview, memoryview, memoryview]] = None
+# the worker's handle on the block, kept so the mapping stays open as long as the process
+_worker_shared_memory: Optional[SharedMemory] = None
+
+
+class SharedGraph:
+    """
+    A weighted directed graph packed into one shared memory block, as a context manager that
+    frees the block on exit. Node ids are positions in labels: the graph's own nodes in dict order,
+    then nodes that only appear as a neighbor.
+
+    The block holds offsets (node_count + 1 int64s), then targets (edge_count int64s), then weights
+    (edge_count float64s); the edges of node i are at offsets[i]:offsets[i + 1] in both of the others.
+    """
+
+    def __init__(self, graph: Dict[Any, List[Tuple[Any, float]]]):
+        self.labels = list(graph)
+        self.ids: Dict[Any, int] = {label: i for i, label in enumerate(self.labels)}
+        offsets = array('q', [0])
+        targets = array('q')
+        weights = array('d')
+        for edges in graph.values():
+            for neighbor, weight in edges:
+                if weight < 0:
+                    raise ValueError('Dijkstra needs non-negative weights; got {} on an edge to {}'.format(weight, neighbor))
+                if neighbor not in self.ids:
+                    self.ids[neighbor] = len(self.labels)
+                    self.labels.append(neighbor)
+                targets.append(self.ids[neighbor])
+                weights.append(weight)
+            offsets.append(len(targets))
+        offsets.extend([len(targets)] * (len(self.labels) - len(graph)))
+
+        self.node_count = len(self.labels)
+        self.edge_count = len(targets)
+        # SharedMemory refuses size 0, which an empty graph would otherwise ask for
+        self.shared_memory = SharedMemory(create=True, size=max(1, 8 * (self.node_count + 1 + 2 * self.edge_count)))
+        try:
+            views = _views(self.shared_memory, self.node_count, self.edge_count)
+            try:
+                for view, values in zip(views, (offsets, targets, weights)):
+                    view[:] = values
+            finally:
+                for view in views:
+                    view.release()
+        except BaseException:
+            # nothing else holds the block's name yet, so it would never be freed
+            self.close()
+            raise
+
+    @property
+    def name(self) -> str:
+        return self.shared_memory.name
+
+    def distances_by_label(self, distances: array) -> Dict[Any, float]:
+        """Turns a distance array from batch_shortest_paths into {label: distance} for the reachable nodes."""
+        labels = self.labels
+        return {labels[i]: distance for i, distance in enumerate(distances) if distance != INF}
+
+    def close(self) -> None:
+        self.shared_memory.close()
+        self.shared_memory.unlink()
+
+    def __enter__(self) -> 'SharedGraph':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def _views(shared_memory: SharedMemory, node_count: int, edge_count: int) -> Tuple[memoryview, memoryview, memoryview]:
+    """Returns the (offsets, targets, weights) memoryviews over a SharedGraph block."""
+    buf = shared_memory.buf
+    targets_start = 8 * (node_count + 1)
+    weights_start = targets_start + 8 * edge_count
+    return (
+        buf[:targets_start].cast('q'),
+        buf[targets_start:weights_start].cast('q'),
+        buf[weights_start:weights_start + 8 * edge_count].cast('d'),
+    )
+
+
+def _attach_shared_graph(name: str, node_count: int, edge_count: int) -> None:
+    """Worker initializer: maps the SharedGraph block once per process."""
+    global _worker_graph, _worker_shared_memory
+    _worker_shared_memory = SharedMemory(name=name)
+    _worker_graph = _views(_worker_shared_memory, node_count, edge_count)
+
+
+def _worker_shortest_paths(source_ids: List[int]) -> List[Tuple[int, array]]:
+    """Pool task: _shortest_paths_from_ids over the graph this worker attached."""
+    return _shortest_paths_from_ids(source_ids, _worker_graph)
+
+
+def _shortest_paths_from_ids(
+        source_ids: List[int],
+        graph_views: Tuple[memoryview, memoryview, memoryview],
+    ) -> List[Tuple[int, array]]:
+    """Runs Dijkstra over the (offsets, targets, weights) views from each source id; unreachable nodes stay at inf."""
+    offsets, targets, weights = graph_views
+    node_count = len(offsets) - 1
+    results = []
+    for source_id in source_ids:
+        distances = array('d', [INF]) * node_count
+        distances[source_id] = 0.0
+        # ids are ints, so (distance, id) pairs always compare and need no tie breaker
+        heap = [(0.0, source_id)]
+        while heap:
+            distance, node = heappop(heap)
+            # stale entry: the node was already settled with a shorter distance
+            if distance > distances[node]:
+                continue
+            for edge in range(offsets[node], offsets[node + 1]):
+                new_distance = distance + weights[edge]
+                neighbor = targets[edge]
+                if new_distance < distances[neighbor]:
+                    distances[neighbor] = new_distance
+                    heappush(heap, (new_distance, neighbor))
+        results.append((source_id, distances))
+    return results
+
+
+def batch_shortest_paths(
+        shared_graph: SharedGraph,
+        sources: Iterable[Any],
+        workers: Optional[int] = None,
+        chunk_size: int = 4,
+    ) -> Iterator[Tuple[Any, array]]:
+    """
+    Yields (source, distances) for every source as soon as its chunk finishes, in completion order.
+    distances is an array('d') indexed by node id (see SharedGraph.labels), with inf for nodes the
+    source cannot reach.
+
+    Sources are sent out chunk_size at a time. workers defaults to os.cpu_count(); with workers=1
+    the searches run in this process, in order.
+    """
+    labels, ids = shared_graph.labels, shared_graph.ids
+    source_ids = [ids[source] for source in sources]
+    chunks = [source_ids[i:i + chunk_size] for i in range(0, len(source_ids), chunk_size)]
+    attach_args = (shared_graph.name, shared_graph.node_count, shared_graph.edge_count)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks:
+            # views local to this generator, so several batches can run side by side in one process, and
+            # released before yielding, since the block can't be closed while views into it are alive
+            views = _views(shared_graph.shared_memory, shared_graph.node_count, shared_graph.edge_count)
+            try:
+                results = _shortest_paths_from_ids(chunk, views)
+            finally:
+                for view in views:
+                    view.release()
+            for source_id, distances in results:
+                yield labels[source_id], distances
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_attach_shared_graph, initargs=attach_args) as executor:
+        futures = [executor.submit(_worker_shortest_paths, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            for source_id, distances in future.result():
+                yield labels[source_id], distances
+
+
+def benchmark_batch(width: int = 120, height: int = 120, source_count: int = 48, seed: int = 0) -> None:
+    """Times the same batch of sources on a grid road graph serially and with one worker per core."""
+    rng = Random(seed)
+    graph, _ = get_grid_road_graph(width, height, rng)
+    sources = rng.sample(list(graph), source_count)
+    cores = os.cpu_count() or 1
+
+    with SharedGraph(graph) as shared_graph:
+        print('{} sources on a {}x{} grid road graph ({} nodes, {} edges):'.format(
+            source_count, width, height, shared_graph.node_count, shared_graph.edge_count))
+        baseline = None
+        for workers in sorted({1, cores}):
+            start = perf_counter()
+            reached = sum(1 for _, distances in batch_shortest_paths(shared_graph, sources, workers) for d in distances if d != INF)
+            elapsed = perf_counter() - start
+            baseline = baseline or elapsed
+            print('{:>3} worker(s): {:.3f}s, {:.1f} sources/s, {:.2f}x; {} (source, node) pairs reached'.format(
+                workers, elapsed, source_count / elapsed, baseline / elapsed, reached))
+
+
+def main() -> None:
+    graph2 = {
+        'nyc': [],
+        'la': [('pdx', 1)],
+        'seattle': [('pdx', 1)],
+        'pdx': [('seattle', 1)],
+        'denver': [('nyc', 1), ('la', 1)],
+    }
+    print('Graph: {}'.format(graph2))
+    with SharedGraph(graph2) as shared_graph:
+        results = dict(batch_shortest_paths(shared_graph, graph2, workers=2, chunk_size=1))
+        for source in graph2:
+            distances = shared_graph.distances_by_label(results[source])
+            assert distances == weighted_dijkstra(graph2, source)[0]
+            print('Shortest paths from {}: {}'.format(source, distances))
+
+    print()
+    benchmark_batch()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,24 +1,45 @@
 """Demonstrates bubble sort."""
 
-from typing import List, Optional
+from typing import Any, Callable, List, Optional, Union
 
-from sort_demo_helpers import print_sort_op_results, SortOperationType
+from sort_demo_helpers import print_sort_op_results, sort_with_key, OperationTrace, SortOperationType
 
+INIT, COMPARE, SWITCH = SortOperationType.INIT.code, SortOperationType.COMPARE.code, SortOperationType.SWITCH.code
+
+
+def bubble_sort(
+        lst: List[int],
+        trace: Optional[OperationTrace] = None,
+        key: Optional[Callable[[Any], Any]] = None,
+        reverse: bool = False,
+    ) -> Union[List[str], OperationTrace]:
+    """Returns a list of operations, or records into and returns trace if one is given."""
+    if key is not None or reverse:
+        return sort_with_key(bubble_sort, lst, trace, key, reverse)
+
+    operations = [] if trace is None else None
+    record = trace.recorder() if trace is not None else None
 
-def bubble_sort(lst: List[int]) -> List[str]:
-    """Returns a list of operations."""
-    operations = []
     for i in range(len(lst)-1):
         indexes_to_iterate = len(lst)-i-1
-        operations.append('\n' + SortOperationType.INIT.get_sort_operation_str(sort='bubble', lst=lst, i=i, indexes_to_iterate=indexes_to_iterate))
+        if operations is not None:
+            operations.append('\n' + SortOperationType.INIT.get_sort_operation_str(sort='bubble', lst=lst, i=i, indexes_to_iterate=indexes_to_iterate))
+        elif record:
+            record(INIT, i, indexes_to_iterate)
 
         for j in range(0, indexes_to_iterate):
-            operations.append('\t' + SortOperationType.COMPARE.get_sort_operation_str(sort='bubble', lst=lst, j=j))
+            if operations is not None:
+                operations.append('\t' + SortOperationType.COMPARE.get_sort_operation_str(sort='bubble', lst=lst, j=j))
+            elif record:
+                record(COMPARE, j, j+1)
 
             if lst[j] > lst[j+1]:
-                operations.append(SortOperationType.SWITCH.get_sort_operation_str(lst=lst, i=i, min_idx=j))
+                if operations is not None:
+                    operations.append(SortOperationType.SWITCH.get_sort_operation_str(lst=lst, i=i, min_idx=j))
+                elif record:
+                    record(SWITCH, j, j+1)
                 lst[j], lst[j+1] = lst[j+1], lst[j]
-    return operations
+    return operations if trace is None else trace
 
 
 def main(some_random_list: Optional[List[str]] = None):
@@ -0,0 +1,91 @@
+"""
+Demonstrates sorting typed binary buffers in place: array.array, bytearray, mmap'd files.
+
+The sort engines only index and slice-assign, so they run directly on a memoryview cast to the buffer's
+item format (e.g. 'q' for int64, 'd' for double). Nothing is decoded into a list of Python objects,
+so a memory-mapped file far bigger than RAM can be sorted with an in-place engine like introsort.
+"""
+
+import mmap
+import os
+import struct
+from array import array
+from random import randint, random
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, MutableSequence, Optional
+
+from quicksort import introsort
+
+DEFAULT_FORMAT = 'q'
+
+
+def typed_view(buffer: Any, fmt: Optional[str] = None) -> memoryview:
+    """
+    Returns a writable memoryview over buffer with items of struct format fmt (native byte order).
+    Without fmt, memoryviews and arrays keep their own format and raw byte buffers are read as int64.
+    """
+    view = memoryview(buffer)
+    if view.readonly:
+        view.release()
+        raise TypeError('Can only sort writable buffers in place')
+    if fmt is None:
+        fmt = view.format if view.format != 'B' or isinstance(buffer, array) else DEFAULT_FORMAT
+    if view.format == fmt:
+        return view
+    nbytes = view.nbytes
+    if nbytes % struct.calcsize(fmt):
+        view.release()
+        raise ValueError('Buffer of {} bytes does not hold whole {!r} items'.format(nbytes, fmt))
+    return view.cast('B').cast(fmt)
+
+
+def sort_buffer(
+        buffer: Any,
+        fmt: Optional[str] = None,
+        engine: Callable[[MutableSequence], None] = introsort,
+    ) -> None:
+    """
+    Sorts the items of any writable buffer in place, in its native item format.
+    engine is any in-place sort taking one sequence, e.g. introsort (O(log n) extra space),
+    timsort or bottom_up_merge_sort (these allocate a scratch buffer of up to the same size).
+    """
+    with typed_view(buffer, fmt) as view:
+        engine(view)
+
+
+def sort_file_in_place(
+        path: str,
+        fmt: str = DEFAULT_FORMAT,
+        engine: Callable[[MutableSequence], None] = introsort,
+    ) -> None:
+    """Memory-maps a binary file of fmt items and sorts it in place; the OS pages data in and out as needed."""
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, 'r+b') as f:
+        with mmap.mmap(f.fileno(), 0) as mapped:
+            sort_buffer(mapped, fmt, engine)
+            mapped.flush()
+
+
+def main() -> None:
+    arr = array('i', (randint(-100, 100) for _ in range(10)))
+    sort_buffer(arr)
+    print("array('i') sorted in place:", arr.tolist())
+
+    raw = bytearray(array('d', (random() for _ in range(5))).tobytes())
+    sort_buffer(raw, 'd')
+    print('bytearray of doubles sorted in place:', array('d', raw).tolist())
+
+    with TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'ints.bin')
+        with open(path, 'wb') as f:
+            array('q', (randint(0, 10**12) for _ in range(100000))).tofile(f)
+        sort_file_in_place(path)
+
+        with open(path, 'rb') as f:
+            result = array('q', f.read())
+        print('100000 int64s sorted in place through mmap? {}'.format(result.tolist() == sorted(result)))
+
+
+if __name__ == '__main__':
+    main()
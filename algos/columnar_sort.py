@@ -0,0 +1,89 @@
+"""
+Demonstrates sorting a table stored as parallel columns by several keys without moving any rows:
+each key column is argsorted (stably) from the last key to the first, and the final permutation
+is applied to every column once.
+"""
+
+from array import array
+from functools import partial
+from random import Random
+from typing import Callable, List, MutableSequence, Optional, Sequence, Union
+
+from counting_sort import counting_argsort
+from natural_merge_sort import natural_merge_sort
+from sort_demo_helpers import argsort, permute_columns, take
+
+# any stable argsort works here; timsort is adaptive, so columns that are already grouped are cheap
+default_argsorter = partial(argsort, natural_merge_sort)
+
+Argsorter = Callable[..., array]
+
+
+def lexsort(
+        columns: Sequence[Sequence],
+        reverse: Union[bool, Sequence[bool]] = False,
+        argsorters: Optional[Union[Argsorter, Sequence[Argsorter]]] = None,
+    ) -> array:
+    """
+    Returns the permutation, as an array('q'), that sorts rows by columns[0], then columns[1] and so on.
+    The columns are left untouched.
+
+    reverse and argsorters may be given once for all columns or once per column. An argsorter is
+    called as argsorter(column, reverse=...) and must be stable, like counting_argsort,
+    lsd_radix_argsort or partial(argsort, some_sort).
+    """
+    if not columns:
+        raise ValueError('lexsort needs at least one column')
+    n = len(columns[0])
+    if any(len(column) != n for column in columns):
+        raise ValueError('Columns must all have the same length')
+
+    reverses = [reverse] * len(columns) if isinstance(reverse, bool) else list(reverse)
+    if argsorters is None or callable(argsorters):
+        argsorters = [argsorters or default_argsorter] * len(columns)
+    if len(reverses) != len(columns) or len(argsorters) != len(columns):
+        raise ValueError('reverse and argsorters must be given once or once per column')
+
+    order = array('q', range(n))
+    # least significant key first; each later (stable) pass keeps ties in the order the previous pass left
+    for column, rev, argsorter in reversed(list(zip(columns, reverses, argsorters))):
+        order = take(order, argsorter(take(column, order), reverse=rev))
+    return order
+
+
+def sort_columns(
+        columns: Sequence[MutableSequence],
+        key_columns: Optional[Sequence[int]] = None,
+        reverse: Union[bool, Sequence[bool]] = False,
+        argsorters: Optional[Union[Argsorter, Sequence[Argsorter]]] = None,
+    ) -> array:
+    """
+    Sorts a table of parallel columns in place by the columns at key_columns (all of them by default),
+    and returns the permutation that was applied.
+    """
+    keys = [columns[i] for i in key_columns] if key_columns is not None else list(columns)
+    order = lexsort(keys, reverse, argsorters)
+    permute_columns(columns, order)
+    return order
+
+
+def main() -> None:
+    rng = Random(0)
+    names: List[str] = [rng.choice(['ana', 'bo', 'cy', 'di', 'ed']) + str(i) for i in range(8)]
+    cities: List[str] = [rng.choice(['Oslo', 'Lima', 'Pune']) for _ in range(8)]
+    ages = array('q', (rng.randint(20, 30) for _ in range(8)))
+
+    print('Sorting by city, then age (oldest first, counting sort), then name:')
+    order = sort_columns(
+        [names, cities, ages],
+        key_columns=[1, 2, 0],
+        reverse=[False, True, False],
+        argsorters=[default_argsorter, counting_argsort, default_argsorter],
+    )
+    print('permutation: {}'.format(order.tolist()))
+    for row in zip(cities, ages, names):
+        print('  {:>5} {} {}'.format(*row))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,365 @@
+"""
+Demonstrates contraction hierarchies: https://en.wikipedia.org/wiki/Contraction_hierarchies
+
+Preprocessing removes ("contracts") the nodes one at a time, least important first. Whenever a
+removed node v was on the only short path u -> v -> w between two remaining nodes, a shortcut edge
+u -> w with the same length is added, so the distances between the remaining nodes never change.
+A node's rank is when it was contracted. Any shortest path then has a version that only goes up in
+rank and then only down, so a query is a bidirectional Dijkstra where both searches only follow edges
+to higher ranked nodes, and settles a small fraction of the nodes plain Dijkstra does.
+"""
+
+import json
+import os
+import tempfile
+from array import array
+from heapq import heappop, heappush
+from random import Random
+from time import perf_counter
+from typing import Any, Dict, List, Set, Tuple
+
+from dijkstra import bidirectional_dijkstra, get_grid_road_graph, get_reverse_graph, weighted_dijkstra
+
+INF = float('inf')
+
+# a witness search gives up after settling this many nodes per edge of the node being contracted, and the
+# shortcut is added anyway; extra shortcuts never make queries wrong, but every one makes them slower, so
+# nodes whose neighbourhoods have grown by contraction get a search of matching size
+WITNESS_SETTLES_PER_EDGE = 20
+
+# upward edges of one node: {other node id: (weight, id of the contracted node it skips, or -1)}
+UpwardEdges = Dict[int, Tuple[float, int]]
+
+
+def _witness_distances(
+        out_edges: List[Dict[int, float]],
+        source: int,
+        excluded: int,
+        targets: Set[int],
+        max_distance: float,
+        settle_limit: int,
+    ) -> Dict[int, float]:
+    """
+    Returns lengths of paths from source that avoid excluded, found by a Dijkstra search that stops once
+    all of targets are settled, or past max_distance or settle_limit settled nodes. Every value is the
+    length of a real path, but not necessarily the shortest one.
+    """
+    distances = {source: 0}
+    heap = [(0, source)]
+    settled = 0
+    targets_left = len(targets)
+    while heap and settled < settle_limit:
+        distance, node = heappop(heap)
+        if distance > distances[node]:
+            continue
+        settled += 1
+        if node in targets:
+            targets_left -= 1
+            if not targets_left:
+                break
+        for neighbor, weight in out_edges[node].items():
+            new_distance = distance + weight
+            if neighbor != excluded and new_distance <= max_distance and new_distance < distances.get(neighbor, INF):
+                distances[neighbor] = new_distance
+                heappush(heap, (new_distance, neighbor))
+    return distances
+
+
+def _shortcuts_needed(
+        out_edges: List[Dict[int, float]],
+        in_edges: List[Dict[int, float]],
+        node: int,
+    ) -> List[Tuple[int, int, float]]:
+    """Returns the (u, w, weight) shortcuts contracting node would add: u -> node -> w with no witness path."""
+    shortcuts = []
+    if not out_edges[node]:
+        return shortcuts
+    max_out_weight = max(out_edges[node].values())
+    targets = set(out_edges[node])
+    settle_limit = WITNESS_SETTLES_PER_EDGE * (len(in_edges[node]) + len(out_edges[node]))
+    for u, in_weight in in_edges[node].items():
+        witness = _witness_distances(out_edges, u, node, targets - {u}, in_weight + max_out_weight, settle_limit)
+        for w, out_weight in out_edges[node].items():
+            if w != u and witness.get(w, INF) > in_weight + out_weight:
+                shortcuts.append((u, w, in_weight + out_weight))
+    return shortcuts
+
+
+class ContractionHierarchy:
+    """
+    A shortest path index over a weighted directed graph in dict form ({node: [(neighbor, weight), ...]}).
+
+    Node ids are positions in labels. forward[v] holds v's edges to higher ranked nodes and backward[v]
+    the edges from higher ranked nodes into v, both including shortcuts, which remember the node they skip.
+    """
+
+    def __init__(self, labels: List[Any], ranks: array, forward: List[UpwardEdges], backward: List[UpwardEdges]):
+        self.labels = labels
+        self.ids: Dict[Any, int] = {label: i for i, label in enumerate(labels)}
+        self.ranks = ranks
+        self.forward = forward
+        self.backward = backward
+        # the same edges with weights only, which is all a query's searches look at
+        self._weights: Tuple[List[Dict[int, float]], List[Dict[int, float]]] = tuple(
+            [{other: weight for other, (weight, _) in node_edges.items()} for node_edges in edges]
+            for edges in (forward, backward)
+        )
+
+    @classmethod
+    def build(cls, graph: Dict[Any, List[Tuple[Any, float]]]) -> 'ContractionHierarchy':
+        """
+        Contracts every node of graph, in order of priority: the edge difference (the shortcuts contracting a
+        node would add minus the edges it would remove), twice the same difference counted in original edges
+        (a shortcut stands for every edge it skips, so long shortcuts are put off), plus how many of its
+        neighbours are already contracted and its level (one more than the highest contracted neighbour's),
+        so the order spreads out over the graph and stays shallow. Priorities go stale as neighbours are
+        contracted, so a node is only contracted if its recomputed priority is still the smallest, and its
+        neighbours are updated after.
+        """
+        labels = list(graph)
+        ids = {label: i for i, label in enumerate(labels)}
+        for edges in graph.values():
+            for neighbor, _ in edges:
+                if neighbor not in ids:
+                    ids[neighbor] = len(labels)
+                    labels.append(neighbor)
+
+        node_count = len(labels)
+        # the graph of nodes not yet contracted, with parallel edges merged and self loops dropped
+        out_edges: List[Dict[int, float]] = [{} for _ in range(node_count)]
+        in_edges: List[Dict[int, float]] = [{} for _ in range(node_count)]
+        for label, edges in graph.items():
+            u = ids[label]
+            for neighbor, weight in edges:
+                if weight < 0:
+                    raise ValueError('Contraction hierarchies need non-negative weights; got {} on an edge at {}'.format(weight, label))
+                w = ids[neighbor]
+                if u != w and weight < out_edges[u].get(w, INF):
+                    out_edges[u][w] = weight
+                    in_edges[w][u] = weight
+        # (u, w) -> the contracted node a shortcut u -> w skips
+        middles: Dict[Tuple[int, int], int] = {}
+        # (u, w) -> how many original edges the edge u -> w stands for
+        hops: Dict[Tuple[int, int], int] = {(u, w): 1 for u in range(node_count) for w in out_edges[u]}
+
+        contracted_neighbors = [0] * node_count
+        levels = [0] * node_count
+        ranks = array('q', [-1]) * node_count
+        forward: List[UpwardEdges] = [{} for _ in range(node_count)]
+        backward: List[UpwardEdges] = [{} for _ in range(node_count)]
+
+        def priority(node: int, shortcuts: List[Tuple[int, int, float]]) -> int:
+            edge_difference = len(shortcuts) - len(in_edges[node]) - len(out_edges[node])
+            hop_difference = (
+                sum(hops[u, node] + hops[node, w] for u, w, _ in shortcuts)
+                - sum(hops[u, node] for u in in_edges[node]) - sum(hops[node, w] for w in out_edges[node])
+            )
+            return edge_difference + 2 * hop_difference + contracted_neighbors[node] + levels[node]
+
+        priorities = [priority(node, _shortcuts_needed(out_edges, in_edges, node)) for node in range(node_count)]
+        heap = [(p, node) for node, p in enumerate(priorities)]
+        heap.sort()
+        rank = 0
+        while heap:
+            p, node = heappop(heap)
+            if ranks[node] >= 0 or p != priorities[node]:
+                continue
+            shortcuts = _shortcuts_needed(out_edges, in_edges, node)
+            priorities[node] = priority(node, shortcuts)
+            if heap and priorities[node] > heap[0][0]:
+                heappush(heap, (priorities[node], node))
+                continue
+
+            for u, w, weight in shortcuts:
+                if weight < out_edges[u].get(w, INF):
+                    out_edges[u][w] = weight
+                    in_edges[w][u] = weight
+                    middles[u, w] = node
+                    hops[u, w] = hops[u, node] + hops[node, w]
+
+            # every edge still attached leads to a node contracted later, i.e. ranked higher
+            ranks[node] = rank
+            rank += 1
+            forward[node] = {w: (weight, middles.get((node, w), -1)) for w, weight in out_edges[node].items()}
+            backward[node] = {u: (weight, middles.get((u, node), -1)) for u, weight in in_edges[node].items()}
+            neighbors = set(out_edges[node]) | set(in_edges[node])
+            for w in out_edges[node]:
+                del in_edges[w][node]
+            for u in in_edges[node]:
+                del out_edges[u][node]
+            out_edges[node].clear()
+            in_edges[node].clear()
+
+            for neighbor in neighbors:
+                contracted_neighbors[neighbor] += 1
+                levels[neighbor] = max(levels[neighbor], levels[node] + 1)
+                priorities[neighbor] = priority(neighbor, _shortcuts_needed(out_edges, in_edges, neighbor))
+                heappush(heap, (priorities[neighbor], neighbor))
+
+        return cls(labels, ranks, forward, backward)
+
+    @property
+    def shortcut_count(self) -> int:
+        return sum(middle >= 0 for edges in self.forward + self.backward for _, middle in edges.values())
+
+    def query(self, start_node: Any, target_node: Any) -> Tuple[float, List[Any], int]:
+        """
+        Returns (distance, path, nodes settled) from start_node to target_node, or (inf, [], settled),
+        like dijkstra.bidirectional_dijkstra.
+
+        The forward search from start_node follows forward edges and the backward search from target_node
+        follows backward edges, smaller frontier first. The searches only climb, so they cannot stop as soon
+        as they meet: a side is done once its nearest unsettled node is no closer than the best meeting so far.
+        A node that a higher ranked node on the same side reaches by a shorter way down is settled but not
+        expanded (stall on demand), which prunes most of the search above the first levels.
+        """
+        if start_node not in self.ids or target_node not in self.ids:
+            return (0, [start_node], 0) if start_node == target_node else (INF, [], 0)
+        start, target = self.ids[start_node], self.ids[target_node]
+        weights = self._weights
+        distances: Tuple[Dict[int, float], Dict[int, float]] = ({start: 0}, {target: 0})
+        predecessors: Tuple[Dict[int, int], Dict[int, int]] = ({start: -1}, {target: -1})
+        heaps = ([(0, start)], [(0, target)])
+        best, meeting_node = (0, start) if start == target else (INF, -1)
+        settled = 0
+
+        while True:
+            forward_top = heaps[0][0][0] if heaps[0] else INF
+            backward_top = heaps[1][0][0] if heaps[1] else INF
+            if min(forward_top, backward_top) >= best:
+                break
+            side = 0 if forward_top <= backward_top else 1
+            side_distances, other_distances = distances[side], distances[1 - side]
+            distance, node = heappop(heaps[side])
+            if distance > side_distances[node]:
+                continue
+            settled += 1
+            if node in other_distances and distance + other_distances[node] < best:
+                best = distance + other_distances[node]
+                meeting_node = node
+            # stall on demand: if a higher ranked node this side has reached gets here by a shorter way
+            # down, this distance is not the shortest one, and nothing found through node could be either
+            for higher, weight in weights[1 - side][node].items():
+                if side_distances.get(higher, INF) + weight < distance:
+                    break
+            else:
+                for neighbor, weight in weights[side][node].items():
+                    new_distance = distance + weight
+                    if new_distance < side_distances.get(neighbor, INF):
+                        side_distances[neighbor] = new_distance
+                        predecessors[side][neighbor] = node
+                        heappush(heaps[side], (new_distance, neighbor))
+
+        if meeting_node < 0:
+            return INF, [], settled
+        # the path in the hierarchy, start -> meeting node -> target, may still contain shortcuts
+        hierarchy_path = []
+        node = meeting_node
+        while node >= 0:
+            hierarchy_path.append(node)
+            node = predecessors[0][node]
+        hierarchy_path.reverse()
+        node = predecessors[1][meeting_node]
+        while node >= 0:
+            hierarchy_path.append(node)
+            node = predecessors[1][node]
+
+        path = [hierarchy_path[0]]
+        for u, w in zip(hierarchy_path, hierarchy_path[1:]):
+            self._unpack_edge(u, w, path)
+        return best, [self.labels[node] for node in path], settled
+
+    def _unpack_edge(self, u: int, w: int, path: List[int]) -> None:
+        """Appends the nodes after u on the original edges that the (possibly shortcut) edge u -> w stands for."""
+        stack = [(u, w)]
+        while stack:
+            u, w = stack.pop()
+            if self.ranks[w] > self.ranks[u]:
+                _, middle = self.forward[u][w]
+            else:
+                _, middle = self.backward[w][u]
+            if middle < 0:
+                path.append(w)
+            else:
+                # u -> middle is expanded first, so it is pushed last
+                stack.append((middle, w))
+                stack.append((u, middle))
+
+    def save(self, path: str) -> None:
+        """Writes the index as JSON, so node labels must be strings or numbers."""
+        with open(path, 'w') as f:
+            json.dump({
+                'labels': self.labels,
+                'ranks': self.ranks.tolist(),
+                'forward': [[[w, weight, middle] for w, (weight, middle) in edges.items()] for edges in self.forward],
+                'backward': [[[u, weight, middle] for u, (weight, middle) in edges.items()] for edges in self.backward],
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'ContractionHierarchy':
+        """Reads an index written by save."""
+        with open(path) as f:
+            data = json.load(f)
+        return cls(
+            data['labels'],
+            array('q', data['ranks']),
+            [{w: (weight, middle) for w, weight, middle in edges} for edges in data['forward']],
+            [{u: (weight, middle) for u, weight, middle in edges} for edges in data['backward']],
+        )
+
+
+def benchmark_queries(width: int = 40, height: int = 40, queries: int = 200, seed: int = 0) -> None:
+    """Builds an index on a grid road graph and compares its query latency with plain and bidirectional Dijkstra."""
+    rng = Random(seed)
+    graph, _ = get_grid_road_graph(width, height, rng)
+    reverse_graph = get_reverse_graph(graph)
+
+    start = perf_counter()
+    hierarchy = ContractionHierarchy.build(graph)
+    edge_count = sum(len(edges) for edges in graph.values())
+    print('Contracted {}x{} grid road graph ({} nodes, {} edges) in {:.2f}s, adding {} shortcuts ({:.2f} per edge)'.format(
+        width, height, len(hierarchy.labels), edge_count, perf_counter() - start,
+        hierarchy.shortcut_count, hierarchy.shortcut_count / edge_count))
+
+    pairs = [(rng.randrange(len(graph)), rng.randrange(len(graph))) for _ in range(queries)]
+    expected = {pair: weighted_dijkstra(graph, *pair)[0][pair[1]] for pair in pairs}
+    methods = (
+        ('dijkstra', lambda s, t: (lambda distances: (distances[t], None, len(distances)))(weighted_dijkstra(graph, s, t)[0])),
+        ('bidirectional', lambda s, t: bidirectional_dijkstra(graph, s, t, reverse_graph)),
+        ('contraction hierarchy', hierarchy.query),
+    )
+    for name, query in methods:
+        settled = 0
+        start = perf_counter()
+        for pair in pairs:
+            distance, _, query_settled = query(*pair)
+            assert abs(distance - expected[pair]) < 1e-9, '{} got {} for {}'.format(name, distance, pair)
+            settled += query_settled
+        elapsed = perf_counter() - start
+        print('{:>22}: {:.3f} ms per query, {:.1f} nodes settled'.format(name, 1000 * elapsed / queries, settled / queries))
+
+
+def main() -> None:
+    weighted_graph = {
+        'A': [('B', 7), ('C', 2), ('D', 12)],
+        'B': [('D', 1)],
+        'C': [('B', 3), ('E', 8)],
+        'D': [('E', 2)],
+        'E': [],
+    }
+    print('Weighted graph: {}'.format(weighted_graph))
+    hierarchy = ContractionHierarchy.build(weighted_graph)
+    print('Contraction order: {}'.format(sorted(hierarchy.labels, key=lambda label: hierarchy.ranks[hierarchy.ids[label]])))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'hierarchy.json')
+        hierarchy.save(path)
+        loaded = ContractionHierarchy.load(path)
+    print('A to E from the reloaded index (distance, path, settled): {}'.format(loaded.query('A', 'E')))
+
+    print()
+    benchmark_queries()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Demonstrates counting sort, for integers drawn from a small range."""
+
+from array import array
+from typing import Any, Callable, List, MutableSequence, Optional, Sequence, Union
+
+from radix_sort import lsd_radix_argsort, lsd_radix_sort
+from sort_demo_helpers import OperationTrace, SortOperationType, TraceMode, apply_permutation, as_slice_values, print_sort_op_results
+
+INIT, STORE, COPY_LIST = SortOperationType.INIT.code, SortOperationType.STORE.code, SortOperationType.COPY_LIST.code
+
+# value spans wider than this many tallies per item (and than COUNTING_MIN_SPAN) are handed to radix sort,
+# whose memory doesn't grow with the span: three values across +-1e9 would otherwise need 2e9 tallies
+COUNTING_SPAN_FACTOR = 4
+COUNTING_MIN_SPAN = 1 << 16
+
+
+def span_too_wide(lo: int, hi: int, n: int) -> bool:
+    """Returns whether counting n values from lo to hi would take too many tallies compared to n."""
+    return hi - lo + 1 > max(COUNTING_SPAN_FACTOR * n, COUNTING_MIN_SPAN)
+
+
+def _stable_counting_order(keys: List[int], record: Optional[Callable[..., None]] = None) -> List[int]:
+    """Returns the indexes of keys in ascending key order, equal keys in index order (prefix sums over tallies)."""
+    lo = min(keys)
+    starts = [0] * (max(keys) - lo + 1)
+    if record:
+        record(INIT, 0, len(starts))
+    for i, k in enumerate(keys):
+        starts[k - lo] += 1
+        if record:
+            record(STORE, i, k - lo)
+
+    total = 0
+    for bucket, count in enumerate(starts):
+        starts[bucket] = total
+        total += count
+
+    order = [0] * len(keys)
+    for i, k in enumerate(keys):
+        order[starts[k - lo]] = i
+        starts[k - lo] += 1
+    return order
+
+
+def counting_argsort(
+        lst: Sequence,
+        trace: Optional[OperationTrace] = None,
+        key: Optional[Callable[[Any], int]] = None,
+        reverse: bool = False,
+    ) -> array:
+    """
+    Returns the stable permutation that sorts lst by key (ints) as an array('q'), leaving lst untouched.
+    Runs in O(n + k) like counting_sort (handing wide spans to lsd_radix_argsort the same way),
+    recording into trace if one is given.
+    """
+    if not len(lst):
+        return array('q')
+    keys = [key(item) for item in lst] if key is not None else list(lst)
+    if reverse:
+        keys = [-k for k in keys]
+    if span_too_wide(min(keys), max(keys), len(keys)):
+        return lsd_radix_argsort(keys, trace)
+    return array('q', _stable_counting_order(keys, trace.recorder() if trace is not None else None))
+
+
+def counting_sort(
+        lst: MutableSequence,
+        trace: Optional[OperationTrace] = None,
+        key: Optional[Callable[[Any], int]] = None,
+        reverse: bool = False,
+    ) -> Union[List[str], OperationTrace]:
+    """
+    Sorts a list, array or memoryview of ints in place in O(n + k), where k is max(lst) - min(lst) + 1,
+    by tallying each value and then writing each value back out as one repeated slice. If k is too large
+    for n (see span_too_wide), lst is sorted by lsd_radix_sort instead.
+
+    With key (which must return ints) or reverse, each key is computed once and items are
+    placed by counting_argsort's prefix sums over the key tallies instead, which is stable.
+    Returns a list of operations, or records into and returns trace if one is given.
+    """
+    recording = trace if trace is not None else OperationTrace(TraceMode.STRUCTURED)
+    record = recording.recorder()
+
+    if lst and (key is not None or reverse):
+        apply_permutation(lst, counting_argsort(lst, recording, key, reverse))
+    elif lst and span_too_wide(min(lst), max(lst), len(lst)):
+        lsd_radix_sort(lst, recording)
+    elif lst:
+        lo = min(lst)
+        counts = [0] * (max(lst) - lo + 1)
+        if record:
+            record(INIT, 0, len(counts))
+            for i, val in enumerate(lst):
+                counts[val - lo] += 1
+                record(STORE, i, val - lo)
+        else:
+            for val in lst:
+                counts[val - lo] += 1
+
+        k = 0
+        for offset, count in enumerate(counts):
+            if not count:
+                continue
+            lst[k:k+count] = as_slice_values(lst, [lo + offset]) * count
+            if record:
+                record(COPY_LIST, k, k+count)
+            k += count
+
+    return list(recording.render()) if trace is None else trace
+
+
+def main() -> None:
+    print_sort_op_results(counting_sort, None)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,44 +1,254 @@
 """Demo of Dijkstra's algorithm: https://en.wikipedia.org/wiki/Dijkstra%27s_algorithm """
 
-from typing import Any, Dict, List
+from heapq import heappop, heappush
+from itertools import count
+from math import hypot
+from random import Random
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def weighted_dijkstra(
+        graph: Dict[Any, List[Tuple[Any, float]]],
+        start_node: Any,
+        target_node: Any = None,
+        on_relax: Optional[Callable[[Any, float], None]] = None,
+    ) -> Tuple[Dict[Any, float], Dict[Any, Any]]:
+    """
+    Returns (distances, predecessors) from start_node over a graph of (neighbor, weight) lists,
+    in O((V + E) log V) with a binary heap.
+
+    distances holds every settled node; with target_node, the search stops as soon as that node
+    is settled, so only nodes at most as far away are included. predecessors maps each node reached
+    to the node before it on the best path found (start_node maps to None); see reconstruct_path.
+    on_relax(node, distance) is called whenever a shorter distance to node is found.
+    """
+    distances: Dict[Any, float] = {}
+    tentative: Dict[Any, float] = {start_node: 0}
+    predecessors: Dict[Any, Any] = {start_node: None}
+    # the counter breaks distance ties so nodes themselves never have to be comparable
+    tie_breaker = count()
+    heap = [(0, next(tie_breaker), start_node)]
+
+    while heap:
+        distance, _, node = heappop(heap)
+        # lazy deletion: entries superseded by a shorter distance stay in the heap and are skipped here
+        if node in distances:
+            continue
+        distances[node] = distance
+        if node == target_node:
+            break
+
+        for neighbor, weight in graph.get(node, ()):
+            if weight < 0:
+                raise ValueError('Dijkstra needs non-negative weights; {} -> {} has {}'.format(node, neighbor, weight))
+            new_distance = distance + weight
+            if neighbor not in distances and (neighbor not in tentative or new_distance < tentative[neighbor]):
+                tentative[neighbor] = new_distance
+                predecessors[neighbor] = node
+                heappush(heap, (new_distance, next(tie_breaker), neighbor))
+                if on_relax:
+                    on_relax(neighbor, new_distance)
+
+    return distances, predecessors
+
+
+def reconstruct_path(predecessors: Dict[Any, Any], target_node: Any) -> List[Any]:
+    """Returns the path from the start node to target_node, or [] if target_node was not reached."""
+    if target_node not in predecessors:
+        return []
+    path = [target_node]
+    while predecessors[path[-1]] is not None:
+        path.append(predecessors[path[-1]])
+    path.reverse()
+    return path
+
+
+def shortest_path(
+        graph: Dict[Any, List[Tuple[Any, float]]],
+        start_node: Any,
+        target_node: Any,
+    ) -> Tuple[float, List[Any]]:
+    """Returns (distance, path) from start_node to target_node, or (inf, []) if it can't be reached."""
+    distances, predecessors = weighted_dijkstra(graph, start_node, target_node)
+    if target_node not in distances:
+        return float('inf'), []
+    return distances[target_node], reconstruct_path(predecessors, target_node)
 
 
 def dijkstra_shortest_paths(graph: Dict[Any, List[Any]], start_node: Any, print_distances: bool = False) -> Dict[Any, int]:
-    all_shortest_paths = {start_node: 0}
-    current_node = start_node
+    """Returns the number of edges on the shortest path to each node reachable from start_node."""
+    unit_weight_graph = {node: [(neighbor, 1) for neighbor in neighbors] for node, neighbors in graph.items()}
+
+    def print_distance(node: Any, distance: float) -> None:
+        print("Distance to {}: {}".format(node, distance))
+
+    distances, _ = weighted_dijkstra(unit_weight_graph, start_node, on_relax=print_distance if print_distances else None)
+    return distances
+
+
+def get_reverse_graph(graph: Dict[Any, List[Tuple[Any, float]]]) -> Dict[Any, List[Tuple[Any, float]]]:
+    """Returns the graph with every edge flipped, for searching backward from a target."""
+    reverse_graph: Dict[Any, List[Tuple[Any, float]]] = {node: [] for node in graph}
+    for node, edges in graph.items():
+        for neighbor, weight in edges:
+            reverse_graph.setdefault(neighbor, []).append((node, weight))
+    return reverse_graph
+
+
+def bidirectional_dijkstra(
+        graph: Dict[Any, List[Tuple[Any, float]]],
+        start_node: Any,
+        target_node: Any,
+        reverse_graph: Optional[Dict[Any, List[Tuple[Any, float]]]] = None,
+    ) -> Tuple[float, List[Any], int]:
+    """
+    Returns (distance, path, nodes settled) from start_node to target_node, or (inf, [], settled).
 
-    # I use dicts here just to give a slight speed boost in finding nodes in the set
-    visited_nodes = {}
-    unvisited_nodes = {start_node: None}
+    Searches forward from start_node and backward from target_node (over reverse_graph, built from
+    graph if not given), always advancing the side with the nearer frontier. best is the shortest
+    start -> target path seen through any node reached from both sides; once the two frontiers'
+    distances add up to at least best, no path through an unsettled node can beat it.
+    """
+    reverse_graph = reverse_graph if reverse_graph is not None else get_reverse_graph(graph)
+    graphs = (graph, reverse_graph)
+    settled_distances: Tuple[Dict[Any, float], Dict[Any, float]] = ({}, {})
+    tentative: Tuple[Dict[Any, float], Dict[Any, float]] = ({start_node: 0}, {target_node: 0})
+    predecessors: Tuple[Dict[Any, Any], Dict[Any, Any]] = ({start_node: None}, {target_node: None})
+    tie_breaker = count()
+    heaps = ([(0, next(tie_breaker), start_node)], [(0, next(tie_breaker), target_node)])
+    best, meeting_node = (0, start_node) if start_node == target_node else (float('inf'), None)
+    settled = 0
 
-    while unvisited_nodes:
-        for neighbor_node in graph[current_node]:
+    while heaps[0] and heaps[1] and heaps[0][0][0] + heaps[1][0][0] < best:
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        other = 1 - side
+        distance, _, node = heappop(heaps[side])
+        if node in settled_distances[side]:
+            continue
+        settled_distances[side][node] = distance
+        settled += 1
 
-            # skip node if already marked as visited
-            if neighbor_node in visited_nodes:
-                if neighbor_node in unvisited_nodes:
-                    del unvisited_nodes[neighbor_node]
-                continue
+        for neighbor, weight in graphs[side].get(node, ()):
+            if weight < 0:
+                raise ValueError('Dijkstra needs non-negative weights; got {} on an edge at {}'.format(weight, node))
+            new_distance = distance + weight
+            if neighbor not in settled_distances[side] and (
+                    neighbor not in tentative[side] or new_distance < tentative[side][neighbor]):
+                tentative[side][neighbor] = new_distance
+                predecessors[side][neighbor] = node
+                heappush(heaps[side], (new_distance, next(tie_breaker), neighbor))
+            if neighbor in tentative[other] and tentative[side][neighbor] + tentative[other][neighbor] < best:
+                best = tentative[side][neighbor] + tentative[other][neighbor]
+                meeting_node = neighbor
 
-            # mark as unvisited so that we can process all neighbors
-            unvisited_nodes[neighbor_node] = None
+    if meeting_node is None:
+        return float('inf'), [], settled
+    # start -> meeting node from the forward predecessors, then meeting node -> target from the backward ones
+    path = reconstruct_path(predecessors[0], meeting_node)
+    node = predecessors[1][meeting_node]
+    while node is not None:
+        path.append(node)
+        node = predecessors[1][node]
+    return best, path, settled
 
-            # set distance if smaller than one previously set
-            distance = all_shortest_paths[current_node] + 1
-            if print_distances:
-                print("Distance to {}: {}".format(neighbor_node, distance))
-            if neighbor_node not in all_shortest_paths or all_shortest_paths[neighbor_node] > distance:
-                all_shortest_paths[neighbor_node] = distance
-        
-        # mark as visited once all neighbors examined
-        visited_nodes[current_node] = None
-        del unvisited_nodes[current_node]
 
-        # if there are nodes that haven't examined distances of all neighbors, look at the next one
-        if unvisited_nodes:
-            current_node = list(unvisited_nodes.keys())[0]
+def euclidean_heuristic(coordinates: Dict[Any, Tuple[float, float]]) -> Callable[[Any, Any], float]:
+    """
+    Returns a straight-line distance heuristic for a_star. It is admissible when no edge weight is
+    shorter than the straight line between its ends, as on a road map.
+    """
+    def heuristic(node: Any, target_node: Any) -> float:
+        (x1, y1), (x2, y2) = coordinates[node], coordinates[target_node]
+        return hypot(x2 - x1, y2 - y1)
+    return heuristic
 
-    return all_shortest_paths
+
+def a_star(
+        graph: Dict[Any, List[Tuple[Any, float]]],
+        start_node: Any,
+        target_node: Any,
+        heuristic: Optional[Callable[[Any, Any], float]] = None,
+    ) -> Tuple[float, List[Any], int]:
+    """
+    Returns (distance, path, nodes settled) from start_node to target_node, or (inf, [], settled).
+
+    Nodes are expanded in order of distance so far plus heuristic(node, target_node), an estimate of
+    the rest that must never overestimate it (e.g. euclidean_heuristic). Without a heuristic this is
+    Dijkstra with early exit. A node is expanded again if a shorter path to it turns up later, which
+    keeps the result exact for admissible heuristics that are not consistent; each expansion counts as settled.
+    """
+    heuristic = heuristic or (lambda node, target: 0)
+    distances: Dict[Any, float] = {start_node: 0}
+    predecessors: Dict[Any, Any] = {start_node: None}
+    tie_breaker = count()
+    heap = [(heuristic(start_node, target_node), next(tie_breaker), 0, start_node)]
+    settled = 0
+
+    while heap:
+        _, _, distance, node = heappop(heap)
+        if distance > distances[node]:
+            continue
+        settled += 1
+        if node == target_node:
+            return distance, reconstruct_path(predecessors, target_node), settled
+
+        for neighbor, weight in graph.get(node, ()):
+            if weight < 0:
+                raise ValueError('A* needs non-negative weights; {} -> {} has {}'.format(node, neighbor, weight))
+            new_distance = distance + weight
+            if neighbor not in distances or new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                predecessors[neighbor] = node
+                heappush(heap, (new_distance + heuristic(neighbor, target_node), next(tie_breaker), new_distance, neighbor))
+
+    return float('inf'), [], settled
+
+
+def get_grid_road_graph(
+        width: int,
+        height: int,
+        rng: Optional[Random] = None,
+    ) -> Tuple[Dict[int, List[Tuple[int, float]]], Dict[int, Tuple[float, float]]]:
+    """
+    Builds a road-like test graph: nodes on a jittered width x height grid, two-way roads between grid
+    neighbours weighted by their length times a detour factor from 1 to 1.5. Returns (graph, coordinates).
+    """
+    rng = rng or Random()
+    coordinates = {
+        y * width + x: (x + rng.uniform(-0.3, 0.3), y + rng.uniform(-0.3, 0.3))
+        for y in range(height) for x in range(width)
+    }
+    graph: Dict[int, List[Tuple[int, float]]] = {node: [] for node in coordinates}
+    for y in range(height):
+        for x in range(width):
+            node = y * width + x
+            for neighbor in ([node + 1] if x + 1 < width else []) + ([node + width] if y + 1 < height else []):
+                (x1, y1), (x2, y2) = coordinates[node], coordinates[neighbor]
+                weight = hypot(x2 - x1, y2 - y1) * rng.uniform(1, 1.5)
+                graph[node].append((neighbor, weight))
+                graph[neighbor].append((node, weight))
+    return graph, coordinates
+
+
+def compare_point_to_point(width: int = 150, height: int = 150, queries: int = 20, seed: int = 0) -> Dict[str, float]:
+    """Runs the same random queries on a grid road graph with each method and returns the mean nodes settled."""
+    rng = Random(seed)
+    graph, coordinates = get_grid_road_graph(width, height, rng)
+    reverse_graph = get_reverse_graph(graph)
+    heuristic = euclidean_heuristic(coordinates)
+
+    settled_counts: Dict[str, List[int]] = {'dijkstra': [], 'bidirectional': [], 'a_star': []}
+    for _ in range(queries):
+        start_node, target_node = rng.randrange(len(graph)), rng.randrange(len(graph))
+        distances, _ = weighted_dijkstra(graph, start_node, target_node)
+        bidirectional_distance, _, bidirectional_settled = bidirectional_dijkstra(graph, start_node, target_node, reverse_graph)
+        a_star_distance, _, a_star_settled = a_star(graph, start_node, target_node, heuristic)
+        assert abs(bidirectional_distance - distances[target_node]) < 1e-9
+        assert abs(a_star_distance - distances[target_node]) < 1e-9
+        settled_counts['dijkstra'].append(len(distances))
+        settled_counts['bidirectional'].append(bidirectional_settled)
+        settled_counts['a_star'].append(a_star_settled)
+    return {method: sum(counts) / len(counts) for method, counts in settled_counts.items()}
 
 
 def main() -> None:
@@ -61,6 +271,23 @@ def main() -> None:
     for starting_node in graph2.keys():
         print("Shortest paths from {}: {}".format(starting_node, dijkstra_shortest_paths(graph2, starting_node)))
 
+    # the direct road is one hop but not the shortest distance
+    weighted_graph = {
+        'A': [('B', 7), ('C', 2), ('D', 12)],
+        'B': [('D', 1)],
+        'C': [('B', 3), ('E', 8)],
+        'D': [('E', 2)],
+        'E': [],
+    }
+    print("\nWeighted graph:", weighted_graph)
+    distances, predecessors = weighted_dijkstra(weighted_graph, 'A')
+    print("Distances from A: {}".format(distances))
+    print("Path to E: {}".format(reconstruct_path(predecessors, 'E')))
+    print("Stopping once D is settled: {}".format(shortest_path(weighted_graph, 'A', 'D')))
+    print("Bidirectional A to E (distance, path, settled): {}".format(bidirectional_dijkstra(weighted_graph, 'A', 'E')))
+
+    print("\nMean nodes settled per query on a 150x150 grid road graph: {}".format(compare_point_to_point()))
+
 
 if __name__ == '__main__':
     main()
@@ -73,7 +300,6 @@ Distance to C: 1
 Distance to D: 2
 Distance to E: 2
 Distance to F: 2
-Distance to F: 3
 {'A': 0, 'B': 1, 'C': 1, 'D': 2, 'E': 2, 'F': 2}
 
 Second graph: {'nyc': [], 'la': ['pdx'], 'seattle': ['pdx'], 'pdx': ['seattle'], 'denver': ['nyc', 'la']}
@@ -82,4 +308,12 @@ Shortest paths from la: {'la': 0, 'pdx': 1, 'seattle': 2}
 Shortest paths from seattle: {'seattle': 0, 'pdx': 1}
 Shortest paths from pdx: {'pdx': 0, 'seattle': 1}
 Shortest paths from denver: {'denver': 0, 'nyc': 1, 'la': 1, 'pdx': 2, 'seattle': 3}
+
+Weighted graph: {'A': [('B', 7), ('C', 2), ('D', 12)], 'B': [('D', 1)], 'C': [('B', 3), ('E', 8)], 'D': [('E', 2)], 'E': []}
+Distances from A: {'A': 0, 'C': 2, 'B': 5, 'D': 6, 'E': 8}
+Path to E: ['A', 'C', 'B', 'D', 'E']
+Stopping once D is settled: (6, ['A', 'C', 'B', 'D'])
+Bidirectional A to E (distance, path, settled): (8, ['A', 'C', 'B', 'D', 'E'], 4)
+
+Mean nodes settled per query on a 150x150 grid road graph: {'dijkstra': 10586.1, 'bidirectional': 7909.85, 'a_star': 3775.9}
 """
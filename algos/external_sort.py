@@ -0,0 +1,179 @@
+"""
+Demonstrates an external (out-of-core) sort for files of integers that don't fit in memory.
+
+The input is read in chunks that fit in the memory limit, each chunk is sorted in place with introsort
+and spilled to a temporary run file, then the runs are k-way merged through small read/write buffers.
+"""
+
+import os
+from array import array
+from heapq import merge
+from random import randint
+from tempfile import TemporaryDirectory
+from typing import Callable, Iterator, List, MutableSequence, Optional
+
+from quicksort import introsort
+
+ITEM_FORMAT = 'q'
+ITEM_SIZE = array(ITEM_FORMAT).itemsize
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+DEFAULT_MAX_FAN_IN = 64
+
+
+def _read_binary_chunks(path: str, chunk_items: int) -> Iterator[array]:
+    with open(path, 'rb') as f:
+        while True:
+            chunk = array(ITEM_FORMAT)
+            try:
+                chunk.fromfile(f, chunk_items)
+            except EOFError:
+                pass
+            if not chunk:
+                return
+            yield chunk
+
+
+def _read_text_chunks(path: str, chunk_items: int) -> Iterator[array]:
+    """Reads whitespace-separated integers; only one chunk's worth is ever held at once."""
+    chunk = array(ITEM_FORMAT)
+    with open(path, 'r') as f:
+        for line in f:
+            for token in line.split():
+                chunk.append(int(token))
+                if len(chunk) == chunk_items:
+                    yield chunk
+                    chunk = array(ITEM_FORMAT)
+    if chunk:
+        yield chunk
+
+
+def _iter_run(path: str, block_items: int) -> Iterator[int]:
+    """Streams a binary run file back block by block."""
+    for block in _read_binary_chunks(path, block_items):
+        yield from block
+
+
+class _BufferedIntWriter:
+    """Collects values into a fixed-size array and writes it out whenever it fills up."""
+
+    def __init__(self, path: str, block_items: int, binary: bool = True):
+        self._f = open(path, 'wb' if binary else 'w')
+        self._binary = binary
+        self._block_items = block_items
+        self._block = array(ITEM_FORMAT)
+
+    def write(self, value: int) -> None:
+        self._block.append(value)
+        if len(self._block) >= self._block_items:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._block:
+            return
+        if self._binary:
+            self._block.tofile(self._f)
+        else:
+            self._f.write('\n'.join(map(str, self._block)) + '\n')
+        self._block = array(ITEM_FORMAT)
+
+    def close(self) -> None:
+        self.flush()
+        self._f.close()
+
+
+def _merge_runs_to_file(run_paths: List[str], out_path: str, block_items: int, binary: bool = True) -> None:
+    writer = _BufferedIntWriter(out_path, block_items, binary)
+    try:
+        for value in merge(*[_iter_run(path, block_items) for path in run_paths]):
+            writer.write(value)
+    finally:
+        writer.close()
+
+
+def external_sort(
+        input_path: str,
+        output_path: str,
+        memory_limit: int = DEFAULT_MEMORY_LIMIT,
+        binary: bool = True,
+        max_fan_in: int = DEFAULT_MAX_FAN_IN,
+        sort_fnc: Callable[[MutableSequence[int]], None] = introsort,
+        temp_dir: Optional[str] = None,
+    ) -> int:
+    """
+    Sorts the integers in input_path into output_path and returns how many runs were spilled.
+
+    binary files hold native int64s; text files hold whitespace-separated integers and are written
+    back one per line. memory_limit (bytes) bounds both the chunks sorted in memory and the total
+    size of the merge buffers; when there are more than max_fan_in runs they are merged in passes.
+    """
+    chunk_items = max(1, memory_limit // ITEM_SIZE)
+    if max_fan_in < 2:
+        raise ValueError('max_fan_in must be at least 2, got {}'.format(max_fan_in))
+    # checked up front: array.fromfile would only fail on the last chunk, after the others were spilled
+    if binary and os.path.getsize(input_path) % ITEM_SIZE:
+        raise ValueError('{} is {} bytes, which is not a whole number of {}-byte integers'.format(
+            input_path, os.path.getsize(input_path), ITEM_SIZE))
+
+    with TemporaryDirectory(dir=temp_dir) as tmp:
+        read_chunks = _read_binary_chunks if binary else _read_text_chunks
+        run_paths = []
+        for chunk in read_chunks(input_path, chunk_items):
+            sort_fnc(chunk)
+            run_path = os.path.join(tmp, 'run{}.bin'.format(len(run_paths)))
+            with open(run_path, 'wb') as f:
+                chunk.tofile(f)
+            run_paths.append(run_path)
+            del chunk
+        spilled_runs = len(run_paths)
+
+        # one read buffer per input run plus one write buffer share the memory limit
+        block_items = max(1, chunk_items // (min(max(spilled_runs, 1), max_fan_in) + 1))
+        merge_pass = 0
+        while len(run_paths) > max_fan_in:
+            merged_paths = []
+            for i in range(0, len(run_paths), max_fan_in):
+                merged_path = os.path.join(tmp, 'pass{}_run{}.bin'.format(merge_pass, len(merged_paths)))
+                group = run_paths[i:i + max_fan_in]
+                _merge_runs_to_file(group, merged_path, block_items)
+                for path in group:
+                    os.remove(path)
+                merged_paths.append(merged_path)
+            run_paths = merged_paths
+            merge_pass += 1
+
+        _merge_runs_to_file(run_paths, output_path, block_items, binary)
+
+    return spilled_runs
+
+
+def write_random_int_file(path: str, count: int, binary: bool = True, min_val: int = 1, max_val: int = 10**9) -> None:
+    """Writes count random integers to path without building them all in memory first."""
+    writer = _BufferedIntWriter(path, 1 << 16, binary)
+    try:
+        for _ in range(count):
+            writer.write(randint(min_val, max_val))
+    finally:
+        writer.close()
+
+
+def main() -> None:
+    with TemporaryDirectory() as tmp:
+        for binary in (True, False):
+            input_path = os.path.join(tmp, 'input')
+            output_path = os.path.join(tmp, 'output')
+            write_random_int_file(input_path, 100000, binary)
+
+            # 8 KB holds 1024 values, so this spills about 100 runs and needs two merge passes
+            runs = external_sort(input_path, output_path, memory_limit=8 * 1024, binary=binary, max_fan_in=16)
+
+            if binary:
+                result = list(_iter_run(output_path, 1 << 16))
+            else:
+                with open(output_path) as f:
+                    result = [int(line) for line in f]
+            print('{} file: {} runs spilled; sorted correctly? {}'.format(
+                'Binary' if binary else 'Text', runs, len(result) == 100000 and result == sorted(result)))
+
+
+if __name__ == '__main__':
+    main()
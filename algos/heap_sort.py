@@ -1,31 +1,163 @@
 """Demonstrates heapsort."""
 
-from heapq import heapify, heappop
-from typing import List
+from typing import Any, Callable, List, MutableSequence, Optional, Union
 
-from sort_demo_helpers import SortOperationType, print_sort_op_results
+from sort_demo_helpers import OperationTrace, SortOperationType, TraceMode, apply_permutation, print_sort_op_results, sort_with_key
 
+COMPARE, LOAD_HEAP, POP_HEAP = (
+    SortOperationType.COMPARE.code,
+    SortOperationType.LOAD_HEAP.code,
+    SortOperationType.POP_HEAP.code,
+)
 
-def heapsort(lst: List[int]) -> List[str]:
-    """Returns a list of operations done during heapsort."""
-    operations = []
 
-    heap = list(lst)
-    operations.append(SortOperationType.COPY_LIST.get_sort_operation_str(lst))
-    heapify(heap)
-    for _ in lst:
-        operations.append(SortOperationType.LOAD_HEAP.get_sort_operation_str(heap))
+def heapsort(
+        lst: MutableSequence,
+        trace: Optional[OperationTrace] = None,
+        key: Optional[Callable[[Any], Any]] = None,
+        reverse: bool = False,
+    ) -> Union[List[str], OperationTrace]:
+    """
+    Sorts lst in place with heapsort_range, using O(1) extra space.
+    Returns a list of operations, or records into and returns trace if one is given.
+    """
+    if key is not None or reverse:
+        return sort_with_key(heapsort, lst, trace, key, reverse)
 
-    for i in range(len(lst)):
-        lst[i] = heappop(heap)
-        operations.append(SortOperationType.POP_HEAP.get_sort_operation_str(
-            lst=lst, index=i, value=lst[i], heap=heap))
+    recording = trace if trace is not None else OperationTrace(TraceMode.STRUCTURED)
+    heapsort_range(lst, 0, len(lst) - 1, recording.recorder())
+    return list(recording.render()) if trace is None else trace
+
+
+def _sift_down(lst: MutableSequence, lo: int, root: int, end: int) -> None:
+    """
+    Restores the max-heap property below root for the heap stored in lst[lo:end] (root is relative to lo).
+
+    Floyd's bottom-up variant: walk the hole all the way down along the larger children (one comparison
+    per level), then sift the root value back up from the leaf. The displaced value almost always belongs
+    near the bottom, so this takes about half the comparisons of checking it against both children per level.
+    """
+    size = end - lo
+    val = lst[lo + root]
+    pos = root
+    child = 2 * pos + 1
+    while child < size:
+        if child + 1 < size and lst[lo + child] < lst[lo + child + 1]:
+            child += 1
+        lst[lo + pos] = lst[lo + child]
+        pos = child
+        child = 2 * pos + 1
+
+    while pos > root:
+        parent = (pos - 1) // 2
+        if not lst[lo + parent] < val:
+            break
+        lst[lo + pos] = lst[lo + parent]
+        pos = parent
+    lst[lo + pos] = val
+
+
+def _sift_down_min(lst: MutableSequence, lo: int, root: int, end: int) -> None:
+    """Same as _sift_down, but for a min heap."""
+    size = end - lo
+    val = lst[lo + root]
+    pos = root
+    child = 2 * pos + 1
+    while child < size:
+        if child + 1 < size and lst[lo + child + 1] < lst[lo + child]:
+            child += 1
+        lst[lo + pos] = lst[lo + child]
+        pos = child
+        child = 2 * pos + 1
+
+    while pos > root:
+        parent = (pos - 1) // 2
+        if not val < lst[lo + parent]:
+            break
+        lst[lo + pos] = lst[lo + parent]
+        pos = parent
+    lst[lo + pos] = val
+
+
+def heapsort_range(
+        lst: MutableSequence,
+        lo: int,
+        hi: int,
+        record: Optional[Callable[..., None]] = None,
+    ) -> None:
+    """Sorts lst[lo:hi + 1] in place with a max heap built inside that slice (O(1) extra space)."""
+    end = hi + 1
+    for root in range((end - lo) // 2 - 1, -1, -1):
+        _sift_down(lst, lo, root, end)
+    if record:
+        for i in range(lo, end):
+            record(LOAD_HEAP, i)
+
+    for last in range(hi, lo, -1):
+        lst[lo], lst[last] = lst[last], lst[lo]
+        _sift_down(lst, lo, 0, last)
+        if record:
+            record(POP_HEAP, last)
+
+
+def partial_sort(
+        lst: MutableSequence,
+        k: int,
+        largest: bool = False,
+        record: Optional[Callable[..., None]] = None,
+        key: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+    """
+    Rearranges lst in place so lst[:k] holds its k smallest values in ascending order
+    (or, with largest, its k largest values in descending order); the rest is left unordered.
+
+    lst[:k] is kept as a heap of the best k values seen so far while the rest of lst is scanned once,
+    so this takes O(n log k) time and O(1) extra space and stops after k pops instead of n.
+    With key, keys are computed once and (key, index) pairs are selected instead (O(n) extra space),
+    which also keeps equal keys in input order.
+    """
+    if key is not None:
+        decorated = [(key(item), -i if largest else i) for i, item in enumerate(lst)]
+        partial_sort(decorated, k, largest, record)
+        apply_permutation(lst, [-i if largest else i for _, i in decorated])
+        return
+
+    n = len(lst)
+    k = min(k, n)
+    if k <= 0:
+        return
+    sift = _sift_down_min if largest else _sift_down
+
+    for root in range(k // 2 - 1, -1, -1):
+        sift(lst, 0, root, k)
+    if record:
+        for i in range(k):
+            record(LOAD_HEAP, i)
+
+    # lst[0] is the worst of the current k best; anything better replaces it
+    for i in range(k, n):
+        if record:
+            record(COMPARE, i, 0)
+        if (lst[0] < lst[i]) if largest else (lst[i] < lst[0]):
+            lst[0], lst[i] = lst[i], lst[0]
+            sift(lst, 0, 0, k)
+
+    for last in range(k - 1, 0, -1):
+        lst[0], lst[last] = lst[last], lst[0]
+        sift(lst, 0, 0, last)
+        if record:
+            record(POP_HEAP, last)
 
-    return operations
 
 def main() -> None:
     print_sort_op_results(heapsort, [5, 8, 9, 2, 6, 1, 7, 2, 4])
 
+    lst = [5, 8, 9, 2, 6, 1, 7, 2, 4]
+    partial_sort(lst, 3)
+    print('\n3 smallest of [5, 8, 9, 2, 6, 1, 7, 2, 4]: {}'.format(lst[:3]))
+    partial_sort(lst, 3, largest=True)
+    print('3 largest: {}'.format(lst[:3]))
+
 
 if __name__ == '__main__':
     main()
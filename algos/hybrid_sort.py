@@ -0,0 +1,314 @@
+"""
+Demonstrates an adaptive sort that profiles its input from a small sample and hands it to the engine
+that suits that shape: insertion sort, timsort, counting sort, LSD radix sort, MSD string radix or introsort.
+
+Every decision is logged (logger 'hybrid_sort', INFO) with the profile it was based on, and the
+thresholds live in a DispatchPolicy that can be rebuilt from a sort_benchmark JSON report.
+"""
+
+import json
+import logging
+import sys
+from array import array
+from enum import Enum
+from random import Random
+from time import perf_counter
+from typing import Any, Callable, Dict, List, MutableSequence, Optional, Tuple, Union
+
+from counting_sort import counting_sort
+from insertion_sort import insertion_sort_range
+from natural_merge_sort import timsort
+from quicksort import introsort
+from radix_sort import lsd_radix_sort
+from sort_demo_helpers import (
+    ListDistribution, OperationTrace, TraceMode, get_distribution_list, print_sort_op_results, sort_with_key,
+)
+from string_sort import msd_radix_sort
+
+logger = logging.getLogger('hybrid_sort')
+
+DEFAULT_SAMPLE_SIZE = 256
+GOLDEN_RATIO_FRACTION = 0.6180339887
+INTEGER_FORMATS = frozenset('bBhHiIlLqQnN')
+
+
+class SortEngine(Enum):
+    INSERTION = 'insertion'
+    ADAPTIVE_MERGE = 'adaptive_merge'
+    COUNTING = 'counting'
+    RADIX = 'radix'
+    STRING_RADIX = 'string_radix'
+    INTROSORT = 'introsort'
+
+
+class InputProfile:
+    """What hybrid_sort learned about its input; everything but size and value range comes from a sample."""
+
+    def __init__(
+            self,
+            size: int,
+            dtype: str,
+            run_break_ratio: float,
+            duplicate_ratio: float,
+            value_range: Optional[int] = None,
+        ):
+        self.size = size
+        # an array typecode / memoryview format, or 'int', 'str' or 'object' for other sequences
+        self.dtype = dtype
+        # share of sampled neighbouring triples where the direction changes, about runs per item
+        self.run_break_ratio = run_break_ratio
+        # share of sampled values that repeat another sampled value
+        self.duplicate_ratio = duplicate_ratio
+        # max - min, for ints only
+        self.value_range = value_range
+
+    def __repr__(self) -> str:
+        return '{}(size={}, dtype={!r}, run_break_ratio={:.3f}, duplicate_ratio={:.3f}, value_range={})'.format(
+            type(self).__name__, self.size, self.dtype, self.run_break_ratio, self.duplicate_ratio, self.value_range)
+
+
+def _get_dtype(lst: MutableSequence, sample: List[Any]) -> str:
+    if isinstance(lst, array):
+        return lst.typecode
+    if isinstance(lst, memoryview):
+        return lst.format
+    if sample and all(type(x) is int for x in sample):
+        return 'int'
+    if sample and all(type(x) is str for x in sample):
+        return 'str'
+    return 'object'
+
+
+def profile_input(lst: MutableSequence, sample_size: int = DEFAULT_SAMPLE_SIZE) -> InputProfile:
+    """
+    Profiles lst from sample_size neighbouring triples spread over it, so the cost does not grow
+    with len(lst); only an integer value range takes a full min/max pass.
+    """
+    n = len(lst)
+    if n < 3:
+        return InputProfile(n, _get_dtype(lst, list(lst)), 0.0, 0.0)
+
+    if n - 2 <= sample_size:
+        positions = range(n - 2)
+    else:
+        # golden ratio strides cover the list evenly without lining up with periodic data
+        stride = int((n - 2) * GOLDEN_RATIO_FRACTION) or 1
+        positions = [i * stride % (n - 2) for i in range(sample_size)]
+    run_breaks = 0
+    sample = []
+    for i in positions:
+        a, b, c = lst[i], lst[i + 1], lst[i + 2]
+        sample.append(a)
+        # rising then falling or falling then rising: a run of either direction ends at b
+        if (a < b and c < b) or (b < a and b < c):
+            run_breaks += 1
+
+    dtype = _get_dtype(lst, sample)
+    value_range = None
+    if dtype == 'int' or dtype in INTEGER_FORMATS:
+        lo, hi = min(lst), max(lst)
+        # a sample of ints can still miss a float or other type elsewhere in a list
+        if type(lo) is int and type(hi) is int:
+            value_range = hi - lo
+        else:
+            dtype = 'object'
+
+    return InputProfile(
+        size=n,
+        dtype=dtype,
+        run_break_ratio=run_breaks / len(sample),
+        duplicate_ratio=1 - len(set(sample)) / len(sample),
+        value_range=value_range,
+    )
+
+
+class DispatchPolicy:
+    """
+    Thresholds for choose_engine. The defaults come from sort_benchmark runs on CPython 3.11;
+    use from_benchmark to refit them on the machine that will do the sorting.
+    """
+
+    def __init__(
+            self,
+            insertion_max_size: int = 8,
+            presorted_max_run_break_ratio: float = 0.01,
+            counting_max_range_factor: float = 2.0,
+            radix_min_size: int = 512,
+            string_radix_min_size: int = 64,
+            few_unique_min_duplicate_ratio: float = 0.9,
+        ):
+        self.insertion_max_size = insertion_max_size
+        # non-integer data with at most this many run breaks per sampled item goes to timsort
+        self.presorted_max_run_break_ratio = presorted_max_run_break_ratio
+        # ints whose value range is at most this many times their count are counting sorted
+        self.counting_max_range_factor = counting_max_range_factor
+        self.radix_min_size = radix_min_size
+        self.string_radix_min_size = string_radix_min_size
+        # non-integer data this duplicated goes to introsort, whose three-way partitions skip equal values
+        self.few_unique_min_duplicate_ratio = few_unique_min_duplicate_ratio
+
+    def __repr__(self) -> str:
+        return '{}({})'.format(type(self).__name__, ', '.join('{}={!r}'.format(k, v) for k, v in vars(self).items()))
+
+    @classmethod
+    def from_benchmark(cls, report: Dict[str, Any], distribution: str = ListDistribution.RANDOM.value) -> 'DispatchPolicy':
+        """
+        Fits the size thresholds to a sort_benchmark report that includes insertion_sort, quick_sort,
+        counting_sort and lsd_radix_sort results for distribution (random data spans about n values).
+        """
+        medians: Dict[int, Dict[str, float]] = {}
+        for result in report['results']:
+            if result['distribution'] == distribution:
+                medians.setdefault(result['size'], {})[result['algo']] = result['median']
+        policy = cls()
+
+        # insertion sort is kept up to the last size (from the smallest) at which it was fastest
+        insertion_max_size = 0
+        for size in sorted(medians):
+            times = medians[size]
+            if 'insertion_sort' not in times or times['insertion_sort'] > min(times.values()):
+                break
+            insertion_max_size = size
+        policy.insertion_max_size = insertion_max_size
+
+        # radix takes over from the first size at which it beat introsort for good
+        radix_wins = [
+            size for size in sorted(medians)
+            if {'lsd_radix_sort', 'quick_sort'} <= set(medians[size])
+        ]
+        for i, size in enumerate(radix_wins):
+            if all(medians[s]['lsd_radix_sort'] < medians[s]['quick_sort'] for s in radix_wins[i:]):
+                policy.radix_min_size = size
+                break
+        else:
+            policy.radix_min_size = sys.maxsize
+
+        # random data has a value range of about n; if counting sort did not win there, only use it on narrower ranges
+        largest = max(medians, default=None)
+        if largest is not None and 'counting_sort' in medians[largest]:
+            if medians[largest]['counting_sort'] > min(medians[largest].values()):
+                policy.counting_max_range_factor = 0.5
+
+        return policy
+
+
+DEFAULT_POLICY = DispatchPolicy()
+
+
+def choose_engine(profile: InputProfile, policy: DispatchPolicy = DEFAULT_POLICY) -> SortEngine:
+    """
+    Picks the engine for a profile, checking in order: tiny input, no sampled run breaks,
+    integer range and size, heavy duplication, few run breaks, then strings.
+    """
+    if profile.size <= policy.insertion_max_size:
+        return SortEngine.INSERTION
+    # no run breaks sampled at all: a handful of runs, which timsort merges in close to O(n)
+    if profile.run_break_ratio == 0:
+        return SortEngine.ADAPTIVE_MERGE
+    if profile.value_range is not None:
+        if profile.value_range + 1 <= policy.counting_max_range_factor * profile.size:
+            return SortEngine.COUNTING
+        if profile.size >= policy.radix_min_size:
+            return SortEngine.RADIX
+    if profile.duplicate_ratio >= policy.few_unique_min_duplicate_ratio:
+        return SortEngine.INTROSORT
+    if profile.run_break_ratio <= policy.presorted_max_run_break_ratio:
+        return SortEngine.ADAPTIVE_MERGE
+    if profile.dtype == 'str' and profile.size >= policy.string_radix_min_size:
+        return SortEngine.STRING_RADIX
+    return SortEngine.INTROSORT
+
+
+def _run_engine(engine: SortEngine, lst: MutableSequence, trace: OperationTrace) -> None:
+    record = trace.recorder()
+    if engine == SortEngine.INSERTION:
+        insertion_sort_range(lst, 0, len(lst) - 1, record)
+    elif engine == SortEngine.ADAPTIVE_MERGE:
+        timsort(lst, record)
+    elif engine == SortEngine.COUNTING:
+        counting_sort(lst, trace)
+    elif engine == SortEngine.RADIX:
+        lsd_radix_sort(lst, trace)
+    elif engine == SortEngine.STRING_RADIX:
+        msd_radix_sort(lst, record)
+    else:
+        introsort(lst, record=record)
+
+
+def hybrid_sort(
+        lst: MutableSequence,
+        trace: Optional[OperationTrace] = None,
+        key: Optional[Callable[[Any], Any]] = None,
+        reverse: bool = False,
+        policy: Optional[DispatchPolicy] = None,
+    ) -> Union[List[str], OperationTrace]:
+    """
+    Sorts lst in place with whichever engine choose_engine picks for its profile_input.
+    Returns a list of operations, or records into and returns trace if one is given.
+    """
+    if key is not None or reverse:
+        return sort_with_key(hybrid_sort, lst, trace, key, reverse)
+
+    profile = profile_input(lst)
+    engine = choose_engine(profile, policy or DEFAULT_POLICY)
+    logger.info('Sorting with %s: %r', engine.value, profile)
+
+    recording = trace if trace is not None else OperationTrace(TraceMode.STRUCTURED)
+    try:
+        _run_engine(engine, lst, recording)
+    except TypeError:
+        # the sample said ints but some other value was mixed in. Counting and radix sort tally or
+        # distribute into their own storage and only write lst after a full pass, so lst is untouched
+        # and a comparison sort can start over. The other engines hold values outside lst mid-move
+        # (insertion shifts, timsort's merge buffers), so after a failure lst may be missing items.
+        if engine not in (SortEngine.COUNTING, SortEngine.RADIX):
+            raise
+        logger.info('%s failed on mixed types; falling back to introsort', engine.value)
+        introsort(lst, record=recording.recorder())
+    return list(recording.render()) if trace is None else trace
+
+
+def compare_to_engines(size: int = 100000, policy: Optional[DispatchPolicy] = None) -> Dict[str, Tuple[str, float, float]]:
+    """For each distribution, returns (chosen engine, hybrid_sort seconds, best single engine seconds)."""
+    outcomes = {}
+    for distribution in ListDistribution:
+        example = get_distribution_list(distribution, size, Random(0))
+        engine_times = {}
+        # insertion sort is quadratic and string radix only takes strs
+        for engine in (SortEngine.ADAPTIVE_MERGE, SortEngine.COUNTING, SortEngine.RADIX, SortEngine.INTROSORT):
+            lst = list(example)
+            start = perf_counter()
+            _run_engine(engine, lst, OperationTrace(TraceMode.NONE))
+            engine_times[engine.value] = perf_counter() - start
+
+        lst = list(example)
+        start = perf_counter()
+        hybrid_sort(lst, OperationTrace(TraceMode.NONE), policy=policy)
+        elapsed = perf_counter() - start
+        assert lst == sorted(example)
+        chosen = choose_engine(profile_input(example), policy or DEFAULT_POLICY)
+        outcomes[distribution.value] = (chosen.value, elapsed, min(engine_times.values()))
+    return outcomes
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Pass a sort_benchmark JSON report as the only argument to tune the policy from it."""
+    argv = sys.argv[1:] if argv is None else argv
+    logging.basicConfig(level=logging.INFO, format='%(name)s: %(message)s')
+
+    print_sort_op_results(hybrid_sort, None)
+
+    policy = DEFAULT_POLICY
+    if argv:
+        with open(argv[0]) as f:
+            policy = DispatchPolicy.from_benchmark(json.load(f))
+        print('Tuned from {}: {}'.format(argv[0], policy))
+
+    logger.setLevel(logging.WARNING)
+    print('\nHybrid vs. the best single engine on 100000 values:')
+    for distribution, (engine, elapsed, best) in compare_to_engines(100000, policy).items():
+        print('{:>10}: {:>14} {:.4f}s (best engine {:.4f}s)'.format(distribution, engine, elapsed, best))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,35 +1,132 @@
 """Demonstrates insertion sort."""
 
-from typing import List
+from bisect import bisect_right
+from typing import Any, Callable, List, MutableSequence, Optional, Union
 
-from sort_demo_helpers import print_sort_op_results, SortOperationType
+from sort_demo_helpers import print_sort_op_results, sort_with_key, OperationTrace, SortOperationType, TraceMode
 
+INIT, COMPARE, SWITCH, STORE = (
+    SortOperationType.INIT.code,
+    SortOperationType.COMPARE.code,
+    SortOperationType.SWITCH.code,
+    SortOperationType.STORE.code,
+)
 
-def insertion_sort(lst: List[int]) -> List[str]:
-    """Returns a list of operations taken during insertion sort."""
-    operations = []
+
+def insertion_sort(
+        lst: List[int],
+        trace: Optional[OperationTrace] = None,
+        key: Optional[Callable[[Any], Any]] = None,
+        reverse: bool = False,
+    ) -> Union[List[str], OperationTrace]:
+    """Returns a list of operations taken during insertion sort, or records into and returns trace if one is given."""
+    if key is not None or reverse:
+        return sort_with_key(insertion_sort, lst, trace, key, reverse)
+
+    operations = [] if trace is None else None
+    record = trace.recorder() if trace is not None else None
 
     for i in range(1, len(lst)):
-        operations.append('\n' + SortOperationType.INIT.get_sort_operation_str(lst=lst, i=i))
+        if operations is not None:
+            operations.append('\n' + SortOperationType.INIT.get_sort_operation_str(lst=lst, i=i))
+        elif record:
+            record(INIT, i)
 
         val = lst[i]
         j = i - 1
 
         while j >= 0 and val < lst[j]:
-            operations.append('\t' + SortOperationType.COMPARE.get_sort_operation_str(lst=lst, min_idx=i, j=j))
+            if operations is not None:
+                operations.append('\t' + SortOperationType.COMPARE.get_sort_operation_str(lst=lst, min_idx=i, j=j))
+            elif record:
+                record(COMPARE, i, j)
             lst[j+1] = lst[j]
-            operations.append(SortOperationType.SWITCH.get_sort_operation_str(lst=lst, i=j+1, min_idx=j))
+            if operations is not None:
+                operations.append(SortOperationType.SWITCH.get_sort_operation_str(lst=lst, i=j+1, min_idx=j))
+            elif record:
+                record(SWITCH, j+1, j)
             j -= 1
-            operations.append(SortOperationType.STORE.get_sort_operation_str(lst=lst, j=j))
+            if operations is not None:
+                operations.append(SortOperationType.STORE.get_sort_operation_str(lst=lst, j=j))
+            elif record:
+                record(STORE, j)
 
-        operations.append('\t' + SortOperationType.COMPARE.get_sort_operation_str(lst=lst, min_idx=i, j=j))
+        if operations is not None:
+            operations.append('\t' + SortOperationType.COMPARE.get_sort_operation_str(lst=lst, min_idx=i, j=j))
+        elif record:
+            record(COMPARE, i, j)
         lst[j+1] = val
 
-    return operations
+    return operations if trace is None else trace
+
+
+def insertion_sort_range(
+        lst: MutableSequence,
+        lo: int,
+        hi: int,
+        record: Optional[Callable[..., None]] = None,
+    ) -> None:
+    """Sorts lst[lo:hi + 1] in place; used as the small-partition base case of other sorts."""
+    for i in range(lo + 1, hi + 1):
+        val = lst[i]
+        j = i - 1
+        while j >= lo and val < lst[j]:
+            if record:
+                record(COMPARE, i, j)
+                record(SWITCH, j+1, j)
+            lst[j+1] = lst[j]
+            j -= 1
+        if record:
+            record(COMPARE, i, j)
+        lst[j+1] = val
+
+
+def binary_insertion_sort_range(
+        lst: MutableSequence,
+        lo: int,
+        hi: int,
+        start: Optional[int] = None,
+        record: Optional[Callable[..., None]] = None,
+    ) -> None:
+    """
+    Sorts lst[lo:hi + 1] in place, assuming lst[lo:start] is already sorted (start defaults to lo + 1).
+    Insert positions are found with bisect and elements are shifted as one slice, not one at a time.
+    """
+    for i in range(start if start is not None else lo + 1, hi + 1):
+        val = lst[i]
+        pos = bisect_right(lst, val, lo, i)
+        if record:
+            record(COMPARE, i, pos)
+        if pos < i:
+            lst[pos+1:i+1] = lst[pos:i]
+            lst[pos] = val
+            if record:
+                record(SWITCH, pos, i)
+
+
+def binary_insertion_sort(
+        lst: MutableSequence,
+        trace: Optional[OperationTrace] = None,
+        key: Optional[Callable[[Any], Any]] = None,
+        reverse: bool = False,
+    ) -> Union[List[str], OperationTrace]:
+    """
+    Sorts lst in place with binary_insertion_sort_range: O(n log n) comparisons, and each insert
+    shifts its block with one slice assignment. Stable.
+    Returns a list of operations, or records into and returns trace if one is given.
+    """
+    if key is not None or reverse:
+        return sort_with_key(binary_insertion_sort, lst, trace, key, reverse)
+
+    recording = trace if trace is not None else OperationTrace(TraceMode.STRUCTURED)
+    binary_insertion_sort_range(lst, 0, len(lst) - 1, record=recording.recorder())
+    return list(recording.render()) if trace is None else trace
 
 
 def main():
     print_sort_op_results(insertion_sort, None)
+    print()
+    print_sort_op_results(binary_insertion_sort, None)
 
 
 if __name__ == '__main__':
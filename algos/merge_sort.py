@@ -1,41 +1,133 @@
 """Demonstrates mergesort."""
 
-from typing import List
+from array import array
+from typing import Any, Callable, List, MutableSequence, Optional, Union
 
-from sort_demo_helpers import SortOperationType, print_sort_op_results
+from sort_demo_helpers import OperationTrace, SortOperationType, TraceMode, print_sort_op_results, sort_with_key
 
+INIT, COMPARE, COPY_LIST = SortOperationType.INIT.code, SortOperationType.COMPARE.code, SortOperationType.COPY_LIST.code
 
-def merge_sort(lst: List[int], operations: List[str] = []) -> List[str]:
-    operations.append(SortOperationType.INIT.get_sort_operation_str(lst=lst, sort='merge'))
-    if len(lst) <= 1:
+
+def make_scratch_buffer(seq: MutableSequence, length: Optional[int] = None) -> MutableSequence:
+    """
+    Allocates an auxiliary buffer of the same kind (list, array.array or memoryview) as seq,
+    holding a copy of seq or, if length is given, that many placeholder items.
+    """
+    if isinstance(seq, array):
+        return array(seq.typecode, seq) if length is None else array(seq.typecode, bytes(length * seq.itemsize))
+    if isinstance(seq, memoryview):
+        data = bytearray(seq.tobytes()) if length is None else bytearray(length * seq.itemsize)
+        return memoryview(data).cast(seq.format)
+    return list(seq) if length is None else [None] * length
+
+
+def _merge_runs(
+        src: MutableSequence,
+        dst: MutableSequence,
+        lo: int,
+        mid: int,
+        hi: int,
+        record: Optional[Callable[..., None]] = None,
+    ) -> None:
+    """Merges sorted runs src[lo:mid] and src[mid:hi] into dst[lo:hi]; ties take the left run to stay stable."""
+    if record:
+        record(INIT, lo, hi)
+
+    # lone trailing run or runs already in order: one slice copy, no comparisons per item
+    if mid >= hi or src[mid - 1] <= src[mid]:
+        if record:
+            record(COPY_LIST, lo, hi)
+        dst[lo:hi] = src[lo:hi]
         return
-    
-    mid_index = len(lst) // 2
-    left_lst = lst[:mid_index]
-    right_lst = lst[mid_index:]
-
-    operations.append(SortOperationType.COPY_LIST.get_sort_operation_str(left_lst))
-    operations.append(SortOperationType.COPY_LIST.get_sort_operation_str(right_lst))
-    
-    merge_sort(left_lst)
-    merge_sort(right_lst)
-
-    lst_index = 0
-    while left_lst or right_lst:
-        left_value = None if not left_lst else left_lst[0]
-        right_value = None if not right_lst else right_lst[0]
-        operations.append(SortOperationType.COMPARE.get_sort_operation_str(lst, 'merge', lst_index, left_value, right_value))
-
-        if not right_lst or (left_lst and left_value <= right_value):
-            lst[lst_index] = left_lst.pop(0)
+
+    i, j, k = lo, mid, lo
+    left, right = src[i], src[j]
+    while True:
+        if record:
+            record(COMPARE, i, j)
+        if right < left:
+            dst[k] = right
+            k += 1
+            j += 1
+            if j == hi:
+                break
+            right = src[j]
         else:
-            lst[lst_index] = right_lst.pop(0)
-        lst_index += 1
+            dst[k] = left
+            k += 1
+            i += 1
+            if i == mid:
+                break
+            left = src[i]
+
+    # whichever run is left over is already in order
+    if i < mid:
+        if record:
+            record(COPY_LIST, i, mid)
+        dst[k:hi] = src[i:mid]
+    else:
+        if record:
+            record(COPY_LIST, j, hi)
+        dst[k:hi] = src[j:hi]
+
+
+def bottom_up_merge_sort(
+        seq: MutableSequence,
+        scratch: Optional[MutableSequence] = None,
+        record: Optional[Callable[..., None]] = None,
+    ) -> None:
+    """
+    Sorts seq (a list, array.array or writable memoryview) in place in O(n log n).
+
+    Runs of width 1, 2, 4... are merged back and forth between seq and one auxiliary buffer,
+    so no pass copies or slices out sublists. Pass scratch (from make_scratch_buffer, at least
+    len(seq) long) to reuse the same buffer across calls.
+    """
+    n = len(seq)
+    if n < 2:
+        return
+
+    if scratch is None:
+        scratch = make_scratch_buffer(seq)
+    elif len(scratch) < n:
+        raise ValueError('Scratch buffer holds {} items but {} are needed'.format(len(scratch), n))
+
+    src, dst = seq, scratch
+    width = 1
+    while width < n:
+        for lo in range(0, n, 2 * width):
+            _merge_runs(src, dst, lo, min(lo + width, n), min(lo + 2 * width, n), record)
+        src, dst = dst, src
+        width *= 2
+
+    # an odd number of passes leaves the result in the scratch buffer
+    if src is not seq:
+        seq[0:n] = src[0:n]
+
+
+def merge_sort(
+        lst: MutableSequence,
+        trace: Optional[OperationTrace] = None,
+        key: Optional[Callable[[Any], Any]] = None,
+        reverse: bool = False,
+    ) -> Union[List[str], OperationTrace]:
+    """
+    Sorts lst in place with bottom_up_merge_sort.
+    Returns a list of operations, or records into and returns trace if one is given.
+    """
+    if key is not None or reverse:
+        return sort_with_key(merge_sort, lst, trace, key, reverse)
+
+    if trace is not None:
+        bottom_up_merge_sort(lst, record=trace.recorder())
+        return trace
 
-    return operations
+    text_trace = OperationTrace(TraceMode.STRUCTURED)
+    bottom_up_merge_sort(lst, record=text_trace.recorder())
+    return list(text_trace.render())
 
 
-def main() -> None: 
+def main() -> None:
     print_sort_op_results(merge_sort, [5, 7, 3, 9, 5, 6, 1, 1, 2])
 
 
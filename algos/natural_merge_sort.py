@@ -0,0 +1,349 @@
+"""
+Demonstrates an adaptive natural merge sort in the style of Timsort: https://en.wikipedia.org/wiki/Timsort
+
+Existing ascending runs are found and kept, strictly descending runs are reversed, short runs are
+padded out to a minimum length with binary insertion sort, and runs are merged with galloping.
+Nearly sorted input therefore takes close to O(n), and the worst case is still O(n log n).
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, List, MutableSequence, Optional, Union
+
+from insertion_sort import binary_insertion_sort_range
+from merge_sort import make_scratch_buffer
+from sort_demo_helpers import OperationTrace, SortOperationType, TraceMode, print_sort_op_results, sort_with_key
+
+INIT, COMPARE, SWITCH, COPY_LIST = (
+    SortOperationType.INIT.code,
+    SortOperationType.COMPARE.code,
+    SortOperationType.SWITCH.code,
+    SortOperationType.COPY_LIST.code,
+)
+
+MIN_MERGE = 64
+MIN_GALLOP = 7
+
+
+def compute_min_run(n: int) -> int:
+    """Picks a run length in [32, 64] so that n / min_run is close to (but not above) a power of 2."""
+    remainder = 0
+    while n >= MIN_MERGE:
+        remainder |= n & 1
+        n >>= 1
+    return n + remainder
+
+
+def gallop_left(key: Any, lst: MutableSequence, lo: int, hi: int, from_right: bool = False) -> int:
+    """
+    Returns the first index in lst[lo:hi] (sorted) whose value is >= key, probing 1, 3, 7...
+    places in from one end before bisecting, so it is O(log d) when the answer is d from that end.
+    """
+    if not from_right:
+        if lo == hi or not lst[lo] < key:
+            return lo
+        last_less, ofs = lo, 1
+        while lo + ofs < hi and lst[lo + ofs] < key:
+            last_less = lo + ofs
+            ofs = ofs * 2 + 1
+        return bisect_left(lst, key, last_less + 1, min(lo + ofs, hi))
+
+    if lo == hi or lst[hi - 1] < key:
+        return hi
+    first_not_less, ofs = hi - 1, 1
+    while hi - 1 - ofs >= lo and not lst[hi - 1 - ofs] < key:
+        first_not_less = hi - 1 - ofs
+        ofs = ofs * 2 + 1
+    return bisect_left(lst, key, max(hi - ofs, lo), first_not_less)
+
+
+def gallop_right(key: Any, lst: MutableSequence, lo: int, hi: int, from_right: bool = False) -> int:
+    """Like gallop_left, but returns the first index whose value is > key (so equal values stay left)."""
+    if not from_right:
+        if lo == hi or key < lst[lo]:
+            return lo
+        last_not_greater, ofs = lo, 1
+        while lo + ofs < hi and not key < lst[lo + ofs]:
+            last_not_greater = lo + ofs
+            ofs = ofs * 2 + 1
+        return bisect_right(lst, key, last_not_greater + 1, min(lo + ofs, hi))
+
+    if lo == hi or not key < lst[hi - 1]:
+        return hi
+    first_greater, ofs = hi - 1, 1
+    while hi - 1 - ofs >= lo and key < lst[hi - 1 - ofs]:
+        first_greater = hi - 1 - ofs
+        ofs = ofs * 2 + 1
+    return bisect_right(lst, key, max(hi - ofs, lo), first_greater)
+
+
+class _MergeState:
+    """Holds the run stack, the one scratch buffer and the adaptive gallop threshold for a single sort."""
+
+    def __init__(self, lst: MutableSequence, record: Optional[Callable[..., None]] = None):
+        self.lst = lst
+        self.record = record
+        self.min_gallop = MIN_GALLOP
+        self.runs: List[List[int]] = []
+        # merges only ever copy out the smaller run, which is at most half the list
+        self.tmp = make_scratch_buffer(lst, len(lst) // 2 + 1)
+
+    def push_run(self, base: int, length: int) -> None:
+        self.runs.append([base, length])
+        self.merge_collapse()
+
+    def merge_collapse(self) -> None:
+        """Merges until run lengths shrink fast enough from the bottom of the stack up (keeps merges balanced)."""
+        runs = self.runs
+        while len(runs) > 1:
+            n = len(runs) - 2
+            if (n > 0 and runs[n-1][1] <= runs[n][1] + runs[n+1][1]) or \
+                    (n > 1 and runs[n-2][1] <= runs[n-1][1] + runs[n][1]):
+                if runs[n-1][1] < runs[n+1][1]:
+                    n -= 1
+                self.merge_at(n)
+            elif runs[n][1] <= runs[n+1][1]:
+                self.merge_at(n)
+            else:
+                break
+
+    def merge_force_collapse(self) -> None:
+        runs = self.runs
+        while len(runs) > 1:
+            n = len(runs) - 2
+            if n > 0 and runs[n-1][1] < runs[n+1][1]:
+                n -= 1
+            self.merge_at(n)
+
+    def merge_at(self, i: int) -> None:
+        """Merges runs i and i + 1 of the stack."""
+        lst = self.lst
+        base1, len1 = self.runs[i]
+        base2, len2 = self.runs[i+1]
+        self.runs[i][1] = len1 + len2
+        del self.runs[i+1]
+
+        if self.record:
+            self.record(INIT, base1, base2 + len2)
+
+        # the start of run 1 that is <= run 2's first value, and the end of run 2 that is >= run 1's
+        # last value, are already in their final places
+        lo = gallop_right(lst[base2], lst, base1, base2)
+        if lo == base2:
+            return
+        hi = gallop_left(lst[base2 - 1], lst, base2, base2 + len2, from_right=True)
+
+        if base2 - lo <= hi - base2:
+            self.merge_lo(lo, base2, hi)
+        else:
+            self.merge_hi(lo, base2, hi)
+
+    def merge_lo(self, lo: int, mid: int, hi: int) -> None:
+        """Merges left to right, with the (smaller) left run copied out to tmp."""
+        lst, tmp, record = self.lst, self.tmp, self.record
+        len1 = mid - lo
+        tmp[0:len1] = lst[lo:mid]
+        i, j, k = 0, mid, lo
+        # merge_at guarantees run 2 starts below run 1 and run 1 ends above run 2
+        lst[k] = lst[j]
+        k += 1
+        j += 1
+
+        min_gallop = self.min_gallop
+        while i < len1 and j < hi:
+            wins1 = wins2 = 0
+            # one value at a time until one run keeps winning
+            while i < len1 and j < hi and wins1 < min_gallop and wins2 < min_gallop:
+                if record:
+                    record(COMPARE, j, lo + i)
+                if lst[j] < tmp[i]:
+                    lst[k] = lst[j]
+                    j += 1
+                    wins2 += 1
+                    wins1 = 0
+                else:
+                    lst[k] = tmp[i]
+                    i += 1
+                    wins1 += 1
+                    wins2 = 0
+                k += 1
+
+            # galloping: move whole blocks while the winning streaks stay long
+            while i < len1 and j < hi:
+                count1 = gallop_right(lst[j], tmp, i, len1) - i
+                if count1:
+                    lst[k:k+count1] = tmp[i:i+count1]
+                    if record:
+                        record(COPY_LIST, k, k+count1)
+                    k += count1
+                    i += count1
+                    if i == len1:
+                        break
+                lst[k] = lst[j]
+                k += 1
+                j += 1
+                if j == hi:
+                    break
+
+                count2 = gallop_left(tmp[i], lst, j, hi) - j
+                if count2:
+                    lst[k:k+count2] = lst[j:j+count2]
+                    if record:
+                        record(COPY_LIST, k, k+count2)
+                    k += count2
+                    j += count2
+                    if j == hi:
+                        break
+                lst[k] = tmp[i]
+                k += 1
+                i += 1
+
+                min_gallop = max(1, min_gallop - 1)
+                if count1 < MIN_GALLOP and count2 < MIN_GALLOP:
+                    min_gallop += 2
+                    break
+            self.min_gallop = min_gallop
+
+        # whatever is left of run 2 is already in place
+        if i < len1:
+            lst[k:k+len1-i] = tmp[i:len1]
+
+    def merge_hi(self, lo: int, mid: int, hi: int) -> None:
+        """Merges right to left, with the (smaller) right run copied out to tmp."""
+        lst, tmp, record = self.lst, self.tmp, self.record
+        len2 = hi - mid
+        tmp[0:len2] = lst[mid:hi]
+        i, j, k = mid - 1, len2 - 1, hi - 1
+        # merge_at guarantees run 1 ends above run 2's last value
+        lst[k] = lst[i]
+        k -= 1
+        i -= 1
+
+        min_gallop = self.min_gallop
+        while i >= lo and j >= 0:
+            wins1 = wins2 = 0
+            while i >= lo and j >= 0 and wins1 < min_gallop and wins2 < min_gallop:
+                if record:
+                    record(COMPARE, i, mid + j)
+                if tmp[j] < lst[i]:
+                    lst[k] = lst[i]
+                    i -= 1
+                    wins1 += 1
+                    wins2 = 0
+                else:
+                    lst[k] = tmp[j]
+                    j -= 1
+                    wins2 += 1
+                    wins1 = 0
+                k -= 1
+
+            while i >= lo and j >= 0:
+                count1 = i + 1 - gallop_right(tmp[j], lst, lo, i + 1, from_right=True)
+                if count1:
+                    lst[k-count1+1:k+1] = lst[i-count1+1:i+1]
+                    if record:
+                        record(COPY_LIST, k-count1+1, k+1)
+                    k -= count1
+                    i -= count1
+                    if i < lo:
+                        break
+                lst[k] = tmp[j]
+                k -= 1
+                j -= 1
+                if j < 0:
+                    break
+
+                count2 = j + 1 - gallop_left(lst[i], tmp, 0, j + 1, from_right=True)
+                if count2:
+                    lst[k-count2+1:k+1] = tmp[j-count2+1:j+1]
+                    if record:
+                        record(COPY_LIST, k-count2+1, k+1)
+                    k -= count2
+                    j -= count2
+                    if j < 0:
+                        break
+                lst[k] = lst[i]
+                k -= 1
+                i -= 1
+
+                min_gallop = max(1, min_gallop - 1)
+                if count1 < MIN_GALLOP and count2 < MIN_GALLOP:
+                    min_gallop += 2
+                    break
+            self.min_gallop = min_gallop
+
+        # whatever is left of run 1 is already in place
+        if j >= 0:
+            lst[lo:lo+j+1] = tmp[0:j+1]
+
+
+def count_run_and_make_ascending(lst: MutableSequence, lo: int, hi: int, record: Optional[Callable[..., None]] = None) -> int:
+    """
+    Returns the length of the run starting at lo (lst[lo:hi] is the unsorted remainder).
+    A strictly descending run is reversed in place; strictness keeps equal values in order.
+    """
+    run_hi = lo + 1
+    if run_hi == hi:
+        return 1
+
+    if lst[run_hi] < lst[lo]:
+        run_hi += 1
+        while run_hi < hi and lst[run_hi] < lst[run_hi - 1]:
+            run_hi += 1
+        lst[lo:run_hi] = lst[lo:run_hi][::-1]
+        if record:
+            record(SWITCH, lo, run_hi - 1)
+    else:
+        run_hi += 1
+        while run_hi < hi and not lst[run_hi] < lst[run_hi - 1]:
+            run_hi += 1
+
+    return run_hi - lo
+
+
+def timsort(lst: MutableSequence, record: Optional[Callable[..., None]] = None) -> None:
+    """Sorts lst (a list, array.array or writable memoryview) in place; stable."""
+    n = len(lst)
+    if n < 2:
+        return
+
+    state = _MergeState(lst, record)
+    min_run = compute_min_run(n)
+    lo = 0
+    while lo < n:
+        run_len = count_run_and_make_ascending(lst, lo, n, record)
+        if run_len < min_run:
+            forced_len = min(min_run, n - lo)
+            binary_insertion_sort_range(lst, lo, lo + forced_len - 1, lo + run_len, record)
+            run_len = forced_len
+        if record:
+            record(INIT, lo, lo + run_len)
+        state.push_run(lo, run_len)
+        lo += run_len
+
+    state.merge_force_collapse()
+
+
+def natural_merge_sort(
+        lst: MutableSequence,
+        trace: Optional[OperationTrace] = None,
+        key: Optional[Callable[[Any], Any]] = None,
+        reverse: bool = False,
+    ) -> Union[List[str], OperationTrace]:
+    """
+    Sorts lst in place with timsort.
+    Returns a list of operations, or records into and returns trace if one is given.
+    """
+    if key is not None or reverse:
+        return sort_with_key(natural_merge_sort, lst, trace, key, reverse)
+
+    recording = trace if trace is not None else OperationTrace(TraceMode.STRUCTURED)
+    timsort(lst, recording.recorder())
+    return list(recording.render()) if trace is None else trace
+
+
+def main() -> None:
+    print_sort_op_results(natural_merge_sort, None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Demonstrates a multi-core merge sort: chunks are sorted in worker processes, then k-way merged.
+
+The data is copied once into a shared memory block of int64s; each worker attaches to that block
+by name and sorts its own slice in place, so no lists get pickled between processes.
+"""
+
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heapify, heapreplace, heappop
+from multiprocessing.shared_memory import SharedMemory
+from random import randint
+from time import perf_counter
+from typing import Iterable, List, MutableSequence, Optional, Sequence, Tuple
+
+from merge_sort import bottom_up_merge_sort
+
+ITEM_FORMAT = 'q'
+ITEM_SIZE = array(ITEM_FORMAT).itemsize
+
+
+def _sort_shared_chunk(shm_name: str, lo: int, hi: int) -> Tuple[int, int]:
+    """Runs in a worker: sorts items lo:hi of the shared block in place."""
+    shm = SharedMemory(name=shm_name)
+    try:
+        # the views must be released before close(), also when the sort raises
+        with shm.buf.cast(ITEM_FORMAT) as view, view[lo:hi] as chunk:
+            bottom_up_merge_sort(chunk)
+    finally:
+        shm.close()
+    return lo, hi
+
+
+def get_chunk_bounds(n: int, workers: int, chunk_size: Optional[int] = None) -> List[Tuple[int, int]]:
+    """Splits range(n) into (lo, hi) chunks; by default one chunk per worker."""
+    if chunk_size is None:
+        chunk_size = -(-n // workers) if n else 1
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1, got {}'.format(chunk_size))
+    return [(lo, min(lo + chunk_size, n)) for lo in range(0, n, chunk_size)]
+
+
+def k_way_merge(runs: Sequence[Sequence[int]], out: MutableSequence[int]) -> None:
+    """Merges sorted runs into out with a min heap of (head value, run index, position) entries."""
+    heap = [(run[0], run_index, 0) for run_index, run in enumerate(runs) if len(run)]
+    heapify(heap)
+    k = 0
+    while heap:
+        value, run_index, pos = heap[0]
+        out[k] = value
+        k += 1
+        run = runs[run_index]
+        pos += 1
+        if pos < len(run):
+            heapreplace(heap, (run[pos], run_index, pos))
+        else:
+            heappop(heap)
+
+
+def parallel_merge_sort(
+        data: Iterable[int],
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ) -> array:
+    """
+    Returns the values of data sorted, as an array('q').
+
+    workers defaults to os.cpu_count(); chunk_size defaults to an even split across workers.
+    Values must fit in a signed 64-bit integer.
+    """
+    values = data if isinstance(data, array) and data.typecode == ITEM_FORMAT else array(ITEM_FORMAT, data)
+    n = len(values)
+    workers = workers or os.cpu_count() or 1
+    if n < 2:
+        return array(ITEM_FORMAT, values)
+
+    shm = SharedMemory(create=True, size=n * ITEM_SIZE)
+    try:
+        # every view is released on the way out, even on errors, or close() would raise BufferError
+        with shm.buf.cast(ITEM_FORMAT) as view:
+            view[:] = values
+            bounds = get_chunk_bounds(n, workers, chunk_size)
+
+            if workers == 1:
+                for lo, hi in bounds:
+                    with view[lo:hi] as chunk:
+                        bottom_up_merge_sort(chunk)
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(_sort_shared_chunk, shm.name, lo, hi) for lo, hi in bounds]
+                    for future in futures:
+                        future.result()
+
+            result = array(ITEM_FORMAT, bytes(n * ITEM_SIZE))
+            runs = [view[lo:hi] for lo, hi in bounds]
+            try:
+                k_way_merge(runs, result)
+            finally:
+                for run in runs:
+                    run.release()
+    finally:
+        try:
+            shm.close()
+        finally:
+            shm.unlink()
+
+    return result
+
+
+def benchmark_scaling(n: int = 10**6, max_workers: Optional[int] = None) -> List[Tuple[int, float]]:
+    """Times parallel_merge_sort on the same random data with 1 to max_workers processes."""
+    max_workers = max_workers or os.cpu_count() or 1
+    data = array(ITEM_FORMAT, (randint(0, 2**40) for _ in range(n)))
+    expected = sorted(data)
+
+    timings = []
+    for workers in range(1, max_workers + 1):
+        start = perf_counter()
+        result = parallel_merge_sort(data, workers=workers)
+        elapsed = perf_counter() - start
+        assert result.tolist() == expected
+        timings.append((workers, elapsed))
+        print('{} worker(s): {:.3f}s (speedup {:.2f}x)'.format(workers, elapsed, timings[0][1] / elapsed))
+    return timings
+
+
+def main() -> None:
+    lst = [randint(1, 20) for _ in range(20)]
+    print('Sorting {} with 2 workers and chunks of 6...'.format(lst))
+    print(parallel_merge_sort(lst, workers=2, chunk_size=6).tolist())
+
+    print('\nScaling benchmark on 200000 values:')
+    benchmark_scaling(200000)
+
+
+if __name__ == '__main__':
+    main()
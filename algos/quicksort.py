@@ -1,60 +1,412 @@
 """
-Demonstrate quicksort algorithm.
+Demonstrate quicksort algorithm, and quickselect (introselect) for k-th smallest values and medians.
 """
 
-from typing import List, Tuple
+from bisect import bisect_left, bisect_right
+from heapq import heappush, heappushpop
+from typing import Any, Callable, Iterable, List, MutableSequence, Optional, Sequence, Tuple, Union
 
-from sort_demo_helpers import print_sort_op_results, SortOperationType
+from heap_sort import heapsort_range
+from insertion_sort import insertion_sort_range
+from sort_demo_helpers import print_sort_op_results, sort_with_key, OperationTrace, SortOperationType, TraceMode
 
+INIT, COMPARE, SWITCH, STORE = (
+    SortOperationType.INIT.code,
+    SortOperationType.COMPARE.code,
+    SortOperationType.SWITCH.code,
+    SortOperationType.STORE.code,
+)
 
+INSERTION_SORT_CUTOFF = 16
+NINTHER_THRESHOLD = 128
+# lopsided partitions (one side keeps over 3/4 of the range) a selection allows before switching to median of medians
+MAX_BAD_PARTITIONS = 4
 
-def partition(lst: List[int], low: int = 0, high: int = -1) -> Tuple[int, List[str]]:
+
+def partition(
+        lst: List[int],
+        low: int = 0,
+        high: int = -1,
+        trace: Optional[OperationTrace] = None,
+    ) -> Tuple[int, Union[List[str], OperationTrace]]:
     """
-    Returns a pivot index and a list of operations performed on list.
+    Returns a pivot index and a list of operations performed on list
+    (or trace, with the operations recorded into it, if one is given).
     """
-    ops: List[str] = []
+    ops: Optional[List[str]] = [] if trace is None else None
+    record = trace.recorder() if trace is not None else None
     pivot = lst[high]
     i = low
 
-    ops.append("{}: Running partition on array: {}; low: {}; high: {}; pivot: {}; i: {}".format(
-        SortOperationType.INIT.value, lst, low, high, pivot, i))
+    if ops is not None:
+        ops.append("{}: Running partition on array: {}; low: {}; high: {}; pivot: {}; i: {}".format(
+            SortOperationType.INIT.value, lst, low, high, pivot, i))
+    elif record:
+        record(INIT, low, high)
   
     for j in range(low, high):
-        ops.append("{}: Comparing index {} (value {}) with pivot {}...".format(SortOperationType.COMPARE.value, j, lst[j], pivot))
+        if ops is not None:
+            ops.append("{}: Comparing index {} (value {}) with pivot {}...".format(SortOperationType.COMPARE.value, j, lst[j], pivot))
+        elif record:
+            record(COMPARE, j, high)
         if lst[j] <= pivot:
   
             (lst[i], lst[j]) = (lst[j], lst[i])
-            ops.append("{}: Swapping {} and {} to get {}".format(SortOperationType.SWITCH.value, lst[j], lst[i], lst))
+            if ops is not None:
+                ops.append("{}: Swapping {} and {} to get {}".format(SortOperationType.SWITCH.value, lst[j], lst[i], lst))
+            elif record:
+                record(SWITCH, i, j)
 
             i += 1
-            ops.append("{}: Incrementing i to {}".format(SortOperationType.STORE.value, i))
+            if ops is not None:
+                ops.append("{}: Incrementing i to {}".format(SortOperationType.STORE.value, i))
+            elif record:
+                record(STORE, i)
 
     (lst[i], lst[high]) = (lst[high], lst[i])
-    ops.append("{}: Swapping {} and {} to get {}".format(SortOperationType.SWITCH.value, lst[high], lst[i], lst))
+    if ops is not None:
+        ops.append("{}: Swapping {} and {} to get {}".format(SortOperationType.SWITCH.value, lst[high], lst[i], lst))
+    elif record:
+        record(SWITCH, i, high)
 
-    return i, ops
+    return i, ops if trace is None else trace
 
 
-def quick_sort(lst: List[int], low: int = 0, high: int = -1) -> List[str]:
+def recursive_quick_sort(
+        lst: List[int],
+        low: int = 0,
+        high: Optional[int] = None,
+        trace: Optional[OperationTrace] = None,
+        key: Optional[Callable[[Any], Any]] = None,
+        reverse: bool = False,
+    ) -> Union[List[str], OperationTrace]:
     """
-    Sorts list of ints in place with quicksort method.
+    Sorts list of ints in place with the textbook quicksort method (last element as pivot).
+    Returns a list of operations, or records into and returns trace if one is given.
+    Goes quadratic (and deep) on sorted or reversed input; quick_sort does not.
     """
-    if high == -1:
+    if key is not None or reverse:
+        if low != 0 or high is not None:
+            raise ValueError('key and reverse sort the whole list; they can not be combined with low/high')
+        return sort_with_key(recursive_quick_sort, lst, trace, key, reverse)
+
+    if high is None:
         high = len(lst) - 1
     
     if low >= high:
-        return []
+        return [] if trace is None else trace
 
-    pi, ops = partition(lst, low, high)
+    pi, ops = partition(lst, low, high, trace)
 
-    low_ops = quick_sort(lst, low, pi-1)
-    high_ops = quick_sort(lst, pi+1, high)
+    low_ops = recursive_quick_sort(lst, low, pi-1, trace)
+    high_ops = recursive_quick_sort(lst, pi+1, high, trace)
+    if trace is not None:
+        return trace
     return ops + low_ops + high_ops
 
 
+def _median_of_three(lst: MutableSequence, a: int, b: int, c: int) -> int:
+    """Returns whichever of indexes a, b, c holds the median value."""
+    x, y, z = lst[a], lst[b], lst[c]
+    if x < y:
+        if y < z:
+            return b
+        return c if x < z else a
+    if x < z:
+        return a
+    return c if y < z else b
+
+
+def choose_pivot(lst: MutableSequence, low: int, high: int) -> int:
+    """Median of three for small ranges, Tukey's ninther (median of three medians) for large ones."""
+    mid = (low + high) // 2
+    if high - low < NINTHER_THRESHOLD:
+        return _median_of_three(lst, low, mid, high)
+    step = (high - low) // 8
+    return _median_of_three(
+        lst,
+        _median_of_three(lst, low, low + step, low + 2 * step),
+        _median_of_three(lst, mid - step, mid, mid + step),
+        _median_of_three(lst, high - 2 * step, high - step, high),
+    )
+
+
+def three_way_partition(
+        lst: MutableSequence,
+        low: int,
+        high: int,
+        pivot_index: int,
+        record: Optional[Callable[..., None]] = None,
+    ) -> Tuple[int, int]:
+    """
+    Dutch national flag partition of lst[low:high + 1] around the value at pivot_index.
+    Returns (lt, gt): lst[lt:gt + 1] all equal the pivot, so duplicates are never revisited.
+    """
+    pivot = lst[pivot_index]
+    if record:
+        record(INIT, low, high)
+    lt, i, gt = low, low, high
+    while i <= gt:
+        val = lst[i]
+        if record:
+            record(COMPARE, i, pivot_index)
+        if val < pivot:
+            lst[lt], lst[i] = val, lst[lt]
+            if record:
+                record(SWITCH, lt, i)
+            lt += 1
+            i += 1
+        elif pivot < val:
+            lst[gt], lst[i] = val, lst[gt]
+            if record:
+                record(SWITCH, i, gt)
+            gt -= 1
+        else:
+            i += 1
+    return lt, gt
+
+
+def introsort(
+        lst: MutableSequence,
+        low: int = 0,
+        high: Optional[int] = None,
+        record: Optional[Callable[..., None]] = None,
+    ) -> None:
+    """
+    Sorts lst[low:high + 1] in place in O(n log n) worst case, without recursion.
+
+    Quicksort with ninther/median-of-three pivots and three-way partitioning; partitions
+    smaller than INSERTION_SORT_CUTOFF are insertion sorted, and any range still unsorted
+    after 2*log2(n) levels of partitioning is heapsorted.
+    """
+    if high is None:
+        high = len(lst) - 1
+    if high <= low:
+        return
+
+    stack = [(low, high, 2 * (high - low + 1).bit_length())]
+    while stack:
+        low, high, depth_left = stack.pop()
+        if high - low < INSERTION_SORT_CUTOFF:
+            insertion_sort_range(lst, low, high, record)
+            continue
+        if depth_left == 0:
+            heapsort_range(lst, low, high, record)
+            continue
+
+        lt, gt = three_way_partition(lst, low, high, choose_pivot(lst, low, high), record)
+
+        # push the larger side first so the smaller one is handled next and the stack stays O(log n)
+        if lt - low > high - gt:
+            stack.append((low, lt - 1, depth_left - 1))
+            stack.append((gt + 1, high, depth_left - 1))
+        else:
+            stack.append((gt + 1, high, depth_left - 1))
+            stack.append((low, lt - 1, depth_left - 1))
+
+
+def quick_sort(
+        lst: List[int],
+        low: int = 0,
+        high: Optional[int] = None,
+        trace: Optional[OperationTrace] = None,
+        key: Optional[Callable[[Any], Any]] = None,
+        reverse: bool = False,
+    ) -> Union[List[str], OperationTrace]:
+    """
+    Sorts list of ints in place with introsort.
+    Returns a list of operations, or records into and returns trace if one is given.
+    """
+    if key is not None or reverse:
+        if low != 0 or high is not None:
+            raise ValueError('key and reverse sort the whole list; they can not be combined with low/high')
+        return sort_with_key(quick_sort, lst, trace, key, reverse)
+
+    if trace is not None:
+        introsort(lst, low, high, trace.recorder())
+        return trace
+
+    text_trace = OperationTrace(TraceMode.STRUCTURED)
+    introsort(lst, low, high, text_trace.recorder())
+    return list(text_trace.render())
+
+
+def median_of_medians(
+        lst: MutableSequence,
+        low: int,
+        high: int,
+        record: Optional[Callable[..., None]] = None,
+    ) -> int:
+    """
+    Returns the index of a pivot guaranteed to have at least ~30% of lst[low:high + 1] on each side.
+    Sorts each group of 5, gathers the group medians at the front of the range, and selects their median.
+    """
+    medians_end = low
+    for group_low in range(low, high + 1, 5):
+        group_high = min(group_low + 4, high)
+        insertion_sort_range(lst, group_low, group_high, record)
+        group_median = (group_low + group_high) // 2
+        lst[medians_end], lst[group_median] = lst[group_median], lst[medians_end]
+        if record:
+            record(SWITCH, medians_end, group_median)
+        medians_end += 1
+
+    mid = (low + medians_end - 1) // 2
+    _select_ranks(lst, low, medians_end - 1, [mid], record)
+    return mid
+
+
+def _select_ranks(
+        lst: MutableSequence,
+        low: int,
+        high: int,
+        ranks: Sequence[int],
+        record: Optional[Callable[..., None]] = None,
+    ) -> None:
+    """
+    Rearranges lst[low:high + 1] so that each index in ranks (sorted, within the range) holds the value
+    it would hold if the range were sorted, without recursion on the partitions.
+    """
+    bad_partitions_left = MAX_BAD_PARTITIONS
+    # (low, high, start, end): ranks[start:end] still have to be placed within lst[low:high + 1]
+    stack = [(low, high, 0, len(ranks))]
+    while stack:
+        low, high, start, end = stack.pop()
+        if start == end:
+            continue
+        if high - low < INSERTION_SORT_CUTOFF:
+            insertion_sort_range(lst, low, high, record)
+            continue
+
+        if bad_partitions_left:
+            pivot_index = choose_pivot(lst, low, high)
+        else:
+            pivot_index = median_of_medians(lst, low, high, record)
+        lt, gt = three_way_partition(lst, low, high, pivot_index, record)
+        if max(lt - low, high - gt) > 3 * (high - low + 1) // 4:
+            bad_partitions_left = max(0, bad_partitions_left - 1)
+
+        # ranks inside [lt, gt] land on a copy of the pivot and are done
+        split_lt = bisect_left(ranks, lt, start, end)
+        split_gt = bisect_right(ranks, gt, split_lt, end)
+        stack.append((gt + 1, high, split_gt, end))
+        stack.append((low, lt - 1, start, split_lt))
+
+
+def introselect(
+        lst: MutableSequence,
+        k: int,
+        low: int = 0,
+        high: Optional[int] = None,
+        record: Optional[Callable[..., None]] = None,
+    ) -> Any:
+    """
+    Returns the value that would be at index k if lst[low:high + 1] were sorted, in O(n) worst case.
+
+    Like C++'s nth_element, lst is partially reordered: lst[k] then holds that value, with
+    nothing larger before it and nothing smaller after it. Pivots are chosen as in introsort
+    until MAX_BAD_PARTITIONS lopsided partitions, then with median_of_medians.
+    """
+    if high is None:
+        high = len(lst) - 1
+    if not low <= k <= high:
+        raise IndexError('Rank {} is outside of {}..{}'.format(k, low, high))
+    _select_ranks(lst, low, high, [k], record)
+    return lst[k]
+
+
+def select_many(
+        lst: MutableSequence,
+        ranks: Iterable[int],
+        record: Optional[Callable[..., None]] = None,
+    ) -> List[Any]:
+    """
+    Returns the k-th smallest value for each k in ranks (negative ranks count from the end), reordering lst.
+    All ranks share one partitioning pass, so m ranks take O(n log m) expected instead of m selections.
+    """
+    n = len(lst)
+    ranks = list(ranks)
+    for k in ranks:
+        if not -n <= k < n:
+            raise IndexError('Rank {} is out of range for {} values'.format(k, n))
+    ranks = [k % n for k in ranks]
+    _select_ranks(lst, 0, n - 1, sorted(set(ranks)), record)
+    return [lst[k] for k in ranks]
+
+
+def median(lst: MutableSequence, record: Optional[Callable[..., None]] = None) -> Any:
+    """Returns the median of lst (the mean of the middle two for an even length), reordering lst."""
+    n = len(lst)
+    if not n:
+        raise ValueError('median of an empty sequence')
+    if n % 2:
+        return introselect(lst, n // 2, record=record)
+    lower, upper = select_many(lst, [n // 2 - 1, n // 2], record)
+    return (lower + upper) / 2
+
+
+def percentiles(
+        lst: MutableSequence,
+        percents: Iterable[float],
+        record: Optional[Callable[..., None]] = None,
+    ) -> List[Any]:
+    """Returns the nearest-rank percentile of lst for each of percents (0 to 100), reordering lst."""
+    n = len(lst)
+    if not n:
+        raise ValueError('percentiles of an empty sequence')
+    ranks = []
+    for percent in percents:
+        if not 0 <= percent <= 100:
+            raise ValueError('Percentile must be between 0 and 100, got {}'.format(percent))
+        ranks.append(max(0, -(-percent * n // 100) - 1))
+    return select_many(lst, [int(k) for k in ranks], record)
+
+
+class StreamingMedian:
+    """
+    Keeps the running median of numbers added one at a time, in O(log n) per add.
+    The lower half is a max heap (stored negated) and the upper half a min heap; the lower
+    half holds the extra value when the count is odd.
+    """
+
+    def __init__(self, values: Iterable[Any] = ()):
+        self._lower: List[Any] = []
+        self._upper: List[Any] = []
+        for value in values:
+            self.add(value)
+
+    def __len__(self) -> int:
+        return len(self._lower) + len(self._upper)
+
+    def add(self, value: Any) -> None:
+        if len(self._lower) == len(self._upper):
+            heappush(self._lower, -heappushpop(self._upper, value))
+        else:
+            heappush(self._upper, -heappushpop(self._lower, -value))
+
+    def median(self) -> Any:
+        if not self._lower:
+            raise ValueError('median of an empty stream')
+        if len(self._lower) > len(self._upper):
+            return -self._lower[0]
+        return (-self._lower[0] + self._upper[0]) / 2
+
+
+
 def main() -> None:
+    print_sort_op_results(recursive_quick_sort, None)
+    print()
     print_sort_op_results(quick_sort, None)
 
+    lst = [8, 1, 5, 3, 9, 12, 6, 7, 3, 9]
+    print('\nMedian of {}: {}'.format(lst, median(list(lst))))
+    print('0th, 5th and last smallest: {}'.format(select_many(lst, [0, 5, -1])))
+
+    running = StreamingMedian()
+    for value in [5, 15, 1, 3, 8]:
+        running.add(value)
+        print('Added {}; running median is {}'.format(value, running.median()))
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,89 @@
+"""Demonstrates least-significant-digit radix sort, one byte (256 buckets) per pass."""
+
+from array import array
+from typing import Any, Callable, List, MutableSequence, Optional, Sequence, Union
+
+from sort_demo_helpers import OperationTrace, SortOperationType, TraceMode, apply_permutation, as_slice_values, print_sort_op_results
+
+INIT, STORE = SortOperationType.INIT.code, SortOperationType.STORE.code
+
+RADIX_BITS = 8
+RADIX_MASK = (1 << RADIX_BITS) - 1
+
+
+def lsd_radix_sort(
+        lst: MutableSequence,
+        trace: Optional[OperationTrace] = None,
+        key: Optional[Callable[[Any], int]] = None,
+        reverse: bool = False,
+    ) -> Union[List[str], OperationTrace]:
+    """
+    Sorts a list, array or memoryview of ints in place, distributing by one byte per pass from the lowest up.
+
+    Values are offset by min(lst) so negatives work and the number of passes only depends on
+    the spread of the values: (max - min).bit_length() / 8, rounded up.
+
+    With key (which must return ints) or reverse, lst is rearranged by lsd_radix_argsort instead.
+    Returns a list of operations, or records into and returns trace if one is given.
+    """
+    recording = trace if trace is not None else OperationTrace(TraceMode.STRUCTURED)
+    record = recording.recorder()
+
+    if lst and (key is not None or reverse):
+        apply_permutation(lst, lsd_radix_argsort(lst, recording, key, reverse))
+    elif lst:
+        lo = min(lst)
+        span = max(lst) - lo
+        current = lst
+        shift = 0
+        while span >> shift:
+            if record:
+                record(INIT, shift, RADIX_BITS)
+            buckets = [[] for _ in range(RADIX_MASK + 1)]
+            appenders = [bucket.append for bucket in buckets]
+            if record:
+                for i, val in enumerate(current):
+                    digit = ((val - lo) >> shift) & RADIX_MASK
+                    appenders[digit](val)
+                    record(STORE, i, digit)
+            else:
+                for val in current:
+                    appenders[((val - lo) >> shift) & RADIX_MASK](val)
+            # buckets are filled in input order, so each pass is stable
+            current = [val for bucket in buckets for val in bucket]
+            shift += RADIX_BITS
+
+        if current is not lst:
+            lst[:] = as_slice_values(lst, current)
+
+    return list(recording.render()) if trace is None else trace
+
+
+def lsd_radix_argsort(
+        lst: Sequence,
+        trace: Optional[OperationTrace] = None,
+        key: Optional[Callable[[Any], int]] = None,
+        reverse: bool = False,
+    ) -> array:
+    """
+    Returns the stable permutation that sorts lst by key (ints) as an array('q'), leaving lst untouched.
+
+    Each key is computed once and packed together with its index into one int,
+    (offset key) * n + index; radix sorting those is stable by key, and the indexes are unpacked.
+    """
+    keys = [key(item) for item in lst] if key is not None else list(lst)
+    n = len(keys)
+    if not n:
+        return array('q')
+    lo, hi = min(keys), max(keys)
+    packed = [((hi - k) if reverse else (k - lo)) * n + i for i, k in enumerate(keys)]
+    lsd_radix_sort(packed, trace if trace is not None else OperationTrace(TraceMode.NONE))
+    return array('q', [p % n for p in packed])
+
+
+def main() -> None:
+    print_sort_op_results(lsd_radix_sort, None)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,30 +1,59 @@
 """Demonstrates selection sort."""
 
-from typing import List, Optional
+from typing import Any, Callable, List, Optional, Union
 
-from sort_demo_helpers import print_sort_op_results, SortOperationType
+from sort_demo_helpers import print_sort_op_results, sort_with_key, OperationTrace, SortOperationType
 
+INIT, COMPARE, SWITCH, STORE = (
+    SortOperationType.INIT.code,
+    SortOperationType.COMPARE.code,
+    SortOperationType.SWITCH.code,
+    SortOperationType.STORE.code,
+)
+
+
+def selection_sort(
+        lst: List[int],
+        trace: Optional[OperationTrace] = None,
+        key: Optional[Callable[[Any], Any]] = None,
+        reverse: bool = False,
+    ) -> Union[List[str], OperationTrace]:
+    """Returns a list of operations, or records into and returns trace if one is given."""
+    if key is not None or reverse:
+        return sort_with_key(selection_sort, lst, trace, key, reverse)
+
+    operations = [] if trace is None else None
+    record = trace.recorder() if trace is not None else None
 
-def selection_sort(lst: List[int]) -> List[str]:
-    """Returns a list of operations."""
-    operations = []
     for i in range(len(lst)-1):
-        operations.append('\n' + SortOperationType.INIT.get_sort_operation_str(lst=lst, i=i))
+        if operations is not None:
+            operations.append('\n' + SortOperationType.INIT.get_sort_operation_str(lst=lst, i=i))
+        elif record:
+            record(INIT, i)
       
         # find minimum element in lst[i+1:]
         min_idx = i
         for j in range(i+1, len(lst)):
-            operations.append('\t' + SortOperationType.COMPARE.get_sort_operation_str(lst=lst, min_idx=min_idx, j=j))
+            if operations is not None:
+                operations.append('\t' + SortOperationType.COMPARE.get_sort_operation_str(lst=lst, min_idx=min_idx, j=j))
+            elif record:
+                record(COMPARE, min_idx, j)
         
             if lst[min_idx] > lst[j]:
                 min_idx = j
-                operations.append(SortOperationType.STORE.get_sort_operation_str(lst=lst, j=j))
+                if operations is not None:
+                    operations.append(SortOperationType.STORE.get_sort_operation_str(lst=lst, j=j))
+                elif record:
+                    record(STORE, j)
               
         # swap minimum element with i (could be i itself)
-        operations.append(SortOperationType.SWITCH.get_sort_operation_str(lst=lst, min_idx=min_idx, i=i))
+        if operations is not None:
+            operations.append(SortOperationType.SWITCH.get_sort_operation_str(lst=lst, min_idx=min_idx, i=i))
+        elif record:
+            record(SWITCH, i, min_idx)
         lst[i], lst[min_idx] = lst[min_idx], lst[i]
 
-    return operations
+    return operations if trace is None else trace
 
 
 def main(some_random_list: Optional[List[int]] = None):
@@ -0,0 +1,94 @@
+"""Demonstrates Shell sort: insertion sort over elements gap apart, for a shrinking sequence of gaps."""
+
+from enum import Enum
+from functools import partial
+from typing import Any, Callable, List, MutableSequence, Optional, Union
+
+from sort_demo_helpers import OperationTrace, SortOperationType, TraceMode, print_sort_op_results, sort_with_key
+
+INIT, COMPARE, SWITCH = SortOperationType.INIT.code, SortOperationType.COMPARE.code, SortOperationType.SWITCH.code
+
+CIURA_GAPS = [1, 4, 10, 23, 57, 132, 301, 701, 1750]
+
+
+class GapSequence(Enum):
+    CIURA = 'ciura'
+    TOKUDA = 'tokuda'
+    SEDGEWICK = 'sedgewick'
+
+    def get_gaps(self, n: int) -> List[int]:
+        """Returns the gaps smaller than n, largest first (always ending in 1)."""
+        gaps = [1]
+        if self == GapSequence.CIURA:
+            # Ciura's sequence is empirical; past 1750 it is usually extended by a factor of 2.25
+            gaps = list(CIURA_GAPS)
+            while gaps[-1] < n:
+                gaps.append(int(gaps[-1] * 2.25))
+        elif self == GapSequence.TOKUDA:
+            k = 2
+            while gaps[-1] < n:
+                gaps.append(-(-(9**k - 4**k) // (5 * 4**(k-1))))
+                k += 1
+        elif self == GapSequence.SEDGEWICK:
+            # 4^k + 3 * 2^(k-1) + 1 for k >= 1: 8, 23, 77, 281...
+            k = 1
+            while gaps[-1] < n:
+                gaps.append(4**k + 3 * 2**(k-1) + 1)
+                k += 1
+        return [gap for gap in reversed(gaps) if gap < n or gap == 1]
+
+
+def shell_sort_range(
+        lst: MutableSequence,
+        lo: int,
+        hi: int,
+        gap_sequence: GapSequence = GapSequence.CIURA,
+        record: Optional[Callable[..., None]] = None,
+    ) -> None:
+    """Sorts lst[lo:hi + 1] in place without recursion; a gap of 1 finishes as plain insertion sort."""
+    for gap in gap_sequence.get_gaps(hi - lo + 1):
+        if record:
+            record(INIT, gap, hi - lo + 1)
+        for i in range(lo + gap, hi + 1):
+            val = lst[i]
+            j = i
+            while j - gap >= lo:
+                if record:
+                    record(COMPARE, i, j - gap)
+                if not val < lst[j - gap]:
+                    break
+                lst[j] = lst[j - gap]
+                if record:
+                    record(SWITCH, j, j - gap)
+                j -= gap
+            lst[j] = val
+
+
+def shell_sort(
+        lst: MutableSequence,
+        trace: Optional[OperationTrace] = None,
+        gap_sequence: GapSequence = GapSequence.CIURA,
+        key: Optional[Callable[[Any], Any]] = None,
+        reverse: bool = False,
+    ) -> Union[List[str], OperationTrace]:
+    """
+    Sorts lst in place with shell_sort_range.
+    Returns a list of operations, or records into and returns trace if one is given.
+    """
+    if key is not None or reverse:
+        return sort_with_key(partial(shell_sort, gap_sequence=gap_sequence), lst, trace, key, reverse)
+
+    recording = trace if trace is not None else OperationTrace(TraceMode.STRUCTURED)
+    shell_sort_range(lst, 0, len(lst) - 1, gap_sequence, recording.recorder())
+    return list(recording.render()) if trace is None else trace
+
+
+def main() -> None:
+    print_sort_op_results(shell_sort, None)
+
+    for gap_sequence in GapSequence:
+        print('{} gaps below 10000: {}'.format(gap_sequence.value, gap_sequence.get_gaps(10000)))
+
+
+if __name__ == '__main__':
+    main()
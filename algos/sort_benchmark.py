@@ -0,0 +1,419 @@
+"""
+Wall-clock and memory benchmarks for the sorting algos, with JSON output and baseline regression checks.
+
+Unlike sort_comparison, which counts traced operations, this times untraced sorts over a sweep of
+list sizes and input distributions. Example:
+
+    python3 algos/sort_benchmark.py --sizes 1000 100000 --output bench.json
+    python3 algos/sort_benchmark.py --sizes 1000 100000 --baseline bench.json
+
+With --complexity it instead sweeps sizes geometrically, fits each algo's time and operation counts
+to n, n log n and n^2 (and a free exponent n^k), and with --baseline fails when a complexity class changed:
+
+    python3 algos/sort_benchmark.py --complexity --output complexity.json
+    python3 algos/sort_benchmark.py --complexity --baseline complexity.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+from math import log, sqrt
+from random import Random
+from statistics import mean, median
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bubble_sort import bubble_sort
+from counting_sort import counting_sort
+from heap_sort import heapsort
+from hybrid_sort import hybrid_sort
+from insertion_sort import binary_insertion_sort, insertion_sort
+from merge_sort import merge_sort
+from natural_merge_sort import natural_merge_sort
+from quicksort import quick_sort
+from radix_sort import lsd_radix_sort
+from selection_sort import selection_sort
+from shell_sort import shell_sort
+from sort_demo_helpers import ListDistribution, OperationTrace, TraceMode, get_distribution_list
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000, 1000000)
+QUADRATIC_MAX_SIZE = 2000
+DEFAULT_REGRESSION_THRESHOLD = 0.25
+DEFAULT_SWEEP = (64, 65536, 2)
+
+# candidate complexity classes, as log(f(n)); fits compare log(measurement) - log(f(n)) across sizes
+COMPLEXITY_MODELS: Dict[str, Callable[[float], float]] = {
+    'n': lambda log_n: log_n,
+    'n log n': lambda log_n: log_n + log(log_n),
+    'n^2': lambda log_n: 2 * log_n,
+}
+# above this RMS error in log space (about 15%) none of the named models fits and the class is n^k
+MODEL_TOLERANCE = 0.15
+# two-sided 95% Student t quantiles by degrees of freedom; 1.96 beyond the table
+T_QUANTILES_95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262, 10: 2.228,
+    12: 2.179, 15: 2.131, 20: 2.086, 30: 2.042,
+}
+
+# name -> (sort, largest size it is benchmarked at); quadratic sorts would take hours at 10^6
+ALGOS: Dict[str, Tuple[Callable, Optional[int]]] = {
+    'selection_sort': (selection_sort, QUADRATIC_MAX_SIZE),
+    'bubble_sort': (bubble_sort, QUADRATIC_MAX_SIZE),
+    'insertion_sort': (insertion_sort, QUADRATIC_MAX_SIZE),
+    'binary_insertion_sort': (binary_insertion_sort, QUADRATIC_MAX_SIZE),
+    'shell_sort': (shell_sort, None),
+    'heapsort': (heapsort, None),
+    'merge_sort': (merge_sort, None),
+    'natural_merge_sort': (natural_merge_sort, None),
+    'quick_sort': (quick_sort, None),
+    'counting_sort': (counting_sort, None),
+    'lsd_radix_sort': (lsd_radix_sort, None),
+    'hybrid_sort': (hybrid_sort, None),
+}
+
+
+def geometric_sizes(min_size: int, max_size: int, growth: float = 2) -> List[int]:
+    """Returns min_size, min_size * growth, ... up to max_size, as distinct ints."""
+    if min_size < 2 or growth <= 1:
+        raise ValueError('Need min_size >= 2 and growth > 1, got {} and {}'.format(min_size, growth))
+    sizes = []
+    size = float(min_size)
+    while size <= max_size:
+        if not sizes or int(size) != sizes[-1]:
+            sizes.append(int(size))
+        size *= growth
+    return sizes
+
+
+def _t_quantile_95(df: int) -> float:
+    for table_df in sorted(T_QUANTILES_95):
+        if df <= table_df:
+            return T_QUANTILES_95[table_df]
+    return 1.96
+
+
+def fit_complexity(sizes: Sequence[int], values: Sequence[float]) -> Dict[str, Any]:
+    """
+    Fits values measured at sizes (times or operation counts) to a power law and to each of COMPLEXITY_MODELS.
+
+    The exponent k of values ~ c * n^k comes from a least squares line through (log n, log value),
+    with a 95% confidence interval from the slope's standard error. Each named model gets the RMS of
+    log(value / (c * f(n))) for its best c, and the model with the smallest error is reported unless
+    even that is above MODEL_TOLERANCE, in which case the class is given as n^k.
+    """
+    if any(n < 2 for n in sizes):
+        # the n log n model takes log(log n), which needs n > 1
+        raise ValueError('Sizes must be at least 2 to fit a complexity, got {}'.format(min(sizes)))
+    points = [(log(n), log(v)) for n, v in zip(sizes, values) if v > 0]
+    if len(points) < 3:
+        raise ValueError('Need at least 3 sizes with non-zero measurements to fit a complexity, got {}'.format(len(points)))
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    x_mean, y_mean = mean(xs), mean(ys)
+    sxx = sum((x - x_mean) ** 2 for x in xs)
+    slope = sum((x - x_mean) * (y - y_mean) for x, y in points) / sxx
+    intercept = y_mean - slope * x_mean
+    residual_ss = sum((y - (intercept + slope * x)) ** 2 for x, y in points)
+    total_ss = sum((y - y_mean) ** 2 for y in ys)
+    df = len(points) - 2
+    slope_error = sqrt(residual_ss / df / sxx) if df else float('inf')
+    margin = _t_quantile_95(df) * slope_error
+
+    model_errors = {}
+    for name, log_f in COMPLEXITY_MODELS.items():
+        offsets = [y - log_f(x) for x, y in points]
+        offset_mean = mean(offsets)
+        model_errors[name] = sqrt(mean((o - offset_mean) ** 2 for o in offsets))
+    best_model = min(model_errors, key=model_errors.get)
+    if model_errors[best_model] > MODEL_TOLERANCE:
+        best_model = 'n^{:.2f}'.format(slope)
+
+    return {
+        'exponent': slope,
+        'exponent_ci95': [slope - margin, slope + margin],
+        'r_squared': 1 - residual_ss / total_ss if total_ss else 1.0,
+        'model': best_model,
+        'model_errors': model_errors,
+    }
+
+
+def count_operations(fnc: Callable, example: List[int]) -> int:
+    """Returns the number of operations fnc records while sorting a copy of example."""
+    trace = OperationTrace(TraceMode.COUNTS)
+    fnc(list(example), trace=trace)
+    return len(trace)
+
+
+def time_sort(fnc: Callable, example: List[int], repeats: int = 3, warmup: int = 1) -> List[float]:
+    """Returns the wall-clock seconds of each timed trial; warmup trials run first and are discarded."""
+    times = []
+    for trial in range(warmup + repeats):
+        lst = list(example)
+        start = perf_counter()
+        fnc(lst, trace=OperationTrace(TraceMode.NONE))
+        elapsed = perf_counter() - start
+        if trial >= warmup:
+            times.append(elapsed)
+    return times
+
+
+def measure_peak_memory(fnc: Callable, example: List[int]) -> int:
+    """Returns the peak bytes allocated while sorting (not counting the list copy handed to the sort)."""
+    lst = list(example)
+    tracemalloc.start()
+    try:
+        fnc(lst, trace=OperationTrace(TraceMode.NONE))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_benchmarks(
+        algo_names: Optional[Iterable[str]] = None,
+        sizes: Iterable[int] = DEFAULT_SIZES,
+        distributions: Optional[Iterable[ListDistribution]] = None,
+        repeats: int = 3,
+        warmup: int = 1,
+        seed: int = 0,
+        progress: bool = False,
+    ) -> Dict[str, Any]:
+    """Benchmarks every (algo, distribution, size) combination and returns a JSON-serializable report."""
+    algo_names = list(algo_names or ALGOS)
+    distributions = list(distributions or ListDistribution)
+
+    results = []
+    for size in sizes:
+        for distribution in distributions:
+            example = get_distribution_list(distribution, size, Random('{}-{}-{}'.format(seed, distribution.value, size)))
+            expected = sorted(example)
+            for name in algo_names:
+                fnc, max_size = ALGOS[name]
+                if max_size is not None and size > max_size:
+                    continue
+
+                check = list(example)
+                fnc(check, trace=OperationTrace(TraceMode.NONE))
+                if check != expected:
+                    raise AssertionError('{} did not sort {} list of size {}'.format(name, distribution.value, size))
+
+                times = time_sort(fnc, example, repeats, warmup)
+                result = {
+                    'algo': name,
+                    'distribution': distribution.value,
+                    'size': size,
+                    'times': times,
+                    'min': min(times),
+                    'median': median(times),
+                    'mean': mean(times),
+                    'peak_memory_bytes': measure_peak_memory(fnc, example),
+                }
+                results.append(result)
+                if progress:
+                    print('{algo:>20} {distribution:>10} {size:>8}: median {median:.6f}s, '
+                          'peak {peak_memory_bytes} B'.format(**result), file=sys.stderr)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeats': repeats,
+            'warmup': warmup,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare_to_baseline(
+        report: Dict[str, Any],
+        baseline: Dict[str, Any],
+        threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+    ) -> List[Dict[str, Any]]:
+    """
+    Returns the results whose median time or peak memory grew by more than threshold (0.25 = 25%)
+    over the baseline result for the same algo, distribution and size.
+    """
+    baseline_results = {
+        (r['algo'], r['distribution'], r['size']): r
+        for r in baseline['results']
+    }
+
+    regressions = []
+    for result in report['results']:
+        old = baseline_results.get((result['algo'], result['distribution'], result['size']))
+        if old is None:
+            continue
+        for metric in ('median', 'peak_memory_bytes'):
+            if old[metric] and result[metric] > old[metric] * (1 + threshold):
+                regressions.append({
+                    'algo': result['algo'],
+                    'distribution': result['distribution'],
+                    'size': result['size'],
+                    'metric': metric,
+                    'baseline': old[metric],
+                    'current': result[metric],
+                    'ratio': result[metric] / old[metric],
+                })
+    return regressions
+
+
+def run_complexity_sweep(
+        algo_names: Optional[Iterable[str]] = None,
+        sizes: Optional[Iterable[int]] = None,
+        distributions: Optional[Iterable[ListDistribution]] = None,
+        repeats: int = 3,
+        warmup: int = 1,
+        seed: int = 0,
+        progress: bool = False,
+    ) -> Dict[str, Any]:
+    """
+    Times and counts the operations of each algo over sizes (a geometric sweep by default, cut off at
+    each algo's max size) and fits both to complexity models. Returns a JSON-serializable report.
+    """
+    algo_names = list(algo_names or ALGOS)
+    distributions = list(distributions or [ListDistribution.RANDOM])
+    sizes = list(sizes or geometric_sizes(*DEFAULT_SWEEP))
+
+    complexity = []
+    for distribution in distributions:
+        examples = {
+            size: get_distribution_list(distribution, size, Random('{}-{}-{}'.format(seed, distribution.value, size)))
+            for size in sizes
+        }
+        for name in algo_names:
+            fnc, max_size = ALGOS[name]
+            algo_sizes = [size for size in sizes if max_size is None or size <= max_size]
+            times = [median(time_sort(fnc, examples[size], repeats, warmup)) for size in algo_sizes]
+            op_counts = [count_operations(fnc, examples[size]) for size in algo_sizes]
+            result = {
+                'algo': name,
+                'distribution': distribution.value,
+                'sizes': algo_sizes,
+                'median_times': times,
+                'op_counts': op_counts,
+                'time_fit': fit_complexity(algo_sizes, times),
+                'ops_fit': fit_complexity(algo_sizes, op_counts),
+            }
+            complexity.append(result)
+            if progress:
+                print('{:>20} {:>10}: ops {} (n^{:.2f}), time {} (n^{:.2f} +/- {:.2f})'.format(
+                    name, distribution.value,
+                    result['ops_fit']['model'], result['ops_fit']['exponent'],
+                    result['time_fit']['model'], result['time_fit']['exponent'],
+                    (result['time_fit']['exponent_ci95'][1] - result['time_fit']['exponent_ci95'][0]) / 2,
+                ), file=sys.stderr)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeats': repeats,
+            'warmup': warmup,
+            'seed': seed,
+        },
+        'complexity': complexity,
+    }
+
+
+def compare_complexity(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Returns the fits whose complexity class changed from the baseline's for the same algo and distribution.
+    A change only counts if the exponents' 95% confidence intervals do not overlap either, so timing
+    noise that tips a borderline fit from one model to the next is not reported.
+    """
+    baseline_results = {(r['algo'], r['distribution']): r for r in baseline.get('complexity', [])}
+
+    changes = []
+    for result in report['complexity']:
+        old = baseline_results.get((result['algo'], result['distribution']))
+        if old is None:
+            continue
+        for fit in ('ops_fit', 'time_fit'):
+            new_fit, old_fit = result[fit], old[fit]
+            (new_lo, new_hi), (old_lo, old_hi) = new_fit['exponent_ci95'], old_fit['exponent_ci95']
+            if new_fit['model'] != old_fit['model'] and (new_lo > old_hi or old_lo > new_hi):
+                changes.append({
+                    'algo': result['algo'],
+                    'distribution': result['distribution'],
+                    'fit': fit,
+                    'baseline': old_fit['model'],
+                    'current': new_fit['model'],
+                    'baseline_exponent': old_fit['exponent'],
+                    'current_exponent': new_fit['exponent'],
+                })
+    return changes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--algos', nargs='+', choices=list(ALGOS), help='defaults to all of them')
+    parser.add_argument('--sizes', nargs='+', type=int,
+                        help='defaults to {} (or a geometric sweep with --complexity)'.format(' '.join(map(str, DEFAULT_SIZES))))
+    parser.add_argument('--distributions', nargs='+', choices=[d.value for d in ListDistribution])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--baseline', help='JSON report to compare against; exits 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    parser.add_argument('--complexity', action='store_true', help='fit complexity classes over a geometric size sweep')
+    parser.add_argument('--sweep', nargs=3, type=float, default=list(DEFAULT_SWEEP), metavar=('MIN', 'MAX', 'GROWTH'),
+                        help='geometric sweep for --complexity (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    distributions = [ListDistribution(d) for d in args.distributions] if args.distributions else None
+    if args.complexity and args.sizes and min(args.sizes) < 2:
+        parser.error('--complexity needs sizes of at least 2')
+    if args.complexity:
+        report = run_complexity_sweep(
+            algo_names=args.algos,
+            sizes=args.sizes or geometric_sizes(int(args.sweep[0]), int(args.sweep[1]), args.sweep[2]),
+            distributions=distributions,
+            repeats=args.repeats,
+            warmup=args.warmup,
+            seed=args.seed,
+            progress=True,
+        )
+    else:
+        report = run_benchmarks(
+            algo_names=args.algos,
+            sizes=args.sizes or DEFAULT_SIZES,
+            distributions=distributions,
+            repeats=args.repeats,
+            warmup=args.warmup,
+            seed=args.seed,
+            progress=True,
+        )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if args.complexity:
+            changes = compare_complexity(report, baseline)
+            for c in changes:
+                print('COMPLEXITY CHANGE: {algo} on {distribution} data ({fit}): {baseline} (n^{baseline_exponent:.2f}) '
+                      '-> {current} (n^{current_exponent:.2f})'.format(**c), file=sys.stderr)
+            if changes:
+                return 1
+        else:
+            regressions = compare_to_baseline(report, baseline, args.threshold)
+            for r in regressions:
+                print('REGRESSION: {algo} on {distribution} list of size {size}: {metric} {baseline} -> {current} '
+                      '({ratio:.2f}x)'.format(**r), file=sys.stderr)
+            if regressions:
+                return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,70 +1,199 @@
 """Does some worst/best/avg case comparisons of sorting algos."""
 
+import os
+from array import array
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pprint import pprint
+from random import Random
 from statistics import mean
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 from bubble_sort import bubble_sort
 from selection_sort import selection_sort
-from insertion_sort import insertion_sort
+from insertion_sort import binary_insertion_sort, insertion_sort
 from heap_sort import heapsort
 from merge_sort import merge_sort
+from natural_merge_sort import natural_merge_sort
 from quicksort import quick_sort
-from sort_demo_helpers import get_operations, get_random_list
+from shell_sort import shell_sort
+from counting_sort import counting_sort
+from radix_sort import lsd_radix_sort
+from sort_demo_helpers import OperationTrace, TraceMode, get_operations, get_random_list
 
+FAST_ALGOS = [heapsort, merge_sort, natural_merge_sort, quick_sort, shell_sort, counting_sort, lsd_radix_sort]
+ALL_ALGOS = [
+    selection_sort, bubble_sort, insertion_sort, binary_insertion_sort, shell_sort, heapsort,
+    merge_sort, natural_merge_sort, quick_sort, counting_sort, lsd_radix_sort,
+]
+ALGOS_BY_NAME = {algo.__name__: algo for algo in ALL_ALGOS}
 
-def main() -> None:
-    print('About to run some operational count comparisons for sorting algos...')
+# 'avg' is the only label with more than one sample
+EXAMPLE_LABELS = ('best', 'worst', 'random', 'avg')
+SAMPLES_PER_TASK = 25
+
+# (algo name, example label, first sample, end sample)
+ComparisonTask = Tuple[str, str, int, int]
+
+
+def get_example(label: str, list_len: int, sample: int = 0, seed: int = 0) -> List[int]:
+    """
+    Builds the example list for a label. Random examples come from a Random seeded by
+    (seed, label, sample), so every algo and every worker process sees the same lists.
+    """
+    if label == 'best':
+        return [x+1 for x in range(list_len)]
+    if label == 'worst':
+        return [x for x in range(list_len, 0, -1)]
+    rng = Random('{}-{}-{}'.format(seed, label, sample))
+    return [rng.randint(1, 20) for _ in range(list_len)]
+
+
+def count_sample_operations(
+        task: ComparisonTask,
+        list_len: int,
+        seed: int = 0,
+        mode: TraceMode = TraceMode.COUNTS,
+    ) -> Tuple[ComparisonTask, List[Dict[str, int]]]:
+    """Runs in a worker: traces one algo on samples [first, end) of a label and returns their op counts."""
+    algo_name, label, first, end = task
+    algo = ALGOS_BY_NAME[algo_name]
+    counts = []
+    for sample in range(first, end):
+        ops, op_counter = get_operations(algo, get_example(label, list_len, sample, seed), mode)
+        counts.append({
+            'total_op_count': len(ops),
+            'index_store_operations': op_counter.get('V', 0),
+            'switch_operations': op_counter.get('W', 0),
+        })
+    return task, counts
 
-    algos_to_outcomes = {}
-    algos = [selection_sort, bubble_sort, insertion_sort, heapsort, merge_sort, quick_sort]
 
-    labels_to_examples = {
-        'best': [x+1 for x in range(10)],
-        'worst': [x for x in range(10, 0, -1)],
-        'random': get_random_list(min_len_list=10, max_len_list=10),
+def get_comparison_tasks(algo_names: List[str], samples: int) -> List[ComparisonTask]:
+    """Splits (algo x label x sample) into tasks of at most SAMPLES_PER_TASK samples each."""
+    if samples < 1:
+        # 'avg' would get no tasks and so no counts to average
+        raise ValueError('samples must be at least 1, got {}'.format(samples))
+    tasks = []
+    for algo_name in algo_names:
+        for label in EXAMPLE_LABELS:
+            label_samples = samples if label == 'avg' else 1
+            for first in range(0, label_samples, SAMPLES_PER_TASK):
+                tasks.append((algo_name, label, first, min(first + SAMPLES_PER_TASK, label_samples)))
+    return tasks
+
+
+def iter_operation_counts(
+        algo_names: List[str],
+        list_len: int = 10,
+        samples: int = 100,
+        mode: TraceMode = TraceMode.COUNTS,
+        seed: int = 0,
+        workers: Optional[int] = None,
+    ) -> Iterator[Tuple[ComparisonTask, List[Dict[str, int]]]]:
+    """
+    Yields (task, per-sample op counts) as each task finishes, in completion order.
+    workers defaults to os.cpu_count(); with workers=1 tasks run in this process, in order.
+    """
+    tasks = get_comparison_tasks(algo_names, samples)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for task in tasks:
+            yield count_sample_operations(task, list_len, seed, mode)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(count_sample_operations, task, list_len, seed, mode) for task in tasks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def summarize_counts(counts: List[Dict[str, int]]) -> Dict[str, float]:
+    """Averages per-sample op counts (a single sample is reported as is)."""
+    summary = {
+        metric: counts[0][metric] if len(counts) == 1 else mean(c[metric] for c in counts)
+        for metric in ('total_op_count', 'index_store_operations', 'switch_operations')
     }
-    random_ex_to_average = [
-        get_random_list(min_len_list=10, max_len_list=10)
-        for _ in range(100)
-    ]
+    summary['total_minus_index_store'] = summary['total_op_count'] - summary['index_store_operations']
+    return summary
 
-    print('Examples:')
-    pprint(labels_to_examples)
 
-    for algo in algos:
+def main(
+        list_len: int = 10,
+        samples: int = 100,
+        mode: TraceMode = TraceMode.COUNTS,
+        seed: int = 0,
+        workers: Optional[int] = None,
+    ) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Counts operations with an OperationTrace (COUNTS mode by default) rather than text,
+    so list_len can be raised well past the 10-element demo lists.
+
+    Each (algo, label, batch of samples) runs as its own task across a process pool; an algo's
+    outcomes are printed as soon as all of its tasks are in. The returned outcomes only depend
+    on seed, not on workers or on the order tasks finish in.
+    """
+    print('About to run some operational count comparisons for sorting algos...')
+
+    algo_names = [algo.__name__ for algo in ALL_ALGOS]
+
+    if list_len <= 20:
+        print('Examples:')
+        pprint({label: get_example(label, list_len, seed=seed) for label in EXAMPLE_LABELS if label != 'avg'})
+
+    pending = Counter(task[0] for task in get_comparison_tasks(algo_names, samples))
+    # (algo, label) -> {first sample: counts}; reassembled in sample order so means don't depend on timing
+    collected: Dict[Tuple[str, str], Dict[int, List[Dict[str, int]]]] = defaultdict(dict)
+    algos_to_outcomes = {}
+
+    for task, counts in iter_operation_counts(algo_names, list_len, samples, mode, seed, workers):
+        algo_name, label, first, _ = task
+        collected[algo_name, label][first] = counts
+        pending[algo_name] -= 1
+        if pending[algo_name]:
+            continue
+
         outcomes = {}
-        for label, ex in labels_to_examples.items():
-            ops, op_counter = get_operations(algo, list(ex))
-            outcomes[label] = {
-                'total_op_count': len(ops),
-                'total_minus_index_store': len(ops) - op_counter.get('V', 0),
-                'index_store_operations': op_counter.get('V', 0),
-                'switch_operations': op_counter.get('W', 0),
-            }
-        random_outcomes_to_avg = []
-        for avg_ex in random_ex_to_average:
-            random_outcomes_to_avg.append(get_operations(algo, list(avg_ex)))
-
-        outcomes['avg'] = {
-            'total_op_count': mean(
-                [len(x[0]) for x in random_outcomes_to_avg]
-            ),
-            'index_store_operations': mean(
-                [x[1].get('V', 0) for x in random_outcomes_to_avg]
-            ),
-            'switch_operations': mean(
-                [x[1].get('W', 0) for x in random_outcomes_to_avg]
-            ),
-        }
-        outcomes['avg']['total_minus_index_store'] = (
-            outcomes['avg']['total_op_count']
-            - outcomes['avg']['index_store_operations']
-        )
-        algos_to_outcomes[algo.__name__] = outcomes
+        for label in EXAMPLE_LABELS:
+            batches = collected.pop((algo_name, label))
+            outcomes[label] = summarize_counts([c for first in sorted(batches) for c in batches[first]])
+        algos_to_outcomes[algo_name] = outcomes
+        print('{} done: {} ops on average'.format(algo_name, outcomes['avg']['total_op_count']))
 
+    algos_to_outcomes = {name: algos_to_outcomes[name] for name in algo_names}
     print('Outcomes:')
     pprint(algos_to_outcomes)
+    return algos_to_outcomes
+
+
+def compare_throughput(
+        list_len: int = 10**6,
+        max_val: int = 20,
+        typecode: Optional[str] = None,
+        algos: Optional[List[Callable]] = None,
+    ) -> Dict[str, float]:
+    """
+    Times each algo (untraced) on the same random list and returns items sorted per second.
+    Pass typecode (e.g. 'i' or 'q') to sort an array of that type instead of a list.
+    """
+    algos = algos or FAST_ALGOS
+    example = get_random_list(min_len_list=list_len, max_len_list=list_len, max_val_list=max_val)
+    expected = sorted(example)
+
+    algos_to_throughput = {}
+    for algo in algos:
+        lst = array(typecode, example) if typecode else list(example)
+        start = perf_counter()
+        algo(lst, trace=OperationTrace(TraceMode.NONE))
+        elapsed = perf_counter() - start
+        assert list(lst) == expected, '{} did not sort correctly'.format(algo.__name__)
+        algos_to_throughput[algo.__name__] = list_len / elapsed if elapsed else float('inf')
+    return algos_to_throughput
 
 
 if __name__ == '__main__':
     main()
+
+    print('\nItems sorted per second (100000 values from 1 to 20, array(\'q\')):')
+    pprint(compare_throughput(100000, typecode='q'))
@@ -1,9 +1,27 @@
 """Functions to help with sort demos."""
 
+from array import array
 from collections import Counter
 from enum import Enum
-from random import randint
-from typing import Any, Callable, List, Optional, Tuple
+from operator import itemgetter
+from random import Random, randint
+from typing import Any, Callable, Iterator, List, MutableSequence, Optional, Sequence, Tuple, Union
+
+
+class TraceMode(Enum):
+    TEXT = 'text'
+    STRUCTURED = 'structured'
+    COUNTS = 'counts'
+    NONE = 'none'
+
+
+class ListDistribution(Enum):
+    SORTED = 'sorted'
+    REVERSED = 'reversed'
+    RANDOM = 'random'
+    FEW_UNIQUE = 'few_unique'
+    ORGAN_PIPE = 'organ_pipe'
+    SAWTOOTH = 'sawtooth'
 
 
 class SortOperationType(Enum):
@@ -15,6 +33,11 @@ class SortOperationType(Enum):
     LOAD_HEAP = 'L'
     POP_HEAP = 'P'
 
+    @property
+    def code(self) -> int:
+        """Compact integer code used by OperationTrace instead of the text description."""
+        return list(SortOperationType).index(self)
+
     def get_sort_operation_str(self, lst: List[Any], sort: Optional[str] = None, *args, **kwargs) -> str:
         return '{}: {}'.format(self.value, self.get_string_method(sort)(lst, *args, **kwargs))
 
@@ -83,6 +106,172 @@ class SortOperationType(Enum):
         return 'Setting index {} (value {}) as new min index...'.format(j, lst[j])
 
 
+class OperationTrace:
+    """
+    Records sort operations as integer codes and index pairs in array-backed buffers.
+
+    Nothing is formatted while sorting; text is only rendered on demand with render().
+    COUNTS mode keeps per-operation totals only, and NONE mode records nothing at all.
+    """
+    RENDER_TEMPLATES = {
+        SortOperationType.INIT: 'Processing index {} (bound {})...',
+        SortOperationType.COMPARE: 'Comparing index {} to index {}...',
+        SortOperationType.SWITCH: 'Switching indexes {} and {}...',
+        SortOperationType.STORE: 'Setting index {} as new stored index...',
+        SortOperationType.COPY_LIST: 'Copying indexes {} to {}...',
+        SortOperationType.LOAD_HEAP: 'Loading index {} into heap...',
+        SortOperationType.POP_HEAP: 'Popped heap into index {}...',
+    }
+
+    def __init__(self, mode: TraceMode = TraceMode.STRUCTURED):
+        if mode == TraceMode.TEXT:
+            raise ValueError('Text operations are returned by the sorts themselves when no trace is given')
+        self.mode = mode
+        self.codes = array('b')
+        self.firsts = array('q')
+        self.seconds = array('q')
+        self._counts = [0] * len(SortOperationType)
+
+    def recorder(self) -> Optional[Callable[..., None]]:
+        """Returns the callable sorts record with, or None if nothing should be recorded."""
+        if self.mode == TraceMode.STRUCTURED:
+            return self._record_structured
+        if self.mode == TraceMode.COUNTS:
+            return self._record_count
+        return None
+
+    def _record_structured(self, code: int, first: int = -1, second: int = -1) -> None:
+        self.codes.append(code)
+        self.firsts.append(first)
+        self.seconds.append(second)
+
+    def _record_count(self, code: int, first: int = -1, second: int = -1) -> None:
+        self._counts[code] += 1
+
+    def counts(self) -> Counter:
+        """Returns operation counts keyed by SortOperationType value, like get_operations does for text."""
+        if self.mode == TraceMode.STRUCTURED:
+            counts = [self.codes.count(code) for code in range(len(SortOperationType))]
+        else:
+            counts = self._counts
+        return Counter({op.value: count for op, count in zip(SortOperationType, counts) if count})
+
+    def render(self) -> Iterator[str]:
+        """Lazily formats recorded operations; only available in STRUCTURED mode."""
+        op_types = list(SortOperationType)
+        for code, first, second in zip(self.codes, self.firsts, self.seconds):
+            op = op_types[code]
+            yield '{}: {}'.format(op.value, self.RENDER_TEMPLATES[op].format(first, second))
+
+    def __iter__(self) -> Iterator[str]:
+        return self.render()
+
+    def __len__(self) -> int:
+        if self.mode == TraceMode.STRUCTURED:
+            return len(self.codes)
+        return sum(self._counts)
+
+
+def as_slice_values(lst: MutableSequence, values: List[Any]) -> MutableSequence:
+    """Packs values the way slice assignment into lst needs them: an array for arrays and memoryviews."""
+    if isinstance(lst, array):
+        return array(lst.typecode, values)
+    if isinstance(lst, memoryview):
+        return array(lst.format, values)
+    return values
+
+
+def apply_permutation(lst: MutableSequence, order: Sequence[int]) -> None:
+    """Rearranges lst in place so that the new lst[i] is the old lst[order[i]]."""
+    lst[:] = as_slice_values(lst, [lst[i] for i in order])
+
+
+def take(seq: Sequence, order: Sequence[int]) -> Sequence:
+    """Returns [seq[i] for i in order] as the same kind of sequence (an array stays an array of its typecode)."""
+    if len(order) < 2:
+        values = [seq[i] for i in order]
+    else:
+        values = list(itemgetter(*order)(seq))
+    if isinstance(seq, array):
+        return array(seq.typecode, values)
+    if isinstance(seq, memoryview):
+        return array(seq.format, values)
+    return values
+
+
+def permute_columns(columns: Sequence[MutableSequence], order: Sequence[int]) -> None:
+    """
+    Applies one permutation (as from argsort) to many parallel columns in place, like apply_permutation
+    on each; the gather is built once from order and then runs at C speed on every column.
+    """
+    for column in columns:
+        if len(column) != len(order):
+            raise ValueError('Column of length {} does not match a permutation of length {}'.format(len(column), len(order)))
+    if len(order) < 2:
+        return
+    gather = itemgetter(*order)
+    for column in columns:
+        column[:] = as_slice_values(column, list(gather(column)))
+
+
+def _sorted_order(
+        fnc: Callable,
+        lst: Sequence,
+        trace: Optional[OperationTrace] = None,
+        key: Optional[Callable[[Any], Any]] = None,
+        reverse: bool = False,
+    ) -> Tuple[array, Union[List[str], OperationTrace]]:
+    """Sorts (key, index) pairs for lst with fnc; returns the resulting order of indexes and fnc's result."""
+    keys = [key(item) for item in lst] if key is not None else list(lst)
+    if reverse:
+        decorated = [(k, -i) for i, k in enumerate(keys)]
+    else:
+        decorated = list(zip(keys, range(len(keys))))
+
+    result = fnc(decorated, trace=trace)
+
+    if reverse:
+        order = array('q', [-i for _, i in reversed(decorated)])
+    else:
+        order = array('q', [i for _, i in decorated])
+    return order, result
+
+
+def argsort(
+        fnc: Callable,
+        lst: Sequence,
+        trace: Optional[OperationTrace] = None,
+        key: Optional[Callable[[Any], Any]] = None,
+        reverse: bool = False,
+    ) -> array:
+    """
+    Returns the permutation that would sort lst with fnc, as an array('q') of indexes, leaving lst untouched:
+    take(lst, argsort(fnc, lst)) is sorted. Equal keys keep their input order whatever fnc is,
+    since fnc sorts (key, index) pairs. counting_sort and radix_sort have argsorts of their own for ints.
+    """
+    return _sorted_order(fnc, lst, trace, key, reverse)[0]
+
+
+def sort_with_key(
+        fnc: Callable,
+        lst: MutableSequence,
+        trace: Optional[OperationTrace] = None,
+        key: Optional[Callable[[Any], Any]] = None,
+        reverse: bool = False,
+    ) -> Union[List[str], OperationTrace]:
+    """
+    Sorts lst in place with fnc by key(item), calling key exactly once per item.
+
+    The keys are cached in a parallel list and fnc sorts (key, index) pairs built from it, so fnc never
+    compares the items themselves and equal keys keep their input order even if fnc is not stable.
+    For reverse the indexes are negated and the sorted pairs read back to front, which keeps that
+    stability. Returns whatever fnc returns for the pairs (its operations or trace).
+    """
+    order, result = _sorted_order(fnc, lst, trace, key, reverse)
+    apply_permutation(lst, order)
+    return result
+
+
 def get_random_list(
         min_len_list: int = 5,
         max_len_list: int = 12,
@@ -95,7 +284,46 @@ def get_random_list(
     ]
 
 
-def get_operations(fnc: Callable, lst: List[int]) -> Tuple[List[str], Counter]:
+def get_distribution_list(
+        distribution: ListDistribution,
+        length: int,
+        rng: Optional[Random] = None,
+    ) -> List[int]:
+    """
+    Builds a list of ints with the given shape; pass a seeded Random for repeatable random data.
+    Organ pipe rises then falls; sawtooth repeats ascending runs of about sqrt(length) values.
+    """
+    rng = rng or Random()
+    if distribution == ListDistribution.SORTED:
+        return list(range(length))
+    if distribution == ListDistribution.REVERSED:
+        return list(range(length, 0, -1))
+    if distribution == ListDistribution.RANDOM:
+        return [rng.randint(0, length) for _ in range(length)]
+    if distribution == ListDistribution.FEW_UNIQUE:
+        return [rng.randint(1, 10) for _ in range(length)]
+    if distribution == ListDistribution.ORGAN_PIPE:
+        return [i if i < length // 2 else length - i for i in range(length)]
+    if distribution == ListDistribution.SAWTOOTH:
+        tooth = max(1, int(length ** 0.5))
+        return [i % tooth for i in range(length)]
+    raise ValueError('Unknown distribution {}'.format(distribution))
+
+
+def get_operations(
+        fnc: Callable,
+        lst: List[int],
+        mode: TraceMode = TraceMode.TEXT,
+    ) -> Tuple[Union[List[str], OperationTrace], Counter]:
+    """
+    TEXT mode returns the formatted operation strings, which format the whole list on every
+    operation; other modes hand the sort an OperationTrace so large lists stay cheap to trace.
+    """
+    if mode != TraceMode.TEXT:
+        trace = OperationTrace(mode)
+        fnc(lst, trace=trace)
+        return (trace, trace.counts())
+
     operations = fnc(lst)
     operation_buckets = Counter(''.join([x.strip()[0] for x in operations]))
 
@@ -0,0 +1,203 @@
+"""
+Demonstrates string-specialized sorts that look at each character at most once per level:
+MSD (most significant digit first) radix sort and multikey (three-way radix) quicksort.
+
+Comparison sorts re-compare the shared prefix of two strings every time they meet; these sorts
+instead group strings by the character at depth d and only go one character deeper inside a group,
+so their work grows with the distinguishing prefixes rather than with n log n full comparisons.
+Both also return the LCP array: lcp[i] is the length of the longest common prefix of lst[i - 1]
+and lst[i] (lcp[0] is 0), which falls out of the grouping for free.
+
+msd_radix_sort is the one to use for speed: it splits a range on every character at once, and beats
+introsort and timsort on the word list. multikey_quicksort splits on one pivot character at a time,
+so each string is moved several times per depth; in CPython that costs as much as the comparisons
+it saves, and it runs level with introsort. It is kept as the reference version of the algorithm.
+"""
+
+import os
+from array import array
+from collections import defaultdict
+from random import Random
+from time import perf_counter
+from typing import Callable, List, MutableSequence, Optional
+
+from insertion_sort import insertion_sort_range
+from natural_merge_sort import timsort
+from quicksort import introsort
+from sort_demo_helpers import SortOperationType
+
+INIT, STORE = SortOperationType.INIT.code, SortOperationType.STORE.code
+
+# buckets this small are insertion sorted by whole-string comparisons instead of split further
+STRING_INSERTION_CUTOFF = 16
+WORD_LIST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'other', 'english.txt')
+
+
+def common_prefix_length(a: str, b: str, start: int = 0) -> int:
+    """Returns the length of the common prefix of a and b, which are known to agree on a[:start]."""
+    end = min(len(a), len(b))
+    i = start
+    while i < end and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def _insertion_sort_bucket(
+        lst: MutableSequence[str],
+        lo: int,
+        hi: int,
+        depth: int,
+        lcp: array,
+        record: Optional[Callable[..., None]] = None,
+    ) -> None:
+    """Sorts lst[lo:hi], whose strings all share a prefix of length depth, and fills in lcp[lo + 1:hi]."""
+    insertion_sort_range(lst, lo, hi - 1, record)
+    for i in range(lo + 1, hi):
+        lcp[i] = common_prefix_length(lst[i - 1], lst[i], depth)
+
+
+def msd_radix_sort(lst: MutableSequence[str], record: Optional[Callable[..., None]] = None) -> array:
+    """
+    Sorts a list of strings in place and returns its LCP array as an array('q').
+
+    Each range is distributed into buckets by its character at the current depth (strings that
+    end there go first), the buckets are written back in character order, and every bucket of
+    more than STRING_INSERTION_CUTOFF strings is processed again one character deeper.
+    This is the fastest sort here for lists of words (hybrid_sort uses it for strings).
+    """
+    n = len(lst)
+    lcp = array('q', bytes(8 * n))
+    # (lo, hi, depth): lst[lo:hi] share their first depth characters
+    stack = [(0, n, 0)]
+    while stack:
+        lo, hi, depth = stack.pop()
+        if hi - lo <= STRING_INSERTION_CUTOFF:
+            _insertion_sort_bucket(lst, lo, hi, depth, lcp, record)
+            continue
+
+        if record:
+            record(INIT, lo, hi)
+        buckets = defaultdict(list)
+        for s in lst[lo:hi]:
+            # '' for strings of length depth, which sorts before every character
+            buckets[s[depth:depth + 1]].append(s)
+
+        k = lo
+        for char in sorted(buckets):
+            bucket = buckets[char]
+            size = len(bucket)
+            lst[k:k + size] = bucket
+            if record:
+                record(STORE, k, k + size)
+            # neighbours from different buckets agree on exactly depth characters
+            if k > lo:
+                lcp[k] = depth
+            if not char:
+                # strings that ended here are all equal
+                for i in range(k + 1, k + size):
+                    lcp[i] = depth
+            elif size > 1:
+                stack.append((k, k + size, depth + 1))
+            k += size
+
+    return lcp
+
+
+def multikey_quicksort(lst: MutableSequence[str], record: Optional[Callable[..., None]] = None) -> array:
+    """
+    Sorts a list of strings in place (Bentley and Sedgewick's three-way radix quicksort)
+    and returns its LCP array as an array('q').
+
+    Each range is three-way partitioned on its character at the current depth: the less and
+    greater sides are partitioned again at the same depth and the equal middle one character
+    deeper. Each range carries its strings' characters at its depth, so the same-depth passes
+    reuse them instead of slicing every string again, and strings are only written back to lst
+    once their final range is known. Still, a range takes about log2(distinct characters) passes
+    per depth, so this is only about as fast as introsort; msd_radix_sort is the fast one.
+    """
+    n = len(lst)
+    lcp = array('q', bytes(8 * n))
+    # (lo, strings, chars, depth): strings belong in lst[lo:lo + len(strings)] and share their first
+    # depth characters; chars[i] is strings[i][depth:depth + 1], or chars is None if not computed yet
+    stack = [(0, list(lst), None, 0)]
+    while stack:
+        lo, strings, chars, depth = stack.pop()
+        size = len(strings)
+        if size <= STRING_INSERTION_CUTOFF:
+            lst[lo:lo + size] = strings
+            _insertion_sort_bucket(lst, lo, lo + size, depth, lcp, record)
+            continue
+
+        if record:
+            record(INIT, lo, lo + size)
+        if chars is None:
+            chars = [s[depth:depth + 1] for s in strings]
+        pivot = sorted((chars[0], chars[size // 2], chars[-1]))[1]
+
+        less, less_chars, equal, greater, greater_chars = [], [], [], [], []
+        for s, char in zip(strings, chars):
+            if char < pivot:
+                less.append(s)
+                less_chars.append(char)
+            elif pivot < char:
+                greater.append(s)
+                greater_chars.append(char)
+            else:
+                equal.append(s)
+
+        # less < pivot character == equal < greater at this depth
+        mid, end = lo + len(less), lo + len(less) + len(equal)
+        if less:
+            lcp[mid] = depth
+            stack.append((lo, less, less_chars, depth))
+        if greater:
+            lcp[end] = depth
+            stack.append((end, greater, greater_chars, depth))
+        if pivot:
+            stack.append((mid, equal, None, depth + 1))
+        else:
+            # strings that ended here are all equal
+            lst[mid:end] = equal
+            if record:
+                record(STORE, mid, end)
+            for i in range(mid + 1, end):
+                lcp[i] = depth
+
+    return lcp
+
+
+def load_words(path: str = WORD_LIST_PATH, count: int = 300000) -> List[str]:
+    """
+    Returns the words of the list saved by other/get_english_word_list.py, or, if it has not been
+    downloaded, count made-up lowercase words with a similar spread of lengths.
+    """
+    if os.path.exists(path):
+        with open(path) as f:
+            return f.read().split()
+    rng = Random(0)
+    letters = 'etaoinshrdlcumwfgypbvkjxqz'
+    weights = list(range(len(letters), 0, -1))
+    return [''.join(rng.choices(letters, weights, k=rng.randint(2, 14))) for _ in range(count)]
+
+
+def main() -> None:
+    words = ['banana', 'band', 'ban', 'apple', 'bandana', 'ban', 'applet', 'b']
+    lcp = multikey_quicksort(words)
+    print('Sorted: {}'.format(words))
+    print('LCP:    {}'.format(lcp.tolist()))
+
+    corpus = load_words()
+    expected = sorted(corpus)
+    print('\nSorting {} words{}:'.format(
+        len(corpus), '' if os.path.exists(WORD_LIST_PATH) else ' (made up; run other/get_english_word_list.py for the real list)'))
+    for sort_fnc in (msd_radix_sort, multikey_quicksort, introsort, timsort):
+        lst = list(corpus)
+        start = perf_counter()
+        sort_fnc(lst)
+        elapsed = perf_counter() - start
+        assert lst == expected, '{} did not sort correctly'.format(sort_fnc.__name__)
+        print('{:>20}: {:.3f}s'.format(sort_fnc.__name__, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,13 @@
 """Demo of breadth-first search and depth-first search."""
 
-from typing import Any, Dict, List
+from array import array
+from collections import deque
+from random import Random
+from time import perf_counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+# anything with `in` and add(): a set, or a Bitset for graphs whose nodes are the ints 0..n - 1
+Visited = Union[Set[Any], 'Bitset']
 
 
 class NodeScroller:
@@ -11,12 +18,15 @@ class NodeScroller:
         ) -> List[Any]:
         """Accepts a graph or tree in simplified dict form and returns a list of nodes in breadth-first order."""
         visited = [starting_node]
-        queue = [starting_node]
+        # the set makes the membership check O(1); visited keeps the order
+        seen = {starting_node}
+        queue = deque([starting_node])
 
         while queue:
-            dequeued_node = queue.pop(0)
+            dequeued_node = queue.popleft()
             for neighbor in simplified_graph_or_tree[dequeued_node]:
-                if neighbor not in visited:
+                if neighbor not in seen:
+                    seen.add(neighbor)
                     visited.append(neighbor)
                     queue.append(neighbor)
 
@@ -26,15 +36,235 @@ class NodeScroller:
     def simplified_depth_first_search(
             simplified_graph_or_tree: Dict[Any, List[Any]],
             starting_node: Any,
-            visited: List[Any] = [],
+            visited: Optional[List[Any]] = None,
         ) -> List[Any]:
-        """Accepts a graph or tree in simplified dict form and returns a list of nodes in depth-first order."""
-        visited.append(starting_node)
-        for neighbor in simplified_graph_or_tree[starting_node]:
-            if neighbor not in visited:
-                NodeScroller.simplified_depth_first_search(simplified_graph_or_tree, neighbor)
+        """
+        Accepts a graph or tree in simplified dict form and returns a list of nodes in depth-first order.
+        If visited is given, the nodes are appended to it and nodes already in it are not visited again.
+        """
+        visited = [] if visited is None else visited
+        walk = NodeScroller.iter_depth_first(simplified_graph_or_tree, starting_node, visited=set(visited))
+        visited.extend(node for node, _, _ in walk)
         return visited
 
+    @staticmethod
+    def iter_breadth_first(
+            graph: Dict[Any, Iterable[Any]],
+            starting_node: Any,
+            max_depth: Optional[int] = None,
+            visited: Optional[Visited] = None,
+        ) -> Iterator[Tuple[Any, int, Any]]:
+        """
+        Lazily yields (node, depth, parent) in breadth-first order, starting with (starting_node, 0, None).
+
+        graph is anything that maps a node to its neighbors: a simplified dict, or a CSRGraph with
+        visited=Bitset(len(graph)). Nodes deeper than max_depth are not yielded, and nothing is
+        explored past what has been consumed, so breaking out of the loop ends the search. visited
+        (a new set by default) gets every node that has been queued, and nodes already in it are skipped.
+        """
+        visited = set() if visited is None else visited
+        visited.add(starting_node)
+        queue = deque([(starting_node, 0, None)])
+        while queue:
+            node, depth, parent = queue.popleft()
+            yield node, depth, parent
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for neighbor in graph[node]:
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    queue.append((neighbor, depth + 1, node))
+
+    @staticmethod
+    def iter_depth_first(
+            graph: Dict[Any, Iterable[Any]],
+            starting_node: Any,
+            max_depth: Optional[int] = None,
+            visited: Optional[Visited] = None,
+        ) -> Iterator[Tuple[Any, int, Any]]:
+        """
+        Lazily yields (node, depth, parent) in depth-first preorder (the order of the recursive search),
+        starting with (starting_node, 0, None). Takes the same arguments as iter_breadth_first, and keeps
+        a stack of neighbor iterators instead of recursing, so deep graphs don't hit the recursion limit.
+
+        With max_depth, a node first reached near the limit on a long path may also be within reach on a
+        shorter one, so a node reached again at a smaller depth is explored again from there (it is still
+        yielded only once, with the depth it was first reached at). Every node within max_depth edges of
+        starting_node is yielded, in O((V + E) * max_depth) at worst.
+        """
+        visited = set() if visited is None else visited
+        visited.add(starting_node)
+        yield starting_node, 0, None
+        if max_depth is not None and max_depth <= 0:
+            return
+        # the smallest depth each node has been explored from; nodes in visited but not here were given
+        # by the caller and are never entered
+        depths = {starting_node: 0} if max_depth is not None else None
+        stack = [(starting_node, iter(graph[starting_node]))]
+        while stack:
+            parent, neighbors = stack[-1]
+            # the stack is the path from starting_node, so its length is the depth of the next node
+            depth = len(stack)
+            for neighbor in neighbors:
+                if neighbor not in visited:
+                    break
+                if depths is not None and depth < depths.get(neighbor, -1):
+                    break
+            else:
+                stack.pop()
+                continue
+            if neighbor not in visited:
+                visited.add(neighbor)
+                yield neighbor, depth, parent
+            if depths is not None:
+                depths[neighbor] = depth
+            if max_depth is None or depth < max_depth:
+                stack.append((neighbor, iter(graph[neighbor])))
+
+
+class Bitset:
+    """A fixed-size set of the ints 0..size - 1, one bit each."""
+
+    def __init__(self, size: int):
+        self.size = size
+        # bit i & 7 of byte i >> 3 is set for each i in the set
+        self.bits = bytearray((size + 7) >> 3)
+
+    def __contains__(self, i: int) -> bool:
+        return bool(self.bits[i >> 3] & (1 << (i & 7)))
+
+    def add(self, i: int) -> None:
+        self.bits[i >> 3] |= 1 << (i & 7)
+
+
+class CSRGraph:
+    """
+    A directed graph in compressed sparse row form: nodes are the ids 0..n - 1, and the neighbors
+    of node i are targets[offsets[i]:offsets[i + 1]]. Both are array('q')s, so a graph with tens of
+    millions of edges takes 8 bytes per edge instead of a Python list entry and object per edge.
+    """
+
+    def __init__(self, labels: List[Any], offsets: array, targets: array):
+        self.labels = labels
+        self.ids: Dict[Any, int] = {label: i for i, label in enumerate(labels)}
+        self.offsets = offsets
+        self.targets = targets
+
+    @classmethod
+    def from_simplified_graph_representation(cls, simplified_graph_repr: Dict[Any, List[Any]]) -> 'CSRGraph':
+        """
+        Builds the graph in one pass over the dict form. Nodes get ids in dict order, and nodes that
+        only appear as a neighbor get the next free ids (with no edges of their own).
+        """
+        labels = list(simplified_graph_repr)
+        ids = {label: i for i, label in enumerate(labels)}
+        offsets = array('q', [0])
+        targets = array('q')
+        for conns in simplified_graph_repr.values():
+            try:
+                targets.extend([ids[conn] for conn in conns])
+            except KeyError:
+                for conn in conns:
+                    if conn not in ids:
+                        ids[conn] = len(labels)
+                        labels.append(conn)
+                targets.extend([ids[conn] for conn in conns])
+            offsets.append(len(targets))
+        offsets.extend([len(targets)] * (len(labels) - len(simplified_graph_repr)))
+        return cls(labels, offsets, targets)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def neighbors(self, node_id: int) -> array:
+        return self.targets[self.offsets[node_id]:self.offsets[node_id + 1]]
+
+    # lets NodeScroller.iter_breadth_first and iter_depth_first walk the graph by id
+    __getitem__ = neighbors
+
+    def breadth_first_ids(self, start_id: int) -> array:
+        """Returns the ids reachable from start_id in breadth-first order, in O(V + E)."""
+        offsets, targets = self.offsets, self.targets
+        visited = Bitset(len(self))
+        visited.add(start_id)
+        # the bit tests are inlined: method calls per edge would cost more than the search itself
+        bits = visited.bits
+        # every node is enqueued at most once, so the queue is just the output read from a moving head
+        order = array('q', [start_id])
+        head = 0
+        while head < len(order):
+            node = order[head]
+            head += 1
+            for neighbor in targets[offsets[node]:offsets[node + 1]]:
+                byte, bit = neighbor >> 3, 1 << (neighbor & 7)
+                if not bits[byte] & bit:
+                    bits[byte] |= bit
+                    order.append(neighbor)
+        return order
+
+    def depth_first_ids(self, start_id: int) -> array:
+        """
+        Returns the ids reachable from start_id in depth-first preorder (the same order as the recursive
+        search), in O(V + E) without recursion: the stack holds nodes, and next_edge where each left off.
+        """
+        offsets, targets = self.offsets, self.targets
+        visited = Bitset(len(self))
+        visited.add(start_id)
+        bits = visited.bits
+        order = array('q', [start_id])
+        next_edge = array('q', offsets)
+        stack = [start_id]
+        while stack:
+            node = stack[-1]
+            edge, end = next_edge[node], offsets[node + 1]
+            while edge < end and bits[targets[edge] >> 3] & (1 << (targets[edge] & 7)):
+                edge += 1
+            if edge == end:
+                stack.pop()
+                continue
+            next_edge[node] = edge + 1
+            neighbor = targets[edge]
+            bits[neighbor >> 3] |= 1 << (neighbor & 7)
+            order.append(neighbor)
+            stack.append(neighbor)
+        return order
+
+    def breadth_first_search(self, starting_node: Any) -> List[Any]:
+        """Like NodeScroller.simplified_breadth_first_search, on labels."""
+        labels = self.labels
+        return [labels[i] for i in self.breadth_first_ids(self.ids[starting_node])]
+
+    def depth_first_search(self, starting_node: Any) -> List[Any]:
+        """Like NodeScroller.simplified_depth_first_search, on labels."""
+        labels = self.labels
+        return [labels[i] for i in self.depth_first_ids(self.ids[starting_node])]
+
+
+def get_random_simplified_graph(node_count: int, edge_count: int, rng: Optional[Random] = None) -> Dict[int, List[int]]:
+    """Builds a random directed graph on nodes 0..node_count - 1 in simplified dict form."""
+    rng = rng or Random()
+    graph: Dict[int, List[int]] = {node: [] for node in range(node_count)}
+    for _ in range(edge_count):
+        graph[rng.randrange(node_count)].append(rng.randrange(node_count))
+    return graph
+
+
+def benchmark_csr(node_count: int = 200000, edge_count: int = 1000000) -> None:
+    graph = get_random_simplified_graph(node_count, edge_count, Random(0))
+
+    start = perf_counter()
+    csr = CSRGraph.from_simplified_graph_representation(graph)
+    print('CSR build for {} nodes, {} edges: {:.3f}s'.format(len(csr), csr.edge_count, perf_counter() - start))
+
+    for name, search in (('breadth-first', csr.breadth_first_ids), ('depth-first', csr.depth_first_ids)):
+        start = perf_counter()
+        reached = len(search(0))
+        print('CSR {}: {} nodes reached in {:.3f}s'.format(name, reached, perf_counter() - start))
+
 
 def main() -> None:
     graph = {
@@ -54,6 +284,19 @@ def main() -> None:
     assert visited_depth == [x for x in 'ABDEFC']
 
     print("breadth-first: {}\ndepth-first: {}".format(visited_breadth, visited_depth))
+    print("breadth-first (node, depth, parent) to depth 1: {}".format(list(NodeScroller.iter_breadth_first(graph, 'A', max_depth=1))))
+    for node, depth, parent in NodeScroller.iter_depth_first(graph, 'A'):
+        if node == 'E':
+            print("depth-first reached E at depth {} from {}".format(depth, parent))
+            break
+
+    csr = CSRGraph.from_simplified_graph_representation(graph)
+    assert csr.breadth_first_search('A') == visited_breadth
+    assert csr.depth_first_search('A') == visited_depth
+    assert [csr.labels[i] for i, _, _ in NodeScroller.iter_depth_first(csr, 0, visited=Bitset(len(csr)))] == visited_depth
+    print("CSR offsets: {}; targets: {}".format(csr.offsets.tolist(), csr.targets.tolist()))
+
+    benchmark_csr()
 
 
 if __name__ == '__main__':
@@ -65,4 +308,10 @@ $ python3 algos/x_first_search.py
 Graph: {'A': ['B', 'C'], 'B': ['D', 'E'], 'C': ['F'], 'D': [], 'E': ['F'], 'F': []}; Starting at A
 breadth-first: ['A', 'B', 'C', 'D', 'E', 'F']
 depth-first: ['A', 'B', 'D', 'E', 'F', 'C']
+breadth-first (node, depth, parent) to depth 1: [('A', 0, None), ('B', 1, 'A'), ('C', 1, 'A')]
+depth-first reached E at depth 2 from B
+CSR offsets: [0, 2, 4, 5, 5, 6, 6]; targets: [1, 2, 3, 4, 5, 5]
+CSR build for 200000 nodes, 1000000 edges: 1.208s
+CSR breadth-first: 198603 nodes reached in 0.428s
+CSR depth-first: 198603 nodes reached in 0.655s
 """
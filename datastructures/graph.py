@@ -1,5 +1,6 @@
 """Demo for directed graphs."""
 
+from collections import deque
 from typing import Any, Dict, List, Optional, Tuple, Type
 
 
@@ -21,13 +22,24 @@ class GraphNode:
             new_connection.add_connection(self)
         if self._graph:
             self._graph.add_node(self)
+            self._graph.connection_added(self, new_connection)
 
 
 class Graph:
-    def __init__(self, nodes: Optional[List['GraphNode']] = None, **kwargs):
+    def __init__(self, nodes: Optional[List['GraphNode']] = None, maintain_topological_order: bool = False, **kwargs):
+        """
+        With maintain_topological_order, the graph keeps a topological order up to date as connections are
+        added (Pearce and Kelly's algorithm), so has_cycle and topological_sort don't need a full pass.
+        """
         self._nodes: Dict[Any, 'GraphNode'] = {}
         self.directed_vertices: Dict['GraphNode', List['GraphNode']] = {}
-        for n in nodes:
+        # node -> position in the online topological order; None when it isn't maintained
+        self._order: Optional[Dict['GraphNode', int]] = {} if maintain_topological_order else None
+        # the connections already placed in the order, both ways; only these are searched when reordering
+        self._outgoing: Dict['GraphNode', List['GraphNode']] = {}
+        self._incoming: Dict['GraphNode', List['GraphNode']] = {}
+        self._cycle_found = False
+        for n in nodes or []:
             self.add_node(n)
 
     @classmethod
@@ -63,34 +75,167 @@ class Graph:
         node.add_to_graph(self)
         self._nodes[node.val] = node
         self.directed_vertices[node] = node.connections
+        if self._order is not None and node not in self._order:
+            self._track_node(node)
 
-    def has_cycle(self) -> bool:
-        visited = {x: False for x in self.directed_vertices.keys()}
-        recursion_stack = {x: False for x in self.directed_vertices.keys()}
-        for node in self.directed_vertices.keys():
-            if not visited[node]:
-                if self._has_cycle_helper(node, visited, recursion_stack):
-                    return True
-        return False
+    def connection_added(self, node: 'GraphNode', new_connection: 'GraphNode') -> None:
+        """Called by GraphNode.add_connection after node -> new_connection was added."""
+        if self._order is None:
+            return
+        if new_connection not in self._order:
+            self.add_node(new_connection)
+        self._insert_ordered_edge(node, new_connection)
+
+    def _track_node(self, node: 'GraphNode') -> None:
+        """Puts node, and any untracked node it leads to, at the end of the order, then orders their connections."""
+        new_nodes = [node]
+        self._order[node] = len(self._order)
+        for tail in new_nodes:
+            for head in tail.connections:
+                if head not in self._order:
+                    self._order[head] = len(self._order)
+                    new_nodes.append(head)
+        for new_node in new_nodes[1:]:
+            self.add_node(new_node)
+        for tail in new_nodes:
+            for head in tail.connections:
+                self._insert_ordered_edge(tail, head)
+
+    def _insert_ordered_edge(self, tail: 'GraphNode', head: 'GraphNode') -> None:
+        """
+        Restores the topological order after tail -> head was added. Only the nodes ordered between head and
+        tail can be out of place: those reachable from head move up to just after those that reach tail,
+        keeping the positions they had between them. Reaching tail from head means the edge closed a cycle.
+        """
+        self._outgoing.setdefault(tail, []).append(head)
+        self._incoming.setdefault(head, []).append(tail)
+        order = self._order
+        if self._cycle_found or order[head] > order[tail]:
+            return
+        lower, upper = order[head], order[tail]
+
+        reached_from_head = []
+        seen = {head}
+        stack = [head]
+        while stack:
+            node = stack.pop()
+            reached_from_head.append(node)
+            for connection in self._outgoing.get(node, ()):
+                if connection is tail:
+                    self._cycle_found = True
+                    return
+                if connection not in seen and order[connection] < upper:
+                    seen.add(connection)
+                    stack.append(connection)
 
-    def _has_cycle_helper(self, node: 'GraphNode', visited: Dict['GraphNode', bool], rec_stack: Dict['GraphNode', bool]) -> bool:
-        visited[node] = True
-        rec_stack[node] = True
+        reaching_tail = []
+        seen = {tail}
+        stack = [tail]
+        while stack:
+            node = stack.pop()
+            reaching_tail.append(node)
+            for source in self._incoming.get(node, ()):
+                if source not in seen and order[source] > lower:
+                    seen.add(source)
+                    stack.append(source)
 
-        print("visiting {}".format(node))
+        moved = sorted(reaching_tail, key=order.get) + sorted(reached_from_head, key=order.get)
+        for node, position in zip(moved, sorted(order[node] for node in moved)):
+            order[node] = position
 
-        for connection in self.directed_vertices[node]:
-            if visited[connection] and rec_stack[connection]:
-                print("cycle found on {}".format(connection))
-                return True
+    def _all_nodes(self) -> List['GraphNode']:
+        """Returns the graph's nodes, then any node only reachable through connections."""
+        nodes = dict.fromkeys(self.directed_vertices)
+        pending = list(nodes)
+        while pending:
+            for connection in pending.pop().connections:
+                if connection not in nodes:
+                    nodes[connection] = None
+                    pending.append(connection)
+        return list(nodes)
 
-            if not visited[connection]:
-                print("visiting {} through helper".format(connection))
-                if self._has_cycle_helper(connection, visited, rec_stack):
-                    return True
+    def _kahn_order(self) -> Tuple[List['GraphNode'], int]:
+        """
+        Returns (nodes in Kahn's order, node count): nodes are taken once nothing unvisited points to them,
+        so the nodes on or behind a cycle are never taken.
+        """
+        nodes = self._all_nodes()
+        in_degree = {node: 0 for node in nodes}
+        for node in nodes:
+            for connection in node.connections:
+                in_degree[connection] += 1
 
-        rec_stack[node] = False
-        return False
+        queue = deque(node for node in nodes if not in_degree[node])
+        order = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for connection in node.connections:
+                in_degree[connection] -= 1
+                if not in_degree[connection]:
+                    queue.append(connection)
+        return order, len(nodes)
+
+    def topological_sort(self) -> List['GraphNode']:
+        """Returns the nodes so that every connection points forward; raises ValueError if there is a cycle."""
+        if self._order is not None and not self._cycle_found:
+            return sorted(self._order, key=self._order.get)
+        order, node_count = self._kahn_order()
+        if len(order) < node_count:
+            raise ValueError('Graph has a cycle, so it has no topological order')
+        return order
+
+    def has_cycle(self) -> bool:
+        if self._order is not None:
+            return self._cycle_found
+        order, node_count = self._kahn_order()
+        return len(order) < node_count
+
+    def strongly_connected_components(self) -> List[List['GraphNode']]:
+        """
+        Returns the strongly connected components (Tarjan's algorithm, with an explicit stack instead of
+        recursion). A component comes after every component it has connections into.
+        """
+        index: Dict['GraphNode', int] = {}
+        lowlink: Dict['GraphNode', int] = {}
+        component_stack: List['GraphNode'] = []
+        on_component_stack = set()
+        components = []
+
+        for root in self._all_nodes():
+            if root in index:
+                continue
+            index[root] = lowlink[root] = len(index)
+            component_stack.append(root)
+            on_component_stack.add(root)
+            # (node, iterator over the connections still to look at)
+            work = [(root, iter(root.connections))]
+            while work:
+                node, connections = work[-1]
+                for connection in connections:
+                    if connection not in index:
+                        index[connection] = lowlink[connection] = len(index)
+                        component_stack.append(connection)
+                        on_component_stack.add(connection)
+                        work.append((connection, iter(connection.connections)))
+                        break
+                    if connection in on_component_stack:
+                        lowlink[node] = min(lowlink[node], index[connection])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index[node]:
+                        component = []
+                        while True:
+                            member = component_stack.pop()
+                            on_component_stack.discard(member)
+                            component.append(member)
+                            if member is node:
+                                break
+                        components.append(component)
+        return components
 
 
 def main() -> None:
@@ -118,38 +263,38 @@ def main() -> None:
     print(simplified_repr_dict)
     graph2 = Graph.from_simplified_graph_representation(simplified_repr_dict)
     print("Does graph generated from simplified representation have a cycle?", graph2.has_cycle())
+    print("Strongly connected components:", [[str(n) for n in c] for c in graph2.strongly_connected_components()])
+
+    graph_nodes_map["seattle"].connections.remove(graph_nodes_map["pdx"])
+    print("Topological order without seattle -> pdx:", [str(n) for n in graph.topological_sort()])
+
+    print("Adding the same connections one at a time to a graph that keeps its topological order...")
+    tracked_nodes = {val: GraphNode(val) for val in simplified_repr_dict}
+    tracked_graph = Graph(list(tracked_nodes.values()), maintain_topological_order=True)
+    for val, conns in simplified_repr_dict.items():
+        for conn in conns:
+            tracked_nodes[val].add_connection(tracked_nodes[conn])
+            print("  added {} -> {}; has cycle? {}".format(val, conn, tracked_graph.has_cycle()))
 
 
 if __name__ == "__main__":
     main()
 
 
+
 """
 $ python3 datastructures/graph.py
-visiting GraphNode <nyc>
-visiting GraphNode <la>
-visiting GraphNode <pdx> through helper
-visiting GraphNode <pdx>
-visiting GraphNode <seattle> through helper
-visiting GraphNode <seattle>
-visiting GraphNode <denver>
 Does graph have cycle? False
-visiting GraphNode <nyc>
-visiting GraphNode <la>
-visiting GraphNode <pdx> through helper
-visiting GraphNode <pdx>
-visiting GraphNode <seattle> through helper
-visiting GraphNode <seattle>
-cycle found on GraphNode <pdx>
 Does graph have cycle? True
 Generating a simplified graph dict...
 {'nyc': [], 'la': ['pdx'], 'seattle': ['pdx'], 'pdx': ['seattle'], 'denver': ['nyc', 'la']}
-visiting GraphNode <nyc>
-visiting GraphNode <la>
-visiting GraphNode <pdx> through helper
-visiting GraphNode <pdx>
-visiting GraphNode <seattle> through helper
-visiting GraphNode <seattle>
-cycle found on GraphNode <pdx>
 Does graph generated from simplified representation have a cycle? True
-"""
\ No newline at end of file
+Strongly connected components: [['GraphNode <nyc>'], ['GraphNode <seattle>', 'GraphNode <pdx>'], ['GraphNode <la>'], ['GraphNode <denver>']]
+Topological order without seattle -> pdx: ['GraphNode <denver>', 'GraphNode <nyc>', 'GraphNode <la>', 'GraphNode <pdx>', 'GraphNode <seattle>']
+Adding the same connections one at a time to a graph that keeps its topological order...
+  added la -> pdx; has cycle? False
+  added seattle -> pdx; has cycle? False
+  added pdx -> seattle; has cycle? True
+  added denver -> nyc; has cycle? True
+  added denver -> la; has cycle? True
+"""
@@ -0,0 +1,10 @@
+"""Puts algos/ and datastructures/ on sys.path, since their modules import their siblings by bare name."""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, os.path.join(ROOT, 'algos'))
+# appended, so datastructures/queue.py doesn't shadow the standard library's queue
+sys.path.append(os.path.join(ROOT, 'datastructures'))
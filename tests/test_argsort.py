@@ -0,0 +1,86 @@
+from array import array
+from functools import partial
+from random import Random
+
+import pytest
+
+from columnar_sort import lexsort, sort_columns
+from counting_sort import counting_argsort
+from heap_sort import heapsort
+from merge_sort import merge_sort
+from quicksort import quick_sort
+from radix_sort import lsd_radix_argsort
+from shell_sort import shell_sort
+from sort_demo_helpers import argsort, permute_columns, take
+
+
+def _reference_lexsort(columns, reverses):
+    order = list(range(len(columns[0])))
+    for column, rev in reversed(list(zip(columns, reverses))):
+        order.sort(key=column.__getitem__, reverse=rev)
+    return order
+
+
+@pytest.mark.parametrize('fnc', [heapsort, merge_sort, quick_sort, shell_sort], ids=lambda f: f.__name__)
+@pytest.mark.parametrize('reverse', [False, True])
+def test_argsort_is_a_stable_permutation(fnc, reverse):
+    rng = Random(0)
+    for n in (0, 1, 2, 100):
+        values = [rng.randint(0, 9) for _ in range(n)]
+        original = list(values)
+        order = argsort(fnc, values, reverse=reverse)
+        assert values == original
+        assert list(order) == sorted(range(n), key=values.__getitem__, reverse=reverse)
+        assert take(values, order) == sorted(values, reverse=reverse)
+
+
+def test_take_and_permute_columns_keep_container_types():
+    order = array('q', [2, 0, 1])
+    assert take(array('d', [1.0, 2.0, 3.0]), order) == array('d', [3.0, 1.0, 2.0])
+    assert take(['a', 'b', 'c'], order[:1]) == ['c']
+    columns = [[10, 20, 30], array('q', [1, 2, 3])]
+    permute_columns(columns, order)
+    assert columns == [[30, 10, 20], array('q', [3, 1, 2])]
+    with pytest.raises(ValueError):
+        permute_columns([[1, 2]], order)
+    # short permutations are checked too, and no column is touched before a mismatch is found
+    with pytest.raises(ValueError):
+        permute_columns([[1, 2, 3, 4, 5]], array('q', [0]))
+    columns = [[2, 1], [3]]
+    with pytest.raises(ValueError):
+        permute_columns(columns, array('q', [1, 0]))
+    assert columns == [[2, 1], [3]]
+
+
+INT_ARGSORTERS = [None, counting_argsort, lsd_radix_argsort, partial(argsort, heapsort)]
+
+
+@pytest.mark.parametrize('argsorter', INT_ARGSORTERS, ids=['default', 'counting', 'radix', 'heapsort'])
+def test_lexsort_matches_multi_pass_sorted(argsorter):
+    rng = Random(1)
+    for _ in range(30):
+        n = rng.randint(0, 80)
+        columns = [[rng.randint(-3, 3) for _ in range(n)] for _ in range(rng.randint(1, 3))]
+        reverses = [rng.random() < 0.5 for _ in columns]
+        order = lexsort(columns, reverses, argsorter)
+        assert list(order) == _reference_lexsort(columns, reverses)
+
+
+def test_sort_columns_by_some_keys():
+    rng = Random(2)
+    names = [rng.choice('xyz') for _ in range(50)]
+    ages = array('q', [rng.randint(20, 25) for _ in range(50)])
+    ids = list(range(50))
+    expected = _reference_lexsort([ages, names], [True, False])
+
+    order = sort_columns([names, ages, ids], key_columns=[1, 0], reverse=[True, False])
+    assert list(order) == expected
+    assert ids == expected
+    assert list(zip(ages, names)) == sorted(zip(ages, names), key=lambda row: (-row[0], row[1]))
+
+    with pytest.raises(ValueError):
+        lexsort([])
+    with pytest.raises(ValueError):
+        lexsort([[1, 2], [1]])
+    with pytest.raises(ValueError):
+        lexsort([[1, 2], [1, 2]], reverse=[True])
@@ -0,0 +1,70 @@
+import os
+from random import Random
+
+import pytest
+
+import batch_dijkstra
+from batch_dijkstra import SharedGraph, batch_shortest_paths
+from dijkstra import get_grid_road_graph, weighted_dijkstra
+
+
+def _random_graph(rng, n=30):
+    graph = {node: [] for node in range(n)}
+    for _ in range(3 * n):
+        # neighbors outside range(n) only appear as targets and get ids after the graph's own nodes
+        graph[rng.randrange(n)].append((rng.randrange(n + 5), rng.randint(0, 9)))
+    return graph
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+@pytest.mark.parametrize('chunk_size', [1, 4, 100])
+def test_batch_matches_weighted_dijkstra(workers, chunk_size):
+    graph = _random_graph(Random(chunk_size))
+    with SharedGraph(graph) as shared_graph:
+        targets = {neighbor for edges in graph.values() for neighbor, _ in edges}
+        assert shared_graph.labels == list(graph) + sorted(targets - set(graph), key=shared_graph.ids.get)
+        assert shared_graph.node_count == len(set(graph) | targets)
+        assert shared_graph.edge_count == 90
+        results = list(batch_shortest_paths(shared_graph, graph, workers, chunk_size))
+        assert sorted(source for source, _ in results) == sorted(graph)
+        for source, distances in results:
+            assert shared_graph.distances_by_label(distances) == weighted_dijkstra(graph, source)[0]
+
+
+def test_interleaved_serial_batches_do_not_interfere():
+    rng = Random(1)
+    graph_a, _ = get_grid_road_graph(6, 6, rng)
+    graph_b = _random_graph(rng)
+    with SharedGraph(graph_a) as shared_a, SharedGraph(graph_b) as shared_b:
+        batch_a = batch_shortest_paths(shared_a, list(graph_a)[:10], workers=1, chunk_size=1)
+        batch_b = batch_shortest_paths(shared_b, list(graph_b)[:10], workers=1, chunk_size=1)
+        for (source_a, distances_a), (source_b, distances_b) in zip(batch_a, batch_b):
+            assert shared_a.distances_by_label(distances_a) == pytest.approx(weighted_dijkstra(graph_a, source_a)[0])
+            assert shared_b.distances_by_label(distances_b) == weighted_dijkstra(graph_b, source_b)[0]
+
+
+def test_paused_batch_holds_no_views():
+    graph = _random_graph(Random(2))
+    shared_graph = SharedGraph(graph)
+    batch = batch_shortest_paths(shared_graph, graph, workers=1, chunk_size=1)
+    next(batch)
+    # close() raises BufferError if any view into the block is still alive
+    shared_graph.close()
+
+
+def test_negative_weights_and_empty_graphs():
+    with pytest.raises(ValueError):
+        SharedGraph({'a': [('b', -1)]})
+    with SharedGraph({}) as shared_graph:
+        assert list(batch_shortest_paths(shared_graph, [], workers=1)) == []
+
+
+def test_failed_fill_frees_the_block(monkeypatch):
+    def broken_views(shared_memory, node_count, edge_count):
+        raise OverflowError('fill failed')
+
+    before = set(os.listdir('/dev/shm'))
+    monkeypatch.setattr(batch_dijkstra, '_views', broken_views)
+    with pytest.raises(OverflowError):
+        SharedGraph({'a': [('b', 1)]})
+    assert set(os.listdir('/dev/shm')) == before
@@ -0,0 +1,66 @@
+import struct
+from array import array
+from random import Random
+
+import pytest
+
+from buffer_sort import sort_buffer, sort_file_in_place, typed_view
+from merge_sort import bottom_up_merge_sort
+from natural_merge_sort import timsort
+from quicksort import introsort
+
+ENGINES = [introsort, timsort, bottom_up_merge_sort]
+
+
+@pytest.mark.parametrize('engine', ENGINES, ids=lambda e: e.__name__)
+@pytest.mark.parametrize('typecode', ['q', 'i', 'd', 'B'])
+def test_sort_buffer_sorts_arrays_in_place(engine, typecode):
+    rng = Random(typecode)
+    for length in (0, 1, 2, 100, 1000):
+        if typecode == 'd':
+            values = [rng.uniform(-1e9, 1e9) for _ in range(length)]
+        else:
+            values = [rng.randint(0, 255) for _ in range(length)]
+        buffer = array(typecode, values)
+        sort_buffer(buffer, engine=engine)
+        assert buffer.tolist() == sorted(values)
+        # the view was released, so the array can still be resized
+        buffer.append(0)
+
+
+@pytest.mark.parametrize('engine', ENGINES, ids=lambda e: e.__name__)
+def test_sort_buffer_reads_raw_bytes_as_the_given_format(engine):
+    rng = Random(1)
+    values = [rng.randint(-2**63, 2**63 - 1) for _ in range(300)]
+    buffer = bytearray(struct.pack('{}q'.format(len(values)), *values))
+    sort_buffer(buffer, engine=engine)
+    assert list(struct.unpack('{}q'.format(len(values)), buffer)) == sorted(values)
+
+    doubles = [rng.random() for _ in range(50)]
+    buffer = bytearray(struct.pack('50d', *doubles))
+    sort_buffer(buffer, 'd', engine)
+    assert list(struct.unpack('50d', buffer)) == sorted(doubles)
+
+
+def test_typed_view_rejects_bad_buffers():
+    with pytest.raises(TypeError):
+        typed_view(b'\x00' * 8)
+    with pytest.raises(ValueError):
+        typed_view(bytearray(12), 'q')
+    with typed_view(array('d', [1.0])) as view:
+        assert view.format == 'd'
+
+
+@pytest.mark.parametrize('engine', ENGINES, ids=lambda e: e.__name__)
+def test_sort_file_in_place(tmp_path, engine):
+    rng = Random(2)
+    values = array('q', [rng.randint(-10**12, 10**12) for _ in range(5000)])
+    path = tmp_path / 'ints.bin'
+    path.write_bytes(values.tobytes())
+    sort_file_in_place(str(path), engine=engine)
+    assert array('q', path.read_bytes()).tolist() == sorted(values)
+
+    empty = tmp_path / 'empty.bin'
+    empty.write_bytes(b'')
+    sort_file_in_place(str(empty), engine=engine)
+    assert empty.read_bytes() == b''
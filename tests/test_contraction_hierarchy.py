@@ -0,0 +1,88 @@
+from random import Random
+
+import pytest
+
+from contraction_hierarchy import ContractionHierarchy
+from dijkstra import get_grid_road_graph, weighted_dijkstra
+
+INF = float('inf')
+
+
+def _random_weighted_graph(rng):
+    n = rng.randint(1, 15)
+    graph = {node: [] for node in range(n)}
+    for _ in range(rng.randint(0, 4 * n)):
+        # self loops, parallel edges, zero weights and nodes that only appear as neighbors
+        graph[rng.randrange(n)].append((rng.randrange(n + 2), rng.randint(0, 9)))
+    return graph
+
+
+def _path_length(graph, path):
+    return sum(min(w for neighbor, w in graph[a] if neighbor == b) for a, b in zip(path, path[1:]))
+
+
+def _check_queries(graph, hierarchy, approx=False):
+    for start in hierarchy.labels:
+        distances, _ = weighted_dijkstra(graph, start)
+        for target in hierarchy.labels:
+            distance, path, _ = hierarchy.query(start, target)
+            expected = distances.get(target, INF)
+            assert distance == (pytest.approx(expected) if approx and expected != INF else expected)
+            if expected == INF:
+                assert path == []
+            else:
+                assert path[0] == start and path[-1] == target
+                # shortcuts are all unpacked into original edges
+                assert _path_length(graph, path) == pytest.approx(distance)
+
+
+def test_queries_match_dijkstra_on_random_graphs():
+    rng = Random(0)
+    for _ in range(60):
+        graph = _random_weighted_graph(rng)
+        hierarchy = ContractionHierarchy.build(graph)
+        assert sorted(hierarchy.ranks) == list(range(len(hierarchy.labels)))
+        _check_queries(graph, hierarchy)
+
+
+def test_queries_match_dijkstra_on_a_road_grid():
+    graph, _ = get_grid_road_graph(8, 8, Random(1))
+    hierarchy = ContractionHierarchy.build(graph)
+    assert hierarchy.shortcut_count > 0
+    _check_queries(graph, hierarchy, approx=True)
+
+
+def test_shortcuts_stay_near_the_edge_count():
+    rng = Random(4)
+    graph, _ = get_grid_road_graph(20, 20, rng)
+    hierarchy = ContractionHierarchy.build(graph)
+    edge_count = sum(len(edges) for edges in graph.values())
+    assert hierarchy.shortcut_count <= 1.2 * edge_count
+    # and the point of them: queries settle a small part of what Dijkstra does
+    pairs = [(rng.randrange(len(graph)), rng.randrange(len(graph))) for _ in range(50)]
+    hierarchy_settled = sum(hierarchy.query(*pair)[2] for pair in pairs)
+    dijkstra_settled = sum(len(weighted_dijkstra(graph, *pair)[0]) for pair in pairs)
+    assert hierarchy_settled * 2 < dijkstra_settled
+
+
+def test_save_and_load_round_trip(tmp_path):
+    graph = {'a': [('b', 1), ('c', 4)], 'b': [('c', 1), ('d', 5)], 'c': [('d', 1)], 'd': [('a', 2)]}
+    hierarchy = ContractionHierarchy.build(graph)
+    path = str(tmp_path / 'ch.json')
+    hierarchy.save(path)
+    loaded = ContractionHierarchy.load(path)
+    assert loaded.labels == hierarchy.labels
+    assert loaded.ranks == hierarchy.ranks
+    assert loaded.forward == hierarchy.forward and loaded.backward == hierarchy.backward
+    for start in graph:
+        for target in graph:
+            assert loaded.query(start, target)[:2] == hierarchy.query(start, target)[:2]
+
+
+def test_unknown_nodes_and_negative_weights():
+    hierarchy = ContractionHierarchy.build({'a': [('b', 1)]})
+    assert hierarchy.query('a', 'nowhere')[:2] == (INF, [])
+    assert hierarchy.query('nowhere', 'nowhere')[:2] == (0, ['nowhere'])
+    assert hierarchy.query('b', 'a')[:2] == (INF, [])
+    with pytest.raises(ValueError):
+        ContractionHierarchy.build({'a': [('b', -1)]})
@@ -0,0 +1,59 @@
+from array import array
+from random import Random
+
+import pytest
+
+from counting_sort import COUNTING_MIN_SPAN, counting_argsort, counting_sort, span_too_wide
+from radix_sort import lsd_radix_argsort, lsd_radix_sort
+from sort_demo_helpers import OperationTrace, TraceMode
+
+SORTS = [counting_sort, lsd_radix_sort]
+ARGSORTS = [counting_argsort, lsd_radix_argsort]
+
+
+def _random_ints(rng, length, lo, hi):
+    return [rng.randint(lo, hi) for _ in range(length)]
+
+
+@pytest.mark.parametrize('fnc', SORTS, ids=lambda f: f.__name__)
+@pytest.mark.parametrize('lo, hi', [(0, 10), (-500, 500), (-2**62, 2**62), (7, 7)])
+def test_int_sorts_match_sorted(fnc, lo, hi):
+    rng = Random(hi)
+    for length in (0, 1, 2, 100, 1000):
+        values = _random_ints(rng, length, lo, hi)
+        for container in (list, lambda v: array('q', v)):
+            lst = container(values)
+            fnc(lst, OperationTrace(TraceMode.NONE))
+            assert list(lst) == sorted(values)
+
+
+def test_counting_sort_hands_wide_spans_to_radix():
+    assert not span_too_wide(0, COUNTING_MIN_SPAN - 1, 1)
+    assert span_too_wide(0, 10**12, 1000)
+    trace = OperationTrace(TraceMode.COUNTS)
+    lst = [10**15, 0, -10**15]
+    counting_sort(lst, trace)
+    assert lst == [-10**15, 0, 10**15]
+    # a table of 2 * 10**15 counters would never have fit in memory
+    assert len(trace) < 1000
+
+
+@pytest.mark.parametrize('fnc', SORTS, ids=lambda f: f.__name__)
+@pytest.mark.parametrize('reverse', [False, True])
+def test_int_sorts_key_and_reverse_are_stable(fnc, reverse):
+    rng = Random(5)
+    records = [(rng.randint(-3, 3), i) for i in range(300)]
+    lst = list(records)
+    fnc(lst, key=lambda record: record[0], reverse=reverse)
+    assert lst == sorted(records, key=lambda record: record[0], reverse=reverse)
+
+
+@pytest.mark.parametrize('fnc', ARGSORTS, ids=lambda f: f.__name__)
+@pytest.mark.parametrize('lo, hi', [(0, 20), (-2**40, 2**40)])
+def test_int_argsorts_are_stable_permutations(fnc, lo, hi):
+    rng = Random(lo)
+    values = _random_ints(rng, 500, lo, hi) + _random_ints(rng, 100, 0, 3)
+    for reverse in (False, True):
+        order = fnc(values, reverse=reverse)
+        assert list(order) == sorted(range(len(values)), key=values.__getitem__, reverse=reverse)
+    assert len(fnc([])) == 0
@@ -0,0 +1,128 @@
+from random import Random
+
+import pytest
+
+from dijkstra import (
+    a_star, bidirectional_dijkstra, dijkstra_shortest_paths, euclidean_heuristic, get_grid_road_graph, get_reverse_graph,
+    reconstruct_path, shortest_path, weighted_dijkstra,
+)
+
+INF = float('inf')
+
+
+def _bellman_ford(graph, start):
+    nodes = set(graph) | {neighbor for edges in graph.values() for neighbor, _ in edges}
+    distances = {node: INF for node in nodes}
+    distances[start] = 0
+    for _ in range(len(nodes)):
+        for node, edges in graph.items():
+            for neighbor, weight in edges:
+                distances[neighbor] = min(distances[neighbor], distances[node] + weight)
+    return {node: distance for node, distance in distances.items() if distance != INF}
+
+
+def _random_weighted_graphs(seed, count=60):
+    """Random directed graphs with small integer weights (so sums are exact), including zero weights and ties."""
+    rng = Random(seed)
+    for _ in range(count):
+        n = rng.randint(1, 25)
+        graph = {node: [] for node in range(n)}
+        for _ in range(rng.randint(0, 4 * n)):
+            graph[rng.randrange(n)].append((rng.randrange(n + 3), rng.randint(0, 9)))
+        yield graph
+
+
+def _path_length(graph, path):
+    return sum(min(w for neighbor, w in graph[a] if neighbor == b) for a, b in zip(path, path[1:]))
+
+
+def test_weighted_dijkstra_matches_bellman_ford():
+    for graph in _random_weighted_graphs(0):
+        for start in graph:
+            distances, predecessors = weighted_dijkstra(graph, start)
+            assert distances == _bellman_ford(graph, start)
+            for node, distance in distances.items():
+                path = reconstruct_path(predecessors, node)
+                assert path[0] == start and path[-1] == node
+                assert _path_length(graph, path) == distance
+
+
+def test_early_exit_and_shortest_path():
+    rng = Random(1)
+    for graph in _random_weighted_graphs(1):
+        start = rng.randrange(len(graph))
+        target = rng.randrange(len(graph) + 3)
+        full = _bellman_ford(graph, start)
+        distances, _ = weighted_dijkstra(graph, start, target)
+        # every node settled before the target is no farther away, and their distances are final
+        assert all(full[node] == distance <= full.get(target, INF) for node, distance in distances.items())
+        distance, path = shortest_path(graph, start, target)
+        assert distance == full.get(target, INF)
+        assert (path == []) == (target not in full)
+        if path:
+            assert _path_length(graph, path) == distance
+
+
+def test_on_relax_and_unit_weights():
+    graph = {'a': ['b', 'c'], 'b': ['d'], 'c': ['d'], 'd': []}
+    assert dijkstra_shortest_paths(graph, 'a') == {'a': 0, 'b': 1, 'c': 1, 'd': 2}
+    relaxed = []
+    weighted_dijkstra({'a': [('b', 5), ('c', 1)], 'c': [('b', 1)]}, 'a', on_relax=lambda *args: relaxed.append(args))
+    assert relaxed == [('b', 5), ('c', 1), ('b', 2)]
+
+
+def test_negative_weights_are_rejected():
+    with pytest.raises(ValueError):
+        weighted_dijkstra({'a': [('b', -1)]}, 'a')
+
+
+@pytest.mark.parametrize('search', [bidirectional_dijkstra, a_star], ids=lambda f: f.__name__)
+def test_point_to_point_searches_match_dijkstra(search):
+    rng = Random(2)
+    for graph in _random_weighted_graphs(2):
+        for _ in range(5):
+            start, target = rng.randrange(len(graph)), rng.randrange(len(graph) + 3)
+            expected = _bellman_ford(graph, start).get(target, INF)
+            distance, path, _ = search(graph, start, target)
+            assert distance == expected
+            if expected == INF:
+                assert path == []
+            else:
+                assert path[0] == start and path[-1] == target
+                assert _path_length(graph, path) == distance
+
+
+def test_point_to_point_searches_on_a_road_grid():
+    rng = Random(3)
+    graph, coordinates = get_grid_road_graph(25, 25, rng)
+    reverse_graph = get_reverse_graph(graph)
+    heuristic = euclidean_heuristic(coordinates)
+    for _ in range(20):
+        start, target = rng.sample(list(graph), 2)
+        distances, _ = weighted_dijkstra(graph, start, target)
+        expected = distances[target]
+        dijkstra_settled = len(distances)
+        for distance, path, settled in (
+                bidirectional_dijkstra(graph, start, target, reverse_graph),
+                a_star(graph, start, target, heuristic)):
+            assert distance == pytest.approx(expected)
+            assert _path_length(graph, path) == pytest.approx(expected)
+            # both exist to settle fewer nodes than plain Dijkstra
+            assert settled <= dijkstra_settled
+
+
+def test_a_star_reopens_nodes_for_inconsistent_heuristics():
+    # h is admissible but not consistent (h(a) > w(a, b) + h(b)), so b is first settled through the longer s -> b edge
+    graph = {'s': [('a', 1), ('b', 4)], 'a': [('b', 1)], 'b': [('t', 5)], 't': []}
+    h = {'s': 0, 'a': 6, 'b': 0, 't': 0}
+    assert a_star(graph, 's', 't', lambda node, target: h[node])[:2] == (7, ['s', 'a', 'b', 't'])
+
+
+def test_point_to_point_edge_cases():
+    graph = {'a': [('b', 1)], 'b': []}
+    for search in (bidirectional_dijkstra, a_star):
+        assert search(graph, 'a', 'a')[:2] == (0, ['a'])
+        assert search(graph, 'b', 'a')[:2] == (INF, [])
+        assert search(graph, 'a', 'nowhere')[:2] == (INF, [])
+        with pytest.raises(ValueError):
+            search({'a': [('b', -1)], 'b': []}, 'a', 'b')
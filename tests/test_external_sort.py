@@ -0,0 +1,59 @@
+from array import array
+from random import Random
+
+import pytest
+
+from external_sort import ITEM_FORMAT, ITEM_SIZE, external_sort
+
+
+def _write_ints(path, values, binary):
+    if binary:
+        with open(path, 'wb') as f:
+            array(ITEM_FORMAT, values).tofile(f)
+    else:
+        with open(path, 'w') as f:
+            # several values per line, to check whitespace splitting
+            for i in range(0, len(values), 3):
+                f.write(' '.join(map(str, values[i:i + 3])) + '\n')
+
+
+def _read_ints(path, binary):
+    if binary:
+        with open(path, 'rb') as f:
+            return array(ITEM_FORMAT, f.read()).tolist()
+    with open(path) as f:
+        return [int(line) for line in f]
+
+
+@pytest.mark.parametrize('binary', [True, False], ids=['binary', 'text'])
+@pytest.mark.parametrize('memory_items, max_fan_in', [(10**6, 64), (50, 64), (16, 2), (7, 3)])
+def test_external_sort_matches_sorted(tmp_path, binary, memory_items, max_fan_in):
+    rng = Random(memory_items + max_fan_in)
+    values = [rng.randint(-10**12, 10**12) for _ in range(1000)]
+    input_path, output_path = str(tmp_path / 'input'), str(tmp_path / 'output')
+    _write_ints(input_path, values, binary)
+
+    runs = external_sort(input_path, output_path, memory_items * ITEM_SIZE, binary, max_fan_in, temp_dir=str(tmp_path))
+
+    assert runs == -(-len(values) // memory_items)
+    assert _read_ints(output_path, binary) == sorted(values)
+    # only the input, the output and nothing left over from the runs
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['input', 'output']
+
+
+def test_external_sort_empty_input_and_bad_fan_in(tmp_path):
+    input_path, output_path = str(tmp_path / 'input'), str(tmp_path / 'output')
+    _write_ints(input_path, [], True)
+    assert external_sort(input_path, output_path) == 0
+    assert _read_ints(output_path, True) == []
+    with pytest.raises(ValueError):
+        external_sort(input_path, output_path, max_fan_in=1)
+
+
+def test_truncated_binary_input_is_rejected_before_spilling(tmp_path):
+    input_path, output_path = str(tmp_path / 'input'), str(tmp_path / 'output')
+    with open(input_path, 'wb') as f:
+        f.write(array(ITEM_FORMAT, range(100)).tobytes() + b'\x01\x02\x03')
+    with pytest.raises(ValueError, match='input'):
+        external_sort(input_path, output_path, 10 * ITEM_SIZE, temp_dir=str(tmp_path))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['input']
@@ -0,0 +1,116 @@
+from random import Random
+
+import pytest
+
+from graph import Graph, GraphNode
+
+
+def _random_edges(rng, n, edge_count, acyclic=False):
+    edges = []
+    for _ in range(edge_count):
+        a, b = rng.randrange(n), rng.randrange(n)
+        if acyclic:
+            a, b = min(a, b), max(a, b)
+            if a == b:
+                continue
+        edges.append((a, b))
+    return edges
+
+
+def _reachable(edges, start):
+    seen, stack = {start}, [start]
+    while stack:
+        node = stack.pop()
+        for a, b in edges:
+            if a == node and b not in seen:
+                seen.add(b)
+                stack.append(b)
+    return seen
+
+
+def _reference_has_cycle(n, edges):
+    # some node reaches itself through at least one edge
+    return any(a == b or a in _reachable(edges, b) for a, b in edges)
+
+
+def _build(n, edges, **kwargs):
+    nodes = [GraphNode(i) for i in range(n)]
+    for a, b in edges:
+        nodes[a].add_connection(nodes[b])
+    return Graph(nodes, **kwargs), nodes
+
+
+def _assert_topological(order, n, edges):
+    position = {node.val: i for i, node in enumerate(order)}
+    assert sorted(position) == list(range(n))
+    assert all(position[a] < position[b] for a, b in edges)
+
+
+@pytest.mark.parametrize('acyclic', [False, True])
+def test_has_cycle_and_topological_sort(acyclic):
+    rng = Random(acyclic)
+    for _ in range(100):
+        n = rng.randint(1, 12)
+        edges = _random_edges(rng, n, rng.randint(0, 2 * n), acyclic)
+        expected = _reference_has_cycle(n, edges)
+        for maintain in (False, True):
+            graph, _ = _build(n, edges, maintain_topological_order=maintain)
+            assert graph.has_cycle() == expected
+            if expected:
+                with pytest.raises(ValueError):
+                    graph.topological_sort()
+            else:
+                _assert_topological(graph.topological_sort(), n, edges)
+
+
+def test_order_is_maintained_as_connections_are_added():
+    rng = Random(2)
+    for _ in range(50):
+        n = rng.randint(2, 15)
+        nodes = [GraphNode(i) for i in range(n)]
+        graph = Graph(nodes, maintain_topological_order=True)
+        edges = []
+        for a, b in _random_edges(rng, n, 3 * n):
+            nodes[a].add_connection(nodes[b])
+            edges.append((a, b))
+            assert graph.has_cycle() == _reference_has_cycle(n, edges)
+            if not graph.has_cycle():
+                _assert_topological(graph.topological_sort(), n, edges)
+
+
+def test_nodes_only_reachable_through_connections_are_ordered():
+    a, b, c = GraphNode('a'), GraphNode('b'), GraphNode('c')
+    b.add_connection(c)
+    graph = Graph([a], maintain_topological_order=True)
+    a.add_connection(b)
+    assert [node.val for node in graph.topological_sort()] == ['a', 'b', 'c']
+    c.add_connection(a)
+    assert graph.has_cycle()
+
+
+def test_strongly_connected_components():
+    rng = Random(3)
+    for _ in range(100):
+        n = rng.randint(1, 12)
+        edges = _random_edges(rng, n, rng.randint(0, 2 * n))
+        graph, _ = _build(n, edges)
+        components = [[node.val for node in component] for component in graph.strongly_connected_components()]
+        assert sorted(val for component in components for val in component) == list(range(n))
+        reach = {node: _reachable(edges, node) for node in range(n)}
+        component_of = {val: i for i, component in enumerate(components) for val in component}
+        for u in range(n):
+            for v in range(n):
+                assert (component_of[u] == component_of[v]) == (v in reach[u] and u in reach[v])
+                # a component comes after every component it has connections into
+                if v in reach[u] and component_of[u] != component_of[v]:
+                    assert component_of[v] < component_of[u]
+
+
+def test_deep_graphs_do_not_recurse():
+    n = 50000
+    graph, nodes = _build(n, [(i, i + 1) for i in range(n - 1)])
+    assert not graph.has_cycle()
+    assert len(graph.strongly_connected_components()) == n
+    nodes[-1].add_connection(nodes[0])
+    assert graph.has_cycle()
+    assert len(graph.strongly_connected_components()) == 1
@@ -0,0 +1,51 @@
+from collections import Counter
+from random import Random
+
+import pytest
+
+from heap_sort import heapsort, heapsort_range, partial_sort
+
+
+def test_heapsort_matches_sorted():
+    rng = Random(0)
+    for length in list(range(10)) + [100, 1001]:
+        lst = [rng.randint(0, length) for _ in range(length)]
+        expected = sorted(lst)
+        heapsort(lst)
+        assert lst == expected
+
+
+def test_heapsort_range_only_touches_the_range():
+    rng = Random(1)
+    for _ in range(200):
+        lst = [rng.randint(0, 20) for _ in range(rng.randint(1, 40))]
+        lo = rng.randrange(len(lst))
+        hi = rng.randrange(lo, len(lst))
+        expected = lst[:lo] + sorted(lst[lo:hi + 1]) + lst[hi + 1:]
+        heapsort_range(lst, lo, hi)
+        assert lst == expected
+
+
+@pytest.mark.parametrize('largest', [False, True])
+def test_partial_sort_selects_the_best_k(largest):
+    rng = Random(2)
+    for _ in range(200):
+        lst = [rng.randint(0, 15) for _ in range(rng.randint(0, 50))]
+        k = rng.randint(-1, len(lst) + 2)
+        original = list(lst)
+        partial_sort(lst, k, largest)
+        best = sorted(original, reverse=largest)[:max(k, 0)]
+        assert lst[:len(best)] == best
+        # the remainder is a rearrangement of what is left
+        assert Counter(lst) == Counter(original)
+
+
+@pytest.mark.parametrize('largest', [False, True])
+def test_partial_sort_with_key_is_stable(largest):
+    rng = Random(3)
+    records = [(rng.randint(0, 5), i) for i in range(100)]
+    for k in (0, 1, 10, 100):
+        lst = list(records)
+        partial_sort(lst, k, largest, key=lambda record: record[0])
+        assert lst[:k] == sorted(records, key=lambda record: record[0], reverse=largest)[:k]
+        assert sorted(lst) == sorted(records)
@@ -0,0 +1,73 @@
+import sys
+from array import array
+from random import Random
+
+import pytest
+
+from hybrid_sort import DispatchPolicy, SortEngine, choose_engine, hybrid_sort, profile_input
+from sort_demo_helpers import ListDistribution, get_distribution_list
+
+
+def _inputs(rng):
+    n = 2000
+    yield pytest.param([3, 1, 2], SortEngine.INSERTION, id='tiny')
+    yield pytest.param(list(range(n)), SortEngine.ADAPTIVE_MERGE, id='sorted ints')
+    yield pytest.param([rng.randint(0, n) for _ in range(n)], SortEngine.COUNTING, id='narrow ints')
+    yield pytest.param([rng.randint(-2**50, 2**50) for _ in range(n)], SortEngine.RADIX, id='wide ints')
+    yield pytest.param(array('q', [rng.randint(-2**50, 2**50) for _ in range(n)]), SortEngine.RADIX, id='wide int array')
+    yield pytest.param([rng.choice([0.5, 1.5, 2.5]) for _ in range(n)], SortEngine.INTROSORT, id='few unique floats')
+    yield pytest.param([rng.random() for _ in range(n)], SortEngine.INTROSORT, id='random floats')
+    yield pytest.param([''.join(rng.choices('abcdef', k=8)) for _ in range(n)], SortEngine.STRING_RADIX, id='random strings')
+
+
+@pytest.mark.parametrize('lst, engine', list(_inputs(Random(0))))
+def test_hybrid_sort_picks_an_engine_and_sorts(lst, engine):
+    assert choose_engine(profile_input(lst)) == engine
+    expected = sorted(lst)
+    hybrid_sort(lst)
+    assert list(lst) == expected
+
+
+@pytest.mark.parametrize('distribution', list(ListDistribution), ids=lambda d: d.value)
+def test_hybrid_sort_matches_sorted(distribution):
+    for length in (0, 1, 2, 3, 9, 100, 3000):
+        lst = get_distribution_list(distribution, length, Random(length))
+        expected = sorted(lst)
+        hybrid_sort(lst)
+        assert lst == expected
+
+
+def test_mixed_ints_and_floats_fall_back_to_introsort():
+    lst = list(range(1000))
+    Random(1).shuffle(lst)
+    # min and max are ints, so the profile says ints and counting sort is picked
+    lst[500] = 3.5
+    assert choose_engine(profile_input(lst)) == SortEngine.COUNTING
+    expected = sorted(lst)
+    hybrid_sort(lst)
+    assert lst == expected
+
+
+def test_type_errors_from_comparison_engines_are_raised():
+    lst = [1, 'a'] * 50
+    with pytest.raises(TypeError):
+        hybrid_sort(lst)
+
+
+def test_policy_from_benchmark():
+    def result(algo, size, median):
+        return {'algo': algo, 'distribution': 'random', 'size': size, 'median': median}
+
+    report = {'results': [
+        result('insertion_sort', 10, 1.0), result('quick_sort', 10, 2.0),
+        result('insertion_sort', 100, 5.0), result('quick_sort', 100, 3.0),
+        result('lsd_radix_sort', 100, 4.0), result('lsd_radix_sort', 1000, 20.0), result('quick_sort', 1000, 30.0),
+        result('counting_sort', 1000, 25.0),
+    ]}
+    policy = DispatchPolicy.from_benchmark(report)
+    assert policy.insertion_max_size == 10
+    assert policy.radix_min_size == 1000
+    assert policy.counting_max_range_factor == 0.5
+
+    report['results'] = [r for r in report['results'] if r['algo'] != 'lsd_radix_sort']
+    assert DispatchPolicy.from_benchmark(report).radix_min_size == sys.maxsize
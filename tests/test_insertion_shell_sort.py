@@ -0,0 +1,78 @@
+from array import array
+from random import Random
+
+import pytest
+
+from insertion_sort import binary_insertion_sort, binary_insertion_sort_range
+from shell_sort import GapSequence, shell_sort, shell_sort_range
+
+
+class ByValue:
+    """Orders by value only, so the tag shows whether equal values kept their input order."""
+
+    def __init__(self, value, tag):
+        self.value, self.tag = value, tag
+
+    def __lt__(self, other):
+        return self.value < other.value
+
+
+def test_binary_insertion_sort_is_stable():
+    rng = Random(0)
+    for length in (0, 1, 2, 50, 300):
+        items = [ByValue(rng.randint(0, 9), i) for i in range(length)]
+        expected = sorted((item.value, item.tag) for item in items)
+        binary_insertion_sort(items)
+        assert [(item.value, item.tag) for item in items] == expected
+
+
+def test_binary_insertion_sort_range_with_sorted_prefix():
+    rng = Random(1)
+    for _ in range(200):
+        lst = [rng.randint(0, 30) for _ in range(rng.randint(1, 40))]
+        lo = rng.randrange(len(lst))
+        hi = rng.randrange(lo, len(lst))
+        start = rng.randint(lo + 1, hi + 1)
+        lst[lo:start] = sorted(lst[lo:start])
+        expected = lst[:lo] + sorted(lst[lo:hi + 1]) + lst[hi + 1:]
+        binary_insertion_sort_range(lst, lo, hi, start)
+        assert lst == expected
+
+
+@pytest.mark.parametrize('gap_sequence', list(GapSequence), ids=lambda g: g.value)
+def test_gaps_are_decreasing_below_n_and_end_in_1(gap_sequence):
+    for n in (0, 1, 2, 5, 100, 10**6):
+        gaps = gap_sequence.get_gaps(n)
+        assert gaps[-1] == 1
+        assert all(a > b for a, b in zip(gaps, gaps[1:]))
+        assert all(gap < n for gap in gaps[:-1])
+    assert GapSequence.TOKUDA.get_gaps(200)[::-1][:6] == [1, 4, 9, 20, 46, 103]
+    assert GapSequence.SEDGEWICK.get_gaps(300)[::-1] == [1, 8, 23, 77, 281]
+    assert GapSequence.CIURA.get_gaps(5000)[::-1] == [1, 4, 10, 23, 57, 132, 301, 701, 1750, 3937]
+
+
+@pytest.mark.parametrize('gap_sequence', list(GapSequence), ids=lambda g: g.value)
+def test_shell_sort_matches_sorted(gap_sequence):
+    rng = Random(2)
+    for length in (0, 1, 2, 3, 100, 2000):
+        values = [rng.randint(-100, 100) for _ in range(length)]
+        for container in (list, lambda v: array('q', v)):
+            lst = container(values)
+            shell_sort(lst, gap_sequence=gap_sequence)
+            assert list(lst) == sorted(values)
+
+    records = [(rng.randint(0, 3), i) for i in range(100)]
+    lst = list(records)
+    shell_sort(lst, gap_sequence=gap_sequence, key=lambda record: record[0], reverse=True)
+    assert lst == sorted(records, key=lambda record: record[0], reverse=True)
+
+
+def test_shell_sort_range_only_touches_the_range():
+    rng = Random(3)
+    for _ in range(100):
+        lst = [rng.randint(0, 30) for _ in range(rng.randint(1, 60))]
+        lo = rng.randrange(len(lst))
+        hi = rng.randrange(lo, len(lst))
+        expected = lst[:lo] + sorted(lst[lo:hi + 1]) + lst[hi + 1:]
+        shell_sort_range(lst, lo, hi, GapSequence.TOKUDA)
+        assert lst == expected
@@ -0,0 +1,48 @@
+from math import log2
+from random import Random
+
+import pytest
+
+from quicksort import introsort, quick_sort
+from sort_demo_helpers import ListDistribution, OperationTrace, TraceMode, get_distribution_list
+
+
+@pytest.mark.parametrize('distribution', list(ListDistribution), ids=lambda d: d.value)
+def test_introsort_sorts_every_distribution(distribution):
+    for length in (0, 1, 2, 15, 16, 17, 127, 128, 129, 1000):
+        lst = get_distribution_list(distribution, length, Random(length))
+        expected = sorted(lst)
+        introsort(lst)
+        assert lst == expected
+
+
+def test_introsort_only_touches_the_given_range():
+    rng = Random(0)
+    for _ in range(200):
+        lst = [rng.randint(0, 30) for _ in range(rng.randint(1, 80))]
+        low = rng.randrange(len(lst))
+        high = rng.randrange(low, len(lst))
+        expected = lst[:low] + sorted(lst[low:high + 1]) + lst[high + 1:]
+        introsort(lst, low, high)
+        assert lst == expected
+
+
+@pytest.mark.parametrize('distribution', list(ListDistribution), ids=lambda d: d.value)
+def test_quick_sort_stays_n_log_n(distribution):
+    n = 4096
+    trace = OperationTrace(TraceMode.COUNTS)
+    lst = get_distribution_list(distribution, n, Random(0))
+    quick_sort(lst, trace=trace)
+    assert lst == sorted(lst)
+    assert trace.counts()['C'] < 4 * n * log2(n)
+
+
+def test_quick_sort_key_and_reverse_are_stable():
+    rng = Random(1)
+    records = [(rng.randint(0, 4), i) for i in range(200)]
+    for reverse in (False, True):
+        lst = list(records)
+        quick_sort(lst, key=lambda record: record[0], reverse=reverse)
+        assert lst == sorted(records, key=lambda record: record[0], reverse=reverse)
+    with pytest.raises(ValueError):
+        quick_sort(list(records), low=1, key=lambda record: record[0])
@@ -0,0 +1,59 @@
+from array import array
+from random import Random
+
+import pytest
+
+from merge_sort import bottom_up_merge_sort, make_scratch_buffer, merge_sort
+
+
+def random_lists(seed=0, count=100, max_len=200):
+    rng = Random(seed)
+    for _ in range(count):
+        yield [rng.randint(-50, 50) for _ in range(rng.randint(0, max_len))]
+
+
+def test_bottom_up_merge_sort_matches_sorted_for_lists_arrays_and_memoryviews():
+    for lst in random_lists():
+        expected = sorted(lst)
+
+        as_list = list(lst)
+        bottom_up_merge_sort(as_list)
+        assert as_list == expected
+
+        as_array = array('q', lst)
+        bottom_up_merge_sort(as_array)
+        assert as_array.tolist() == expected
+
+        as_view = memoryview(bytearray(array('q', lst).tobytes())).cast('q')
+        bottom_up_merge_sort(as_view)
+        assert as_view.tolist() == expected
+
+
+def test_merge_sort_is_stable():
+    rng = Random(1)
+    records = [(rng.randint(0, 5), i) for i in range(300)]
+    lst = list(records)
+    merge_sort(lst, key=lambda record: record[0])
+    assert lst == sorted(records, key=lambda record: record[0])
+
+
+def test_scratch_buffer_is_reused_and_checked():
+    scratch = make_scratch_buffer([0] * 50)
+    for lst in random_lists(seed=2, max_len=50):
+        expected = sorted(lst)
+        bottom_up_merge_sort(lst, scratch)
+        assert lst == expected
+    with pytest.raises(ValueError):
+        bottom_up_merge_sort([3, 2, 1], [None])
+
+
+@pytest.mark.parametrize('seq', [
+    [3, 1, 2],
+    array('q', [3, 1, 2]),
+    memoryview(bytearray(array('q', [3, 1, 2]).tobytes())).cast('q'),
+], ids=['list', 'array', 'memoryview'])
+def test_make_scratch_buffer_copies_or_allocates(seq):
+    copy = make_scratch_buffer(seq)
+    assert type(copy) is type(seq)
+    assert list(copy) == [3, 1, 2]
+    assert len(make_scratch_buffer(seq, 5)) == 5
@@ -0,0 +1,73 @@
+from functools import total_ordering
+from random import Random
+
+import pytest
+
+from natural_merge_sort import compute_min_run, gallop_left, gallop_right, natural_merge_sort
+
+
+@total_ordering
+class Counted:
+    """Compares by value only and counts every comparison, so stability and adaptivity can be checked."""
+    comparisons = 0
+
+    def __init__(self, value, tag):
+        self.value, self.tag = value, tag
+
+    def __lt__(self, other):
+        Counted.comparisons += 1
+        return self.value < other.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def _run_heavy(rng, n):
+    """Ascending and descending runs of random lengths, with lots of repeated values."""
+    values = []
+    while len(values) < n:
+        run = sorted(rng.randint(0, 50) for _ in range(rng.randint(1, 200)))
+        values.extend(run if rng.random() < 0.5 else run[::-1])
+    return values[:n]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_natural_merge_sort_is_stable_on_run_heavy_input(seed):
+    rng = Random(seed)
+    for n in (0, 1, 2, 63, 64, 65, 2000):
+        items = [Counted(value, i) for i, value in enumerate(_run_heavy(rng, n))]
+        expected = [(item.value, item.tag) for item in sorted(items)]
+        natural_merge_sort(items)
+        assert [(item.value, item.tag) for item in items] == expected
+
+
+@pytest.mark.parametrize('values, max_comparisons', [
+    (list(range(10000)), 10000),
+    (list(range(10000, 0, -1)), 10000),
+    # two long interleaving-free runs merge by galloping
+    (list(range(5000, 10000)) + list(range(5000)), 10100),
+])
+def test_natural_merge_sort_is_linear_on_presorted_input(values, max_comparisons):
+    items = [Counted(value, i) for i, value in enumerate(values)]
+    Counted.comparisons = 0
+    natural_merge_sort(items)
+    assert [item.value for item in items] == sorted(values)
+    assert Counted.comparisons <= max_comparisons
+
+
+def test_gallops_match_bisect():
+    rng = Random(9)
+    lst = sorted(rng.randint(0, 30) for _ in range(100))
+    for key in range(-1, 32):
+        for lo, hi in ((0, 100), (10, 60), (40, 40)):
+            for from_right in (False, True):
+                left = gallop_left(key, lst, lo, hi, from_right)
+                right = gallop_right(key, lst, lo, hi, from_right)
+                assert left == lo + sum(1 for v in lst[lo:hi] if v < key)
+                assert right == lo + sum(1 for v in lst[lo:hi] if v <= key)
+
+
+def test_compute_min_run():
+    assert compute_min_run(63) == 63
+    for n in range(64, 5000, 37):
+        assert 32 <= compute_min_run(n) <= 64
@@ -0,0 +1,44 @@
+import os
+from array import array
+from random import Random
+
+import pytest
+
+from parallel_merge_sort import get_chunk_bounds, k_way_merge, parallel_merge_sort
+
+
+def _shm_entries():
+    return set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+@pytest.mark.parametrize('chunk_size', [None, 1, 7, 1000])
+def test_parallel_merge_sort_matches_sorted(workers, chunk_size):
+    rng = Random(workers * 31 + (chunk_size or 0))
+    for length in (0, 1, 2, 50, 333):
+        data = [rng.randint(-2**40, 2**40) for _ in range(length)]
+        assert parallel_merge_sort(data, workers=workers, chunk_size=chunk_size).tolist() == sorted(data)
+
+
+def test_chunk_bounds_cover_the_range():
+    for n in range(0, 40):
+        for workers in (1, 3, 8):
+            bounds = get_chunk_bounds(n, workers)
+            assert [i for lo, hi in bounds for i in range(lo, hi)] == list(range(n))
+    with pytest.raises(ValueError):
+        get_chunk_bounds(10, 2, 0)
+
+
+def test_k_way_merge():
+    rng = Random(3)
+    runs = [sorted(rng.randint(0, 50) for _ in range(rng.randint(0, 20))) for _ in range(6)]
+    out = [None] * sum(map(len, runs))
+    k_way_merge(runs, out)
+    assert out == sorted(value for run in runs for value in run)
+
+
+def test_errors_free_the_shared_block():
+    before = _shm_entries()
+    with pytest.raises(ValueError):
+        parallel_merge_sort(array('q', range(10, 0, -1)), workers=1, chunk_size=0)
+    assert _shm_entries() == before
@@ -0,0 +1,87 @@
+import statistics
+from math import ceil
+from random import Random
+
+import pytest
+
+from quicksort import StreamingMedian, introselect, median, median_of_medians, percentiles, select_many
+
+
+def _random_lists(seed, count=100, max_len=60):
+    rng = Random(seed)
+    for _ in range(count):
+        yield [rng.randint(0, rng.choice([3, 30, 1000])) for _ in range(rng.randint(1, max_len))]
+
+
+def test_introselect_partitions_around_rank():
+    for lst in _random_lists(0):
+        for k in range(len(lst)):
+            work = list(lst)
+            assert introselect(work, k) == sorted(lst)[k]
+            assert all(v <= work[k] for v in work[:k]) and all(v >= work[k] for v in work[k + 1:])
+            assert sorted(work) == sorted(lst)
+
+
+def test_introselect_on_a_subrange():
+    rng = Random(1)
+    for lst in _random_lists(1):
+        low = rng.randrange(len(lst))
+        high = rng.randrange(low, len(lst))
+        k = rng.randint(low, high)
+        work = list(lst)
+        assert introselect(work, k, low, high) == sorted(lst[low:high + 1])[k - low]
+        assert work[:low] == lst[:low] and work[high + 1:] == lst[high + 1:]
+        with pytest.raises(IndexError):
+            introselect(work, high + 1, low, high)
+
+
+def test_introselect_stays_linear_on_adversarial_input():
+    # sorted, reversed and organ pipe inputs defeat naive pivots; all must stay within a constant factor of n operations
+    for lst in (list(range(10000)), list(range(10000, 0, -1)), list(range(5000)) + list(range(5000, 0, -1))):
+        ops = []
+        introselect(list(lst), len(lst) // 3, record=lambda *op: ops.append(op))
+        assert len(ops) < 20 * len(lst)
+
+
+def test_median_of_medians_is_a_good_pivot():
+    for lst in _random_lists(2, max_len=300):
+        work = list(lst)
+        pivot = work[median_of_medians(work, 0, len(work) - 1)]
+        n = len(work)
+        assert sum(1 for v in work if v <= pivot) >= 3 * n // 10 - 3
+        assert sum(1 for v in work if v >= pivot) >= 3 * n // 10 - 3
+
+
+def test_select_many_matches_sorted():
+    rng = Random(3)
+    for lst in _random_lists(3):
+        n = len(lst)
+        ranks = [rng.randint(-n, n - 1) for _ in range(rng.randint(0, 8))]
+        assert select_many(list(lst), ranks) == [sorted(lst)[k] for k in ranks]
+    with pytest.raises(IndexError):
+        select_many([1, 2, 3], [3])
+
+
+def test_median_and_percentiles_match_references():
+    for lst in _random_lists(4):
+        assert median(list(lst)) == statistics.median(lst)
+        percents = [0, 1, 25, 50, 90, 99, 100]
+        expected = [sorted(lst)[max(0, ceil(p * len(lst) / 100) - 1)] for p in percents]
+        assert percentiles(list(lst), percents) == expected
+    with pytest.raises(ValueError):
+        median([])
+    with pytest.raises(ValueError):
+        percentiles([1], [101])
+
+
+def test_streaming_median_matches_statistics():
+    rng = Random(5)
+    values = [rng.uniform(-10, 10) for _ in range(300)]
+    stream = StreamingMedian()
+    with pytest.raises(ValueError):
+        stream.median()
+    for i, value in enumerate(values, 1):
+        stream.add(value)
+        assert len(stream) == i
+        assert stream.median() == pytest.approx(statistics.median(values[:i]))
+    assert StreamingMedian(values).median() == pytest.approx(statistics.median(values))
@@ -0,0 +1,133 @@
+import copy
+import json
+from math import log
+from random import Random
+
+import pytest
+
+from sort_benchmark import (
+    ALGOS, compare_complexity, compare_to_baseline, fit_complexity, geometric_sizes, main, run_benchmarks,
+    run_complexity_sweep,
+)
+from sort_demo_helpers import ListDistribution
+
+
+@pytest.fixture(scope='module')
+def small_report():
+    return run_benchmarks(
+        algo_names=['insertion_sort', 'quick_sort'],
+        sizes=[10, 50],
+        distributions=[ListDistribution.RANDOM, ListDistribution.SORTED],
+        repeats=2,
+        warmup=0,
+    )
+
+
+def test_run_benchmarks_report(small_report):
+    results = small_report['results']
+    assert len(results) == 2 * 2 * 2
+    for result in results:
+        assert len(result['times']) == 2
+        assert result['min'] <= result['median']
+        assert result['peak_memory_bytes'] >= 0
+    # the report is what --output and --baseline round trip
+    assert json.loads(json.dumps(small_report)) == small_report
+
+
+def test_run_benchmarks_skips_sizes_above_an_algos_max():
+    _, max_size = ALGOS['bubble_sort']
+    report = run_benchmarks(['bubble_sort'], sizes=[max_size + 1], distributions=[ListDistribution.SORTED], repeats=1)
+    assert report['results'] == []
+
+
+def test_compare_to_baseline(small_report):
+    assert compare_to_baseline(small_report, small_report) == []
+
+    slower = copy.deepcopy(small_report)
+    slower['results'][0]['median'] *= 2
+    regressions = compare_to_baseline(slower, small_report, threshold=0.5)
+    assert [(r['algo'], r['metric']) for r in regressions] == [(small_report['results'][0]['algo'], 'median')]
+    assert regressions[0]['ratio'] == pytest.approx(2)
+    assert compare_to_baseline(slower, small_report, threshold=1.5) == []
+
+
+def test_main_exits_1_on_regressions(tmp_path, small_report, capsys):
+    fast = copy.deepcopy(small_report)
+    for result in fast['results']:
+        result['median'] = 1e-12
+    baseline_path = tmp_path / 'baseline.json'
+    baseline_path.write_text(json.dumps(fast))
+    argv = ['--algos', 'quick_sort', '--sizes', '10', '--distributions', 'random', '--repeats', '1',
+            '--output', str(tmp_path / 'report.json'), '--baseline', str(baseline_path)]
+
+    assert main(argv) == 1
+    assert 'REGRESSION: quick_sort' in capsys.readouterr().err
+    assert json.loads((tmp_path / 'report.json').read_text())['results'][0]['algo'] == 'quick_sort'
+
+
+@pytest.mark.parametrize('model, f', [
+    ('n', lambda n: 3 * n),
+    ('n log n', lambda n: 0.5 * n * log(n)),
+    ('n^2', lambda n: n * n / 7),
+])
+def test_fit_complexity_recovers_the_model(model, f):
+    sizes = geometric_sizes(64, 65536)
+    rng = Random(model)
+    # a few percent of multiplicative noise, as timings have
+    fit = fit_complexity(sizes, [f(n) * rng.uniform(0.97, 1.03) for n in sizes])
+    assert fit['model'] == model
+    lo, hi = fit['exponent_ci95']
+    assert lo <= fit['exponent'] <= hi
+    assert fit['r_squared'] > 0.99
+
+
+def test_fit_complexity_falls_back_to_the_exponent():
+    sizes = geometric_sizes(64, 65536)
+    fit = fit_complexity(sizes, [n ** 3 for n in sizes])
+    assert fit['model'] == 'n^3.00'
+    with pytest.raises(ValueError):
+        fit_complexity([10, 20, 40], [1.0, 0, 2.0])
+    with pytest.raises(ValueError):
+        fit_complexity([1, 2, 4, 8], [1.0, 2.0, 4.0, 8.0])
+
+
+def test_complexity_cli_rejects_sizes_below_2(capsys):
+    with pytest.raises(SystemExit):
+        main(['--complexity', '--sizes', '1', '8', '64', '--algos', 'merge_sort'])
+    assert 'at least 2' in capsys.readouterr().err
+
+
+def test_geometric_sizes():
+    assert geometric_sizes(64, 1024) == [64, 128, 256, 512, 1024]
+    # 2, 2.4, 2.88 and 3.456 truncate to just two distinct sizes
+    assert geometric_sizes(2, 4, 1.2) == [2, 3]
+    with pytest.raises(ValueError):
+        geometric_sizes(1, 100)
+    with pytest.raises(ValueError):
+        geometric_sizes(10, 100, 1)
+
+
+def _fit(model, exponent, margin):
+    return {'model': model, 'exponent': exponent, 'exponent_ci95': [exponent - margin, exponent + margin]}
+
+
+def test_compare_complexity_needs_disjoint_intervals():
+    def report(model, exponent, margin):
+        return {'complexity': [{
+            'algo': 'quick_sort', 'distribution': 'random',
+            'ops_fit': _fit('n log n', 1.1, 0.01), 'time_fit': _fit(model, exponent, margin),
+        }]}
+
+    baseline = report('n log n', 1.1, 0.05)
+    assert compare_complexity(report('n log n', 1.1, 0.05), baseline) == []
+    # a borderline fit whose interval still overlaps the baseline's is noise
+    assert compare_complexity(report('n', 1.02, 0.05), baseline) == []
+    changes = compare_complexity(report('n^2', 2.0, 0.05), baseline)
+    assert [(c['fit'], c['baseline'], c['current']) for c in changes] == [('time_fit', 'n log n', 'n^2')]
+
+
+def test_run_complexity_sweep_fits_operation_counts():
+    report = run_complexity_sweep(['merge_sort', 'insertion_sort'], sizes=geometric_sizes(64, 1024), repeats=1, warmup=0)
+    fits = {result['algo']: result['ops_fit'] for result in report['complexity']}
+    assert fits['merge_sort']['model'] == 'n log n'
+    assert fits['insertion_sort']['model'] == 'n^2'
@@ -0,0 +1,45 @@
+import pytest
+
+from sort_comparison import (
+    ALL_ALGOS, EXAMPLE_LABELS, SAMPLES_PER_TASK, get_comparison_tasks, get_example, iter_operation_counts, main,
+)
+
+
+def test_tasks_cover_every_sample_once():
+    names = [algo.__name__ for algo in ALL_ALGOS]
+    for samples in (1, SAMPLES_PER_TASK, SAMPLES_PER_TASK + 1, 3 * SAMPLES_PER_TASK):
+        tasks = get_comparison_tasks(names, samples)
+        for name in names:
+            for label in EXAMPLE_LABELS:
+                ranges = [(first, end) for algo, task_label, first, end in tasks if (algo, task_label) == (name, label)]
+                covered = [sample for first, end in ranges for sample in range(first, end)]
+                assert covered == list(range(samples if label == 'avg' else 1))
+                assert all(end - first <= SAMPLES_PER_TASK for first, end in ranges)
+
+
+@pytest.mark.parametrize('samples', [0, -3])
+def test_samples_below_1_are_rejected(samples):
+    with pytest.raises(ValueError):
+        get_comparison_tasks(['quick_sort'], samples)
+
+
+def test_examples_are_seeded():
+    assert get_example('best', 5) == [1, 2, 3, 4, 5]
+    assert get_example('worst', 5) == [5, 4, 3, 2, 1]
+    assert get_example('avg', 20, 3, seed=1) == get_example('avg', 20, 3, seed=1)
+    assert get_example('avg', 20, 3, seed=1) != get_example('avg', 20, 4, seed=1)
+
+
+def test_results_do_not_depend_on_workers(capsys):
+    serial = main(list_len=12, samples=30, workers=1)
+    parallel = main(list_len=12, samples=30, workers=2)
+    capsys.readouterr()
+    assert serial == parallel
+    assert set(serial) == {algo.__name__ for algo in ALL_ALGOS}
+
+
+def test_iter_operation_counts_yields_one_count_per_sample():
+    results = list(iter_operation_counts(['heapsort'], list_len=8, samples=SAMPLES_PER_TASK + 2, workers=1))
+    for (_, _, first, end), counts in results:
+        assert len(counts) == end - first
+        assert all(count['total_op_count'] > 0 for count in counts)
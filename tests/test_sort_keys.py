@@ -0,0 +1,49 @@
+from array import array
+from random import Random
+
+import pytest
+
+from sort_comparison import ALL_ALGOS
+from sort_demo_helpers import OperationTrace, TraceMode
+
+
+class CountingKey:
+    """A key function that records how often it is called."""
+
+    def __init__(self, field):
+        self.field = field
+        self.calls = 0
+
+    def __call__(self, record):
+        self.calls += 1
+        return record[self.field]
+
+
+def _records(rng, n):
+    # dicts can't be ordered, so a sort that compared the items themselves would raise;
+    # selection_sort, heapsort and quick_sort are not stable on their own, so ties test sort_with_key
+    return [{'group': rng.randint(-3, 3), 'id': i} for i in range(n)]
+
+
+@pytest.mark.parametrize('algo', ALL_ALGOS, ids=lambda algo: algo.__name__)
+@pytest.mark.parametrize('reverse', [False, True])
+def test_key_sorts_are_stable_and_call_key_once(algo, reverse):
+    rng = Random(7)
+    for n in (0, 1, 2, 40, 150):
+        records = _records(rng, n)
+        key = CountingKey('group')
+        lst = list(records)
+        algo(lst, trace=OperationTrace(TraceMode.NONE), key=key, reverse=reverse)
+        assert lst == sorted(records, key=lambda record: record['group'], reverse=reverse)
+        assert key.calls == n
+
+
+@pytest.mark.parametrize('algo', ALL_ALGOS, ids=lambda algo: algo.__name__)
+def test_reverse_without_key(algo):
+    rng = Random(8)
+    values = [rng.randint(0, 50) for _ in range(100)]
+    for container in (list, lambda v: array('q', v)):
+        lst = container(values)
+        algo(lst, reverse=True)
+        assert list(lst) == sorted(values, reverse=True)
+
@@ -0,0 +1,46 @@
+from random import Random
+
+import pytest
+
+from string_sort import STRING_INSERTION_CUTOFF, common_prefix_length, load_words, msd_radix_sort, multikey_quicksort
+
+STRING_SORTS = [msd_radix_sort, multikey_quicksort]
+
+
+def _lcp_reference(lst):
+    return [0] + [common_prefix_length(a, b) for a, b in zip(lst, lst[1:])] if lst else []
+
+
+def _random_strings(rng, n, alphabet):
+    # short alphabets and shared prefixes make deep buckets, duplicates and strings that are prefixes of others
+    prefixes = [''.join(rng.choices(alphabet, k=rng.randint(0, 6))) for _ in range(5)]
+    return [rng.choice(prefixes) + ''.join(rng.choices(alphabet, k=rng.randint(0, 4))) for _ in range(n)]
+
+
+@pytest.mark.parametrize('fnc', STRING_SORTS, ids=lambda f: f.__name__)
+@pytest.mark.parametrize('alphabet', ['ab', 'abcdefghij', 'aZ09é中'])
+def test_string_sorts_match_sorted_and_return_lcp(fnc, alphabet):
+    rng = Random(alphabet)
+    for n in (0, 1, 2, STRING_INSERTION_CUTOFF, STRING_INSERTION_CUTOFF + 1, 200, 2000):
+        lst = _random_strings(rng, n, alphabet)
+        expected = sorted(lst)
+        lcp = fnc(lst)
+        assert lst == expected
+        assert list(lcp) == _lcp_reference(expected)
+
+
+@pytest.mark.parametrize('fnc', STRING_SORTS, ids=lambda f: f.__name__)
+def test_string_sorts_on_words(fnc):
+    words = load_words(count=5000)[:5000]
+    Random(0).shuffle(words)
+    lst = list(words)
+    lcp = fnc(lst)
+    assert lst == sorted(words)
+    assert list(lcp) == _lcp_reference(lst)
+
+
+def test_common_prefix_length():
+    assert common_prefix_length('', 'abc') == 0
+    assert common_prefix_length('abc', 'abd') == 2
+    assert common_prefix_length('abc', 'abc') == 3
+    assert common_prefix_length('abcx', 'abcy', 3) == 3
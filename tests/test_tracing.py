@@ -0,0 +1,43 @@
+from random import Random
+
+import pytest
+
+from sort_comparison import ALL_ALGOS
+from sort_demo_helpers import OperationTrace, TraceMode, get_operations
+
+
+@pytest.mark.parametrize('algo', ALL_ALGOS, ids=lambda algo: algo.__name__)
+def test_every_trace_mode_sorts_and_counts_agree(algo):
+    rng = Random(0)
+    for _ in range(30):
+        lst = [rng.randint(1, 20) for _ in range(rng.randint(0, 40))]
+        expected = sorted(lst)
+
+        counts_by_mode = {}
+        for mode in (TraceMode.TEXT, TraceMode.STRUCTURED, TraceMode.COUNTS):
+            copy = list(lst)
+            _, counts = get_operations(algo, copy, mode)
+            assert copy == expected
+            counts_by_mode[mode] = counts
+        assert counts_by_mode[TraceMode.STRUCTURED] == counts_by_mode[TraceMode.TEXT]
+        assert counts_by_mode[TraceMode.COUNTS] == counts_by_mode[TraceMode.TEXT]
+
+        copy = list(lst)
+        trace = OperationTrace(TraceMode.NONE)
+        algo(copy, trace=trace)
+        assert copy == expected
+        assert len(trace) == 0
+
+
+def test_structured_trace_renders_one_line_per_operation():
+    trace = OperationTrace(TraceMode.STRUCTURED)
+    recorder = trace.recorder()
+    recorder(0, 1, 2)
+    recorder(1, 3, 4)
+    assert len(trace) == 2
+    assert list(trace) == ['I: Processing index 1 (bound 2)...', 'C: Comparing index 3 to index 4...']
+
+
+def test_text_mode_trace_is_rejected():
+    with pytest.raises(ValueError):
+        OperationTrace(TraceMode.TEXT)
@@ -0,0 +1,149 @@
+from collections import deque
+from random import Random
+
+from x_first_search import Bitset, CSRGraph, NodeScroller, get_random_simplified_graph
+
+
+def _reference_bfs(graph, start):
+    order, seen, queue = [start], {start}, deque([start])
+    while queue:
+        for neighbor in graph.get(queue.popleft(), []):
+            if neighbor not in seen:
+                seen.add(neighbor)
+                order.append(neighbor)
+                queue.append(neighbor)
+    return order
+
+
+def _reference_dfs(graph, node, order=None):
+    order = [] if order is None else order
+    order.append(node)
+    for neighbor in graph.get(node, []):
+        if neighbor not in order:
+            _reference_dfs(graph, neighbor, order)
+    return order
+
+
+def _random_graphs(seed, count=40):
+    rng = Random(seed)
+    for _ in range(count):
+        node_count = rng.randint(1, 40)
+        yield get_random_simplified_graph(node_count, rng.randint(0, 3 * node_count), rng)
+
+
+def test_bitset():
+    bits = Bitset(20)
+    for i in (0, 7, 8, 19):
+        bits.add(i)
+    assert [i for i in range(20) if i in bits] == [0, 7, 8, 19]
+
+
+def test_csr_graph_keeps_every_edge():
+    graph = {'a': ['b', 'x'], 'b': [], 'c': ['a', 'a', 'y']}
+    csr = CSRGraph.from_simplified_graph_representation(graph)
+    assert csr.labels == ['a', 'b', 'c', 'x', 'y']
+    assert len(csr) == 5 and csr.edge_count == 5
+    assert {csr.labels[i]: [csr.labels[j] for j in csr.neighbors(i)] for i in range(len(csr))} == {
+        'a': ['b', 'x'], 'b': [], 'c': ['a', 'a', 'y'], 'x': [], 'y': [],
+    }
+
+
+def test_searches_match_the_references():
+    for graph in _random_graphs(0):
+        csr = CSRGraph.from_simplified_graph_representation(graph)
+        for start in graph:
+            expected_bfs, expected_dfs = _reference_bfs(graph, start), _reference_dfs(graph, start)
+            assert NodeScroller.simplified_breadth_first_search(graph, start) == expected_bfs
+            assert NodeScroller.simplified_depth_first_search(graph, start) == expected_dfs
+            assert csr.breadth_first_search(start) == expected_bfs
+            assert csr.depth_first_search(start) == expected_dfs
+
+
+def test_depth_first_search_skips_already_visited_nodes():
+    graph = {1: [2, 3], 2: [4], 3: [4], 4: []}
+    visited = [2]
+    assert NodeScroller.simplified_depth_first_search(graph, 1, visited) == [2, 1, 3, 4]
+
+
+def test_csr_depth_first_search_does_not_recurse():
+    # a path far longer than the recursion limit
+    n = 100000
+    graph = {i: [i + 1] for i in range(n - 1)}
+    csr = CSRGraph.from_simplified_graph_representation(graph)
+    assert list(csr.depth_first_ids(0)) == list(range(n))
+    assert list(csr.breadth_first_ids(0)) == list(range(n))
+
+
+def _bfs_depths(graph, start):
+    depths, queue = {start: 0}, deque([start])
+    while queue:
+        node = queue.popleft()
+        for neighbor in graph.get(node, []):
+            if neighbor not in depths:
+                depths[neighbor] = depths[node] + 1
+                queue.append(neighbor)
+    return depths
+
+
+def test_generators_match_the_searches():
+    for graph in _random_graphs(1):
+        for start in graph:
+            bfs = list(NodeScroller.iter_breadth_first(graph, start))
+            dfs = list(NodeScroller.iter_depth_first(graph, start))
+            assert [node for node, _, _ in bfs] == _reference_bfs(graph, start)
+            assert [node for node, _, _ in dfs] == _reference_dfs(graph, start)
+            depths = _bfs_depths(graph, start)
+            assert all(depth == depths[node] for node, depth, _ in bfs)
+            for walk in (bfs, dfs):
+                assert walk[0] == (start, 0, None)
+                # each parent was yielded before its child, one level up, with an edge to it
+                position = {node: (i, depth) for i, (node, depth, _) in enumerate(walk)}
+                for i, (node, depth, parent) in enumerate(walk[1:], 1):
+                    assert node in graph.get(parent, [])
+                    assert position[parent] == (position[parent][0], depth - 1)
+                    assert position[parent][0] < i
+
+
+def test_depth_limited_dfs_yields_everything_within_the_limit():
+    # A -> B -> C is found first, so C is reached at depth 2 and D would be cut off if C were not
+    # explored again when the A -> C edge reaches it at depth 1
+    graph = {'A': ['B', 'C'], 'B': ['C'], 'C': ['D'], 'D': []}
+    assert [node for node, _, _ in NodeScroller.iter_depth_first(graph, 'A', max_depth=2)] == ['A', 'B', 'C', 'D']
+
+    for graph in _random_graphs(2):
+        for start in graph:
+            depths = _bfs_depths(graph, start)
+            for max_depth in range(4):
+                within = sorted(node for node, depth in depths.items() if depth <= max_depth)
+                for search in (NodeScroller.iter_breadth_first, NodeScroller.iter_depth_first):
+                    walk = [node for node, _, _ in search(graph, start, max_depth)]
+                    assert len(walk) == len(set(walk))
+                    assert sorted(walk) == within
+
+
+def test_generators_are_lazy_and_share_visited():
+    explored = []
+
+    class Recording(dict):
+        def __getitem__(self, node):
+            explored.append(node)
+            return dict.__getitem__(self, node)
+
+    graph = Recording({i: [i + 1] for i in range(100)})
+    walk = NodeScroller.iter_depth_first(graph, 0)
+    assert [next(walk) for _ in range(3)] == [(0, 0, None), (1, 1, 0), (2, 2, 1)]
+    assert explored == [0, 1]
+
+    visited = {3}
+    assert [node for node, _, _ in NodeScroller.iter_breadth_first({1: [2, 3], 2: [3], 3: []}, 1, visited=visited)] == [1, 2]
+    assert visited == {1, 2, 3}
+
+
+def test_generators_walk_csr_graphs_by_id():
+    for graph in _random_graphs(3, count=10):
+        csr = CSRGraph.from_simplified_graph_representation(graph)
+        for start_id in range(len(graph)):
+            for search, ids in ((NodeScroller.iter_breadth_first, csr.breadth_first_ids),
+                                (NodeScroller.iter_depth_first, csr.depth_first_ids)):
+                walk = search(csr, start_id, visited=Bitset(len(csr)))
+                assert [node for node, _, _ in walk] == list(ids(start_id))